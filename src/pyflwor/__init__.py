@@ -1 +1,18 @@
-from pyflwor.pyflwor import compile, execute
+from pyflwor.pyflwor import (
+    aexecute,
+    aiter,
+    compile,
+    execute,
+    execute_many,
+    parse,
+    query_cache,
+)
+from pyflwor.batch import batched
+from pyflwor.cache import QueryCache
+from pyflwor.indexes import (
+    IndexedCollection,
+    ObservableDict,
+    ObservableList,
+    ObservableSet,
+)
+from pyflwor.views import Watch, watch
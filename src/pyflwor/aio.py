@@ -0,0 +1,679 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: aio.py
+Purpose: Evaluates queries with asyncio, awaiting the values of the namespace.
+"""
+from builtins import object
+
+import asyncio
+import inspect
+import types
+from collections import deque
+from operator import itemgetter
+
+import pyflwor.batch as batch
+import pyflwor.indexes as indexes
+from pyflwor.symbols import (
+    Attribute,
+    Call,
+    HashJoin,
+    Scope,
+    _indexes,
+    _missing,
+    arith_operator,
+    attr,
+    expand,
+    flattened,
+    operator,
+    order_key,
+    ordered,
+    reach,
+    setexprOperator1,
+    setexprOperator2,
+    setoperator,
+    unaryOperator,
+)
+
+# This module is a parser backend like symbols.py whose functions compose
+# coroutine functions instead: every query function is an async function of
+# the namespace. The values which are awaitable (the coroutines returned by
+# async functions, futures, tasks) are awaited as soon as they are computed,
+# by a call or as the value of an attribute or of a name, and the async
+# iterables (async generators) are read with async for where the closures
+# iterate.
+#
+# The independent parts of a query are awaited concurrently with
+# asyncio.gather, GATHER of them at a time: the values of every step of a path
+# expression and their wheres, the sequences of the for clauses of a flwr
+# expression and its bindings (the lets, where and return values of each
+# binding are evaluated in order). The bindings are produced as they are
+# evaluated: the values of the first for clause are read a batch at a time,
+# each batch is extended by the next for clause (the ones a filter or join of
+# the optimizer excludes being dropped before the next for clause extends
+# them) a batch at a time, depth first. The joins are built once per
+# evaluation. The results are in the order the closures compute them. The
+# calls of the batch methods made by the bindings (or values) evaluated
+# concurrently are dispatched together, see batch.py.
+
+## the number of bindings of a flwr expression evaluated together by iterate
+BATCH = 64
+
+## the most values evaluated concurrently (by one gather) otherwise
+GATHER = 1024
+
+
+def _query(f):
+    object.__setattr__(f, "__objquery__", True)
+    return f
+
+
+async def _gather(f, items, size=None):
+    """
+    The values of f for each of the items (a list), size of them (GATHER by
+    default) being awaited concurrently at a time.
+    """
+    size = size or GATHER
+    if len(items) <= size:
+        return await asyncio.gather(*[f(x) for x in items])
+    values = list()
+    for start in range(0, len(items), size):
+        values.extend(
+            await asyncio.gather(*[f(x) for x in items[start : start + size]])
+        )
+    return values
+
+
+async def resolve(x):
+    """
+    x, awaited when it is awaitable.
+    """
+    if inspect.isawaitable(x):
+        return await x
+    return x
+
+
+async def values(x):
+    """
+    The values of the iterable x, read with async for when it is an async
+    iterable.
+    """
+    if hasattr(x, "__aiter__"):
+        return [v async for v in x]
+    return x
+
+
+def attributeValue(attribute_list, scalar=False, context="locals"):
+    if scalar:
+
+        async def value(objs):
+            return attribute_list
+
+        return _query(value)
+
+    def query_function(param):
+        return isinstance(param, types.FunctionType) and hasattr(param, "__objquery__")
+
+    def constant(param):
+        async def value(objs):
+            return param
+
+        return value
+
+    plan = [
+        (
+            attr.name,
+            [
+                (
+                    call.lookup,
+                    [p if query_function(p) else constant(p) for p in call.params],
+                )
+                for call in attr.callchain or ()
+            ],
+        )
+        for attr in attribute_list
+    ]
+
+    async def call(objs, x, calls):
+        for lookup, params in calls:
+            p = [await param(objs) for param in params]
+            if lookup:
+                x = await resolve(x.__getitem__(p[0]))
+            elif batch.batch(x) is not None and batch.LOADER in objs:
+                x = await objs[batch.LOADER].load(*(batch.batch(x) + (tuple(p),)))
+            else:
+                x = await resolve(x.__call__(*p))
+        return x
+
+    async def value(objs):
+        name0, calls0 = plan[0]
+        obj = await resolve(objs[name0])
+        if calls0:
+            obj = await call(objs, obj, calls0)
+        for name, calls in plan[1:]:
+            x = attr(obj, name)
+            if x is _missing:
+                raise Exception("object %s did not have attr %s" % (str(obj), name))
+            x = await resolve(x)
+            obj = await call(objs, x, calls) if calls else x
+        return obj
+
+    return _query(value)
+
+
+def sharedValue(key, names, value):
+    """
+    See symbols.sharedValue.
+    """
+
+    async def shared(objs):
+        if objs.__class__ is not Scope:
+            return await value(objs)
+        roots = [objs.vars.get(name) for name in names]
+        cached = objs.vars.get(key)
+        if cached is not None and all(x is y for x, y in zip(roots, cached[0])):
+            return cached[1]
+        v = await value(objs)
+        objs.vars[key] = (roots, v)
+        return v
+
+    return _query(shared)
+
+
+def booleanOperator(op):
+    if op == "and":
+
+        async def boolean(x, y, objs):
+            return await x(objs) and await y(objs)
+
+    elif op == "or":
+
+        async def boolean(x, y, objs):
+            return await x(objs) or await y(objs)
+
+    else:
+        raise Exception("operator %s not found" % op)
+    return boolean
+
+
+def _binary(value1, op, value2):
+    async def value(objs):
+        return op(await value1(objs), await value2(objs))
+
+    return _query(value)
+
+
+comparisonValue = arithValue = setValue = setexprValue1 = setexprValue2 = _binary
+
+
+def booleanexprValue(value1, op, value2):
+    async def where(objs):
+        return await op(value1, value2, objs)
+
+    return _query(where)
+
+
+def unaryexprValue(op, val):
+    async def where(objs):
+        return op(await val(objs))
+
+    return _query(where)
+
+
+def booleanValue(val):
+    async def where(objs):
+        return bool(await val(objs))
+
+    return _query(where)
+
+
+def whereValue(val):
+    return val
+
+
+def dictValue(pairs):
+    async def dictval(objs):
+        return dict([(await name(objs), await value(objs)) for name, value in pairs])
+
+    return _query(dictval)
+
+
+def listValue(values):
+    async def listval(objs):
+        return [await value(objs) for value in values]
+
+    return _query(listval)
+
+
+def iterate(query):
+    """
+    query, with the iterate attribute yielding its results.
+    """
+
+    async def iterate(objs):
+        for r in await query(objs):
+            yield r
+
+    object.__setattr__(query, "iterate", iterate)
+    return _query(query)
+
+
+async def elements(query, objs):
+    """
+    Yields the values of the query one at a time: with its iterate attribute
+    or, when it computes an iterable, from the iterable as it is read.
+    """
+    if hasattr(query, "iterate"):
+        async for x in query.iterate(objs):
+            yield x
+        return
+    async for x in _aiter(await query(objs)):
+        yield x
+
+
+async def _values(objs, attrs, lookups, u, i):
+    """
+    Yields the values step i of the path expression attrs reaches from u, see
+    symbols.step, an asynchronous iterable as it is read.
+    """
+    v = reach(objs, attrs, u, i)
+    if v is _missing:
+        return
+    v = await resolve(v)
+    if hasattr(v, "__aiter__"):
+        async for x in v:
+            yield x
+        return
+    if i in lookups and isinstance(v, indexes.IndexedCollection):
+        probes = [(key, op, await value(objs)) for key, op, value in lookups[i]]
+        found = indexes.lookup(
+            v, [(key, op, lambda value=value: value) for key, op, value in probes]
+        )
+        if found is not None:
+            for x in found:
+                yield x
+            return
+    for x in expand(objs, attrs, {}, v, i):
+        yield x
+
+
+async def _step(objs, attrs, lookups, u, i):
+    return [v async for v in _values(objs, attrs, lookups, u, i)]
+
+
+def queryValue(q, probes=None):
+    """
+    Computes a path expression level by level: the values each step reaches
+    from the values of the previous one, then its where for each of them.
+    """
+    attrs = q
+    lookups = dict()
+    for i, key, op, value in probes or ():
+        lookups.setdefault(i, []).append((key, op, value))
+
+    async def query(objs):
+        found = [None]  # the first name is looked up in objs
+        for i, (_, where) in enumerate(attrs):
+            steps = await _gather(
+                lambda u, i=i: _step(objs, attrs, lookups, u, i), found
+            )
+            found = [v for vs in steps for v in vs]
+            if where is not None:
+                tests = await _gather(
+                    lambda v, where=where: where(Scope(objs, {"self": v})), found
+                )
+                found = [v for v, test in zip(found, tests) if test]
+        return found
+
+    async def iterate(objs):
+        ## the traversal of symbols.queryValue, one value at a time
+        queue = deque([(None, 0)])
+        while queue:
+            u, i = queue.popleft()
+            where = attrs[i][1]
+            async for v in _values(objs, attrs, lookups, u, i):
+                if where is not None and not await where(Scope(objs, {"self": v})):
+                    continue
+                if i + 1 == len(attrs):
+                    yield v
+                else:
+                    queue.append((v, i + 1))
+
+    object.__setattr__(query, "iterate", iterate)
+    return _query(query)
+
+
+async def _keys(objs, name, keys, x):
+    return await _probe(Scope(objs, {name: x}), keys)
+
+
+async def _probe(objs, probes):
+    return tuple([await p(objs) for p in probes])
+
+
+async def _join(objs, name, keys, items):
+    """
+    The HashJoin of the items on their keys, which yields (key, item) pairs.
+    """
+    keyed = await _gather(lambda x: _keys(objs, name, keys, x), list(items))
+    return HashJoin(list(zip(keyed, items)), itemgetter(0))
+
+
+def quantifiedValue(mode, name, s, satisfies, keys=None, probes=None):
+    """
+    The elements are read and tested one at a time so the evaluation stops
+    at the first one deciding the result. With keys (a semi-join) they are
+    all read to build their index, once per execution, see
+    symbols.quantifiedValue.
+    """
+    if keys and mode != "some":
+        raise Exception("only some can be evaluated as a semi-join")
+    if mode not in ("every", "some"):
+        raise Exception("mode '%s' is not 'every' or 'some'" % mode)
+    token = object()
+
+    async def index(objs):
+        return await _join(objs, name, keys, await values(await s(objs)))
+
+    async def matches(objs):
+        indexes = objs.get(_indexes)
+        if indexes is None:
+            matches = await index(objs)
+        else:
+            if token not in indexes:
+                ## the bindings evaluated concurrently await the same build
+                indexes[token] = asyncio.ensure_future(index(objs))
+            matches = await indexes[token]
+        if matches.empty():
+            return  # without evaluating the probes
+        for _, x in matches.probe(await _probe(objs, probes)):
+            yield x
+
+    async def where(objs):
+        empty = True
+        async for x in matches(objs) if keys else elements(s, objs):
+            empty = False
+            if await satisfies(Scope(objs, {name: x})):
+                if mode == "some":
+                    return True
+            elif mode == "every":
+                return False
+        return mode == "every" and not empty
+
+    return where
+
+
+def loaded(query):
+    """
+    query, evaluated with a batch.Loader of its own on each execution.
+    """
+
+    async def execution(objs):
+        return await query(Scope(objs, {batch.LOADER: batch.Loader()}))
+
+    async def iterate(objs):
+        async for r in query.iterate(Scope(objs, {batch.LOADER: batch.Loader()})):
+            yield r
+
+    object.__setattr__(execution, "iterate", iterate)
+    return _query(execution)
+
+
+def indexedQuery(query):
+    async def indexed(objs):
+        return await query(Scope(objs, {_indexes: dict()}))
+
+    async def iterate(objs):
+        async for r in query.iterate(Scope(objs, {_indexes: dict()})):
+            yield r
+
+    object.__setattr__(indexed, "iterate", iterate)
+    return _query(indexed)
+
+
+async def _all(wheres, objs):
+    for where in wheres:
+        if not await where(objs):
+            return False
+    return True
+
+
+def flwrSequence(
+    return_expr,
+    for_expr=None,
+    let_expr=None,
+    where_expr=None,
+    order_expr=None,
+    flatten=False,
+    collecting=False,
+    join_expr=None,
+    filter_expr=None,
+    limit_expr=None,
+):
+    """
+    The bindings of the for clauses are computed first, then they are
+    evaluated concurrently, see symbols.flwrSequence for the parameters.
+    """
+    joins = dict((name, (keys, probes)) for name, keys, probes in join_expr or ())
+    filters = dict()
+    for name, where in filter_expr or ():
+        filters.setdefault(name, []).append(where)
+    order_error = keyfunc = reverse = None
+    if order_expr and not collecting:
+        order_error, keyfunc, reverse = order_key(return_expr, order_expr)
+
+    async def filtered(objs, name, bound):
+        if name not in filters:
+            return bound
+        tests = await _gather(
+            lambda b: _all(filters[name], Scope(objs, dict(b))), bound
+        )
+        return [b for b, test in zip(bound, tests) if test]
+
+    async def extended(objs, seqs, i, bound, size):
+        """
+        Yields the bindings extending the ones of bound (a list) with the for
+        clauses from i, over the items (or the HashJoin) of seqs, in lists of
+        at most size.
+        """
+        if i == len(for_expr):
+            yield bound
+            return
+        name = for_expr[i][0]
+        if name in joins:
+            probes = joins[name][1]
+            found = await _gather(lambda b: _probe(Scope(objs, dict(b)), probes), bound)
+            items = ([x for _, x in seqs[i].probe(key)] for key in found)
+        else:
+            items = (seqs[i] for _ in bound)
+        chunk = list()
+        for b, xs in zip(bound, items):
+            for x in xs:
+                chunk.append(b + ((name, x),))
+                if len(chunk) == size:
+                    chunk = await filtered(objs, name, chunk)
+                    async for r in extended(objs, seqs, i + 1, chunk, size):
+                        yield r
+                    chunk = list()
+        if chunk:
+            chunk = await filtered(objs, name, chunk)
+            async for r in extended(objs, seqs, i + 1, chunk, size):
+                yield r
+
+    async def bindings(objs, size, lazy):
+        """
+        Yields the bindings of the for clauses in lists of at most size. When
+        lazy the values of the first for clause are read as the bindings are
+        needed.
+        """
+        seqs = [None] + await asyncio.gather(
+            *[_sequence(seq, objs) for _, seq in for_expr[1:]]
+        )
+        for i, (name, _) in enumerate(for_expr):
+            if name in joins:
+                seqs[i] = await _join(objs, name, joins[name][0], seqs[i])
+        name, first = for_expr[0]
+        if lazy:
+            first = elements(first, objs)
+        else:
+            first = _aiter(await _sequence(first, objs))
+        async for items in _batches(first, size):
+            bound = await filtered(objs, name, [((name, x),) for x in items])
+            async for r in extended(objs, seqs, 1, bound, size):
+                yield r
+
+    async def output(cobjs, output):
+        if isinstance(output[0], tuple):
+            return dict([(name, await f(cobjs)) for name, f in output])
+        if len(output) == 1:
+            return await output[0](cobjs)
+        return tuple([await f(cobjs) for f in output])
+
+    async def evaluate(objs, binding):
+        """
+        The results of the binding (a list), the as, with and value of each
+        collector when collecting.
+        """
+        cobjs = Scope(objs, dict(binding))
+        for name, let in let_expr or ():
+            cobjs[name] = await let(cobjs)
+        if where_expr and not await where_expr(cobjs):
+            return []
+        if collecting:
+            return [
+                [
+                    (
+                        await collector["as"](cobjs),
+                        await collector["with"](cobjs),
+                        await output(cobjs, collector["value"]),
+                    )
+                    for collector in return_expr
+                ]
+            ]
+        if flatten:
+            return list(flattened(await return_expr[0](cobjs)))
+        return [await output(cobjs, return_expr)]
+
+    async def results(objs, size=None, lazy=False):
+        """
+        Yields the results in order, size bindings being evaluated
+        concurrently at a time, see bindings.
+        """
+        size = size or GATHER
+        if for_expr is None:
+            batches = [[()]]
+        else:
+            batches = bindings(objs, size, lazy)
+        pending = list()
+        async for bound in _aiter(batches):
+            pending.extend(bound)
+            if len(pending) < size:
+                continue  # evaluated with the next bindings
+            rs = await asyncio.gather(*[evaluate(objs, b) for b in pending])
+            pending = list()
+            for r in rs:
+                for x in r:
+                    yield x
+        rs = await asyncio.gather(*[evaluate(objs, b) for b in pending])
+        for r in rs:
+            for x in r:
+                yield x
+
+    async def limited(objs, size=None, lazy=False):
+        count, offset = limit_expr or (None, 0)
+        if count is not None:
+            if count == 0:
+                return
+            size = min(size or GATHER, offset + count)
+        n = 0
+        async for r in results(objs, size, lazy):
+            if n >= offset:
+                yield r
+            n += 1
+            if count is not None and n >= offset + count:
+                break
+
+    async def sequence(objs):
+        if collecting:
+            rets = tuple(dict() for _ in range(len(return_expr)))
+            async for collectors in limited(objs):
+                for i, (_as, _rf, _value) in enumerate(collectors):
+                    rets[i][_as] = await resolve(_rf(rets[i].get(_as, None), _value))
+            if len(rets) == 1:
+                return rets[0]
+            return rets
+        if not order_expr:
+            return tuple([r async for r in limited(objs)])
+        r = [r async for r in results(objs)]
+        if not r:
+            return tuple()
+        if order_error:
+            raise SyntaxError(order_error)
+        count, offset = limit_expr or (None, 0)
+        return tuple(ordered(r, keyfunc, reverse, count, offset))
+
+    async def iterate(objs):
+        if order_expr:
+            for r in await sequence(objs):
+                yield r
+            return
+        async for r in limited(objs, BATCH, True):
+            yield r
+
+    object.__setattr__(sequence, "iterate", iterate)
+    return _query(sequence)
+
+
+async def _sequence(seq, objs):
+    return list(await values(await seq(objs)))
+
+
+async def _batches(items, size):
+    """
+    Yields the values of the async iterator items in lists of size.
+    """
+    batch = list()
+    async for x in items:
+        batch.append(x)
+        if len(batch) == size:
+            yield batch
+            batch = list()
+    if batch:
+        yield batch
+
+
+async def _aiter(items):
+    if hasattr(items, "__aiter__"):
+        async for x in items:
+            yield x
+    else:
+        for x in items:
+            yield x
+
+
+def functionDefinition(params, query):
+    async def flwr_function(objs):
+        async def function(*args):
+            if len(args) != len(params):
+                raise RuntimeError(
+                    "Got wrong number of params expected %d got %d"
+                    % (len(params), len(args))
+                )
+            return await query(Scope(objs, dict(zip(params, args))))
+
+        return function
+
+    return _query(flwr_function)
+
+
+def ifExpr(condition, then, otherwise):
+    async def if_expr(objs):
+        if await condition(objs):
+            return await then(objs)
+        return await otherwise(objs)
+
+    return _query(if_expr)
@@ -0,0 +1,263 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: batch.py
+Purpose: Methods computing their values for many objects in one call.
+"""
+from builtins import object
+
+import asyncio
+import contextvars
+import functools
+import inspect
+
+# A batch method is a function of a list of objects (and of the arguments of
+# the call) returning the list of the values of the method for each of them,
+# eg. one query to a store for the customers of many orders. It is declared
+# with the batched decorator:
+#
+#     class Order(object):
+#         @batched
+#         def customer(orders):
+#             return store.customers([o.customer_id for o in orders])
+#
+# order.customer() calls it with [order]. A bound method (or any callable)
+# having a __pyflwor_batch__ attribute, the (function, object) pair, is a
+# batch method too.
+#
+# The queries evaluated by aio.py evaluate the bindings of a flwr expression
+# and the values of a path step concurrently, the calls of batch methods they
+# make are collected by a Loader and dispatched together once the bindings are
+# all waiting: one call for each function and arguments, with each object
+# once, its values being distributed to the callers.
+#
+# The synchronous executions (see prefetched) register the values of each for
+# clause and of each path step with a where clause with a Prefetch, when they
+# are a list or a tuple: the first call of a batch method on one of them calls
+# it for all of them, the calls on the others return the values it returned.
+# The bindings of a flwr expression passing its where clause (see groups) are
+# registered again before its return expression is evaluated, so the values
+# the where rejects are only loaded by the calls of the where. The values of a
+# flwr expression with a limit (and no ordering) are not registered, the
+# iterations past the limit are not evaluated. The other values, the results
+# of an iterated query (lazy) and the callables which are not batched methods
+# (with a __pyflwor_batch__ attribute) are called one object at a time.
+
+## the name of the Loader of an execution, see aio.loaded
+LOADER = "<loader>"
+
+## the Prefetch of the synchronous execution running, see prefetched
+_prefetch = contextvars.ContextVar("pyflwor_prefetch", default=None)
+
+
+class Method(object):
+    """
+    A batch method bound to obj, see batched.
+    """
+
+    __slots__ = ("__pyflwor_batch__",)
+
+    def __init__(self, function, obj):
+        self.__pyflwor_batch__ = (function, obj)
+
+    def __call__(self, *args):
+        function, obj = self.__pyflwor_batch__
+        prefetch = _prefetch.get()
+        if prefetch is not None:
+            return prefetch.call(function, obj, args)
+        return _call(function, obj, args)
+
+    def __repr__(self):
+        function, obj = self.__pyflwor_batch__
+        return "<batch method %s of %r>" % (function.__name__, obj)
+
+
+def _call(function, obj, args):
+    values = function([obj], *args)
+    if inspect.isawaitable(values):
+        return _first(values)
+    return values[0]
+
+
+async def _first(values):
+    return (await values)[0]
+
+
+async def _resolved(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def _values(function, values, n):
+    values = list(values)
+    if len(values) != n:
+        raise Exception(
+            "batch method %s returned %d values for %d objects"
+            % (function.__name__, len(values), n)
+        )
+    return values
+
+
+class batched(object):
+    """
+    Declares the method function (a function of a list of objects, see the
+    comment above) a batch method. function can be an async function.
+    """
+
+    def __init__(self, function):
+        self.function = function
+        functools.update_wrapper(self, function)
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        return Method(self.function, obj)
+
+    def __call__(self, objs, *args):
+        return self.function(objs, *args)
+
+
+def batch(x):
+    """
+    The (function, object) of the batch method x or None.
+    """
+    return getattr(x, "__pyflwor_batch__", None)
+
+
+class Loader(object):
+    """
+    Collects the calls of the batch methods made during one execution of a
+    query and dispatches them together on the next iteration of the event
+    loop.
+    """
+
+    def __init__(self):
+        self.pending = dict()  # (function, args) -> {id(obj): (obj, future)}
+
+    def load(self, function, obj, args):
+        """
+        The future of the value of the batch method function of obj called
+        with args.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            calls = self.pending.get((function, args))
+        except TypeError:  # unhashable arguments
+            return asyncio.ensure_future(_resolved(_call(function, obj, args)))
+        if not self.pending:
+            loop.call_soon(self.dispatch)
+        if calls is None:
+            calls = self.pending[(function, args)] = dict()
+        if id(obj) not in calls:
+            calls[id(obj)] = (obj, loop.create_future())
+        return calls[id(obj)][1]
+
+    def dispatch(self):
+        pending, self.pending = self.pending, dict()
+        for (function, args), calls in pending.items():
+            asyncio.ensure_future(self.call(function, args, list(calls.values())))
+
+    async def call(self, function, args, calls):
+        try:
+            values = function([obj for obj, _ in calls], *args)
+            if inspect.isawaitable(values):
+                values = await values
+            values = _values(function, values, len(calls))
+        except Exception as e:
+            for _, future in calls:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), value in zip(calls, values):
+            if not future.done():
+                future.set_result(value)
+
+
+class Prefetch(object):
+    """
+    Batches the calls of the batch methods made by one synchronous execution
+    of a query over the values of its for clauses, see the comment above.
+    """
+
+    def __init__(self):
+        self.groups = list()  # the values registered since the last call
+        self.siblings = dict()  # id(obj) -> the values obj was registered in
+        self.loaded = dict()  # (function, args) -> {id(obj): (obj, value)}
+
+    def call(self, function, obj, args):
+        """
+        The value of the batch method function of obj called with args.
+        """
+        if inspect.iscoroutinefunction(function):
+            return _call(function, obj, args)
+        try:
+            loaded = self.loaded.setdefault((function, args), dict())
+        except TypeError:  # unhashable arguments
+            return _call(function, obj, args)
+        value = loaded.get(id(obj))
+        if value is not None and value[0] is obj:
+            return value[1]
+        for values in self.groups:
+            for x in values:
+                self.siblings[id(x)] = values
+        del self.groups[:]
+        objs = dict()
+        for x in self.siblings.get(id(obj), ()):
+            value = loaded.get(id(x))
+            if value is None or value[0] is not x:
+                objs[id(x)] = x
+        objs[id(obj)] = obj  # not registered or not the same object
+        objs = list(objs.values())
+        for x, value in zip(objs, _values(function, function(objs, *args), len(objs))):
+            loaded[id(x)] = (x, value)
+        return loaded[id(obj)][1]
+
+
+def group(values):
+    """
+    Registers the values of a for clause with the Prefetch of the execution
+    running, returns values.
+    """
+    prefetch = _prefetch.get()
+    if prefetch is not None and values.__class__ in (list, tuple):
+        prefetch.groups.append(values)
+    return values
+
+
+def groups(bindings):
+    """
+    Registers the values of each variable of bindings (tuples of the values
+    of the same variables) with the Prefetch of the execution running.
+    """
+    prefetch = _prefetch.get()
+    if prefetch is not None:
+        prefetch.groups.extend(zip(*bindings))
+    return bindings
+
+
+def prefetching():
+    """
+    Whether a Prefetch is running.
+    """
+    return _prefetch.get() is not None
+
+
+def prefetched(query):
+    """
+    query, executed with a Prefetch of its own.
+    """
+
+    @functools.wraps(query)
+    def prefetching(objs):
+        token = _prefetch.set(Prefetch())
+        try:
+            return query(objs)
+        finally:
+            _prefetch.reset(token)
+
+    return prefetching
@@ -0,0 +1,108 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: cache.py
+Purpose: A process wide cache of compiled queries.
+"""
+from builtins import object
+
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class QueryCache(object):
+    """
+    A bounded, thread safe, least recently used cache of compiled queries. The
+    cache is keyed on the query text together with the options it was compiled
+    with. Compiled queries do not hold any state between calls so a single
+    compiled function can be shared by every caller of the same query.
+
+    eg.
+        cache = QueryCache(maxsize=128)
+        q = cache.get("a/b", compile_function)
+    """
+
+    def __init__(self, maxsize=512):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative, got %d" % maxsize)
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(query, **options):
+        """
+        Computes the cache key for a query compiled with the given options.
+        """
+        return (query, tuple(sorted(options.items())))
+
+    def get(self, key, compiler):
+        """
+        Returns the compiled query stored under key. On a miss compiler() is
+        called to build it. The compilation happens outside of the lock so a
+        slow compile does not stall the other threads, if two threads race on
+        the same key the first one to finish wins.
+        """
+        with self._lock:
+            try:
+                compiled = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compiled
+        compiled = compiler()
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            if self._maxsize > 0:
+                self._entries[key] = compiled
+                self._evict()
+        return compiled
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative, got %d" % maxsize)
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def info(self):
+        """
+        Returns the hit and miss counters along with the size of the cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def clear(self):
+        """
+        Drops every cached query and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
@@ -0,0 +1,772 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: codegen.py
+Purpose: A compiler backend which turns a query into python source.
+"""
+from builtins import str
+from builtins import object
+
+import keyword
+import math
+import re
+from itertools import chain, islice
+from operator import itemgetter
+
+import pyflwor.indexes as indexes
+import pyflwor.batch as batch
+from pyflwor.symbols import (
+    Attribute,
+    Call,
+    HashJoin,
+    Scope,
+    _indexes,
+    _missing,
+    attr,
+    children,
+    index,
+    ordered,
+)
+
+# This module mirrors the functions in symbols.py. Instead of composing
+# closures each function returns a Fragment, a node which knows how to emit
+# itself as a python expression. generate() emits the fragments returned by
+# the parser into the source of a single module level function, query(objs),
+# and compiles it. Constructs which need statements (path expressions, flwr
+# expressions and quantifiers) are emitted as helper functions which take the
+# namespace and every variable bound at the point they are used as
+# parameters. Query variables become python locals named "v_<name>", all other
+# names are looked up in the namespace (objs) exactly as the closures do.
+#
+# Function definitions are not supported, generating them raises Unsupported
+# and the query is compiled with the closure backend instead.
+
+
+class Unsupported(Exception):
+    """
+    Raised while parsing when the query uses a construct this backend cannot
+    generate code for.
+    """
+
+
+def _flatten(tup):
+    if not isinstance(tup, tuple):
+        yield tup
+    else:
+        for i in tup:
+            if isinstance(i, tuple):
+                for j in _flatten(i):
+                    yield j
+            else:
+                yield i
+
+
+def _attr(obj, name):
+    x = attr(obj, name)
+    if x is _missing:
+        raise AttributeError(
+            "%r object has no attribute %r" % (obj.__class__.__name__, name)
+        )
+    return x
+
+
+runtime = {
+    "_missing": _missing,
+    "_children": children,
+    "_flatten": _flatten,
+    "_itemgetter": itemgetter,
+    "_HashJoin": HashJoin,
+    "_chain": chain,
+    "_islice": islice,
+    "_ordered": ordered,
+    "_Scope": Scope,
+    "_index": index,
+    "_attr": _attr,
+    "_lookup": indexes.lookup,
+    "_group": batch.group,
+    "_groups": batch.groups,
+    "_prefetching": batch.prefetching,
+}
+
+
+class Generator(object):
+    """
+    Collects the helper functions and constants of the query being generated.
+    """
+
+    def __init__(self):
+        self.helpers = list()
+        self.constants = dict()
+        self.count = 0
+
+    def name(self, prefix):
+        self.count += 1
+        return "_%s%d" % (prefix, self.count)
+
+    def constant(self, value):
+        name = self.name("k")
+        self.constants[name] = value
+        return name
+
+    def helper(self, prefix, env, body):
+        """
+        Defines a helper function taking the namespace and the bound variables
+        in env. body is called with the environment of the helper and returns
+        the lines of the function body. Returns the call expression.
+        """
+        name = self.name(prefix)
+        names = sorted(env)
+        inner = dict((n, "v_" + n) for n in names)
+        lines = [
+            "def %s(%s):" % (name, ", ".join(["objs"] + [inner[n] for n in names]))
+        ]
+        lines.extend("    " + line for line in body(inner))
+        self.helpers.append("\n".join(lines))
+        return "%s(%s)" % (name, ", ".join(["objs"] + [env[n] for n in names]))
+
+
+_local = re.compile(r"^[A-Za-z_]\w*$")
+
+
+def _bind(env, name, local):
+    env = dict(env)
+    env[name] = local
+    return env
+
+
+def _getattr(expr, name):
+    ## see symbols.attr, the common case of an attribute of a variable which
+    ## is not a dict is looked up without a call
+    if _local.match(expr) and not keyword.iskeyword(name):
+        return "(%s.%s if %s.__class__ is not dict else _attr(%s, %r))" % (
+            expr,
+            name,
+            expr,
+            expr,
+            name,
+        )
+    return "_attr(%s, %r)" % (expr, name)
+
+
+def _indent(lines, n=1):
+    return ["    " * n + line for line in lines]
+
+
+class Fragment(object):
+    def expr(self, gen, env):
+        """
+        Returns a python expression computing the value of the fragment. env
+        maps the query variables in scope to the python names holding them.
+        """
+        raise NotImplementedError
+
+    def iterate(self, gen, env):
+        """
+        Returns a python expression computing an iterator over the value of the
+        fragment. Path and flwr expressions override it to yield their results
+        as they are computed.
+        """
+        return "iter(%s)" % self.expr(gen, env)
+
+
+class Scalar(Fragment):
+    def __init__(self, value):
+        self.value = value
+
+    def expr(self, gen, env):
+        if isinstance(self.value, float) and not math.isfinite(self.value):
+            return gen.constant(self.value)  # repr is inf or nan, not a literal
+        if isinstance(self.value, (int, float, str)):
+            return repr(self.value)
+        return gen.constant(self.value)
+
+
+class Path(Fragment):
+    def __init__(self, attrs, probes=None):
+        self.attrs = attrs
+        self.lookups = dict()
+        for i, key, op, value in probes or ():
+            self.lookups.setdefault(i, []).append((key, op, value))
+
+    def expr(self, gen, env):
+        attr0 = self.attrs[0]
+        if attr0.name in env:
+            x = env[attr0.name]
+        else:
+            x = "objs[%r]" % attr0.name
+        x = self._calls(gen, env, x, attr0.callchain)
+        for attr in self.attrs[1:]:
+            x = self._calls(gen, env, _getattr(x, attr.name), attr.callchain)
+        return x
+
+    def _calls(self, gen, env, x, callchain):
+        for call in callchain or ():
+            params = [param.expr(gen, env) for param in call.params]
+            if call.lookup:
+                x = "%s[%s]" % (x, params[0])
+            else:
+                x = "%s(%s)" % (x, ", ".join(params))
+        return x
+
+
+class Binary(Fragment):
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+    def expr(self, gen, env):
+        return "(%s %s %s)" % (
+            self.left.expr(gen, env),
+            self.op,
+            self.right.expr(gen, env),
+        )
+
+
+class Unary(Fragment):
+    def __init__(self, op, value):
+        self.op = op
+        self.value = value
+
+    def expr(self, gen, env):
+        return "(%s %s)" % (self.op, self.value.expr(gen, env))
+
+
+class Bool(Fragment):
+    def __init__(self, value):
+        self.value = value
+
+    def expr(self, gen, env):
+        return "bool(%s)" % self.value.expr(gen, env)
+
+
+class Dict(Fragment):
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def expr(self, gen, env):
+        return "{%s}" % ", ".join(
+            "%s: %s" % (name.expr(gen, env), value.expr(gen, env))
+            for name, value in self.pairs
+        )
+
+
+class List(Fragment):
+    def __init__(self, values):
+        self.values = values
+
+    def expr(self, gen, env):
+        return "[%s]" % ", ".join(value.expr(gen, env) for value in self.values)
+
+
+class If(Fragment):
+    def __init__(self, condition, then, otherwise):
+        self.condition = condition
+        self.then = then
+        self.otherwise = otherwise
+
+    def expr(self, gen, env):
+        return "(%s if %s else %s)" % (
+            self.then.expr(gen, env),
+            self.condition.expr(gen, env),
+            self.otherwise.expr(gen, env),
+        )
+
+
+class Query(Fragment):
+    """
+    A path expression. Each step becomes a nested loop over the children of
+    the previous step, which yields the results in the same order as the
+    breadth first traversal of symbols.queryValue.
+    """
+
+    def __init__(self, attrs, probes=None):
+        self.attrs = attrs
+        self.lookups = dict()
+        for i, key, op, value in probes or ():
+            self.lookups.setdefault(i, []).append((key, op, value))
+
+    def expr(self, gen, env):
+        return gen.helper("p", env, lambda env: self._body(gen, env))
+
+    def iterate(self, gen, env):
+        return gen.helper("p", env, lambda env: self._body(gen, env, lazy=True))
+
+    def _body(self, gen, env, lazy=False):
+        name = self.attrs[0][0]
+        lines = list() if lazy else ["_r = []"]
+        if name in env:
+            lines.append("_v0 = %s" % env[name])
+            lines.extend(self._step(gen, env, 0, lazy))
+        else:
+            lines.append("if %r in objs:" % name)
+            lines.append("    _v0 = objs[%r]" % name)
+            lines.extend(_indent(self._step(gen, env, 0, lazy)))
+        if not lazy:
+            lines.append("return _r")
+        return lines
+
+    def _step(self, gen, env, i, lazy):
+        where = self.attrs[i][1]
+        node = "_n%d" % i
+        following = ", %r" % self.attrs[i + 1][0] if i + 1 < len(self.attrs) else ""
+        children = "_children(_v%d%s)" % (i, following)
+        if where is not None and not lazy:
+            ## see symbols.queryValue, the values are registered with the
+            ## Prefetch of the execution
+            children = "_group(%s)" % children
+        lines = ["for %s in %s:" % (node, children)]
+        if i in self.lookups:
+            ## see symbols.queryValue, an empty list found is not a scan
+            probes = [
+                "(%r, %r, lambda: %s)" % (key, op, value.expr(gen, env))
+                for key, op, value in self.lookups[i]
+            ]
+            lines = [
+                "_f%d = _lookup(_v%d, (%s,))" % (i, i, ", ".join(probes)),
+                "for %s in (%s if _f%d is None else _f%d):" % (node, children, i, i),
+            ]
+        if where is not None:
+            lines.append("    if not %s:" % where.expr(gen, _bind(env, "self", node)))
+            lines.append("        continue")
+        if i + 1 == len(self.attrs):
+            lines.append(("    yield %s" if lazy else "    _r.append(%s)") % node)
+            return lines
+        name = self.attrs[i + 1][0]
+        ## see symbols.queryValue, the steps read the keys of dicts
+        lines.append("    if %s.__class__ is dict:" % node)
+        lines.append("        _v%d = %s.get(%r, _missing)" % (i + 1, node, name))
+        lines.append("        if _v%d is _missing:" % (i + 1))
+        lines.append(
+            "            _v%d = getattr(%s, %r, _missing)" % (i + 1, node, name)
+        )
+        lines.append("    else:")
+        lines.append("        _v%d = getattr(%s, %r, _missing)" % (i + 1, node, name))
+        lines.append("    if _v%d is not _missing:" % (i + 1))
+        lines.extend(_indent(self._step(gen, env, i + 1, lazy), 2))
+        return lines
+
+
+class Quantified(Fragment):
+    def __init__(self, mode, name, s, satisfies, keys=None, probes=None):
+        if mode not in ("every", "some"):
+            raise Exception("mode '%s' is not 'every' or 'some'" % mode)
+        if keys and mode != "some":
+            raise Exception("only some can be evaluated as a semi-join")
+        self.mode = mode
+        self.name = name
+        self.s = s
+        self.satisfies = satisfies
+        self.keys = keys
+        self.probes = probes
+
+    def expr(self, gen, env):
+        return gen.helper("q", env, lambda env: self._body(gen, env))
+
+    def _body(self, gen, env):
+        local = "v_" + self.name
+        inner = _bind(env, self.name, local)
+        satisfies = self.satisfies.expr(gen, inner)
+        if self.keys:
+            ## see symbols.quantifiedValue
+            keys = [key.expr(gen, inner) for key in self.keys]
+            probes = [probe.expr(gen, env) for probe in self.probes]
+            return [
+                "_m = _index(objs, %s, lambda: %s, lambda %s: (%s,))"
+                % (
+                    gen.constant(object()),
+                    self.s.iterate(gen, env),
+                    local,
+                    ", ".join(keys),
+                ),
+                "if _m.empty():",
+                "    return False",
+                "for %s in _m.probe((%s,)):" % (local, ", ".join(probes)),
+                "    if %s:" % satisfies,
+                "        return True",
+                "return False",
+            ]
+        ## the elements are pulled one at a time, see symbols.quantifiedValue
+        lines = ["for %s in %s:" % (local, self.s.iterate(gen, env))]
+        if self.mode == "every":
+            lines.insert(0, "_empty = True")
+            lines.append("    _empty = False")
+            lines.extend(["    if not %s:" % satisfies, "        return False"])
+            lines.append("return not _empty")
+        else:
+            lines.extend(["    if %s:" % satisfies, "        return True"])
+            lines.append("return False")
+        return lines
+
+
+class Indexed(Fragment):
+    """
+    Layers the indexes of the semi-joins over the namespace, see
+    symbols.indexedQuery.
+    """
+
+    def __init__(self, query):
+        self.query = query
+
+    def expr(self, gen, env):
+        return gen.helper("i", env, lambda env: self._body(self.query.expr(gen, env)))
+
+    def iterate(self, gen, env):
+        return gen.helper(
+            "i", env, lambda env: self._body(self.query.iterate(gen, env))
+        )
+
+    def _body(self, value):
+        return ["objs = _Scope(objs, {%r: {}})" % _indexes, "return %s" % value]
+
+
+class FLWR(Fragment):
+    def __init__(
+        self,
+        return_expr,
+        for_expr=None,
+        let_expr=None,
+        where_expr=None,
+        order_expr=None,
+        flatten=False,
+        collecting=False,
+        join_expr=None,
+        filter_expr=None,
+        limit_expr=None,
+    ):
+        if flatten:
+            assert len(return_expr) == 1 and not isinstance(return_expr[0], tuple)
+            assert not collecting
+        if collecting and limit_expr:
+            raise Unsupported("limit in a collect expression")
+        self.return_expr = return_expr
+        self.limit_expr = limit_expr
+        self.join_expr = join_expr
+        self.filter_expr = filter_expr
+        self.for_expr = for_expr
+        self.let_expr = let_expr
+        self.where_expr = where_expr
+        self.order_expr = order_expr
+        self.flatten = flatten
+        self.collecting = collecting
+
+    def expr(self, gen, env):
+        if self.limit_expr and self.order_expr:
+            return gen.helper("f", env, lambda env: self._top(gen, env))
+        if self.limit_expr:
+            return "tuple(%s)" % self.iterate(gen, env)
+        return gen.helper("f", env, lambda env: self._body(gen, env))
+
+    def iterate(self, gen, env):
+        if self.collecting or self.order_expr:
+            return Fragment.iterate(self, gen, env)
+        results = gen.helper("f", env, lambda env: self._body(gen, env, lazy=True))
+        if not self.limit_expr:
+            return results
+        ## the generator is not resumed once the limit is reached
+        count, offset = self.limit_expr
+        stop = None if count is None else offset + count
+        return "_islice(%s, %d, %r)" % (results, offset, stop)
+
+    def _top(self, gen, env):
+        ## the results are generated lazily and ordered with a bounded heap
+        results = gen.helper("f", env, lambda env: self._body(gen, env, lazy=True))
+        return ["_r = %s" % results] + self._order(top=True)
+
+    def _return(self, gen, env, obj):
+        if len(obj) == 1 and not isinstance(obj[0], tuple):
+            return obj[0].expr(gen, env)
+        elif isinstance(obj[0], tuple):  # it has named return values
+            return "{%s}" % ", ".join(
+                "%r: %s" % (name, f.expr(gen, env)) for name, f in obj
+            )
+        else:  # multiple positional return values
+            return "(%s,)" % ", ".join(f.expr(gen, env) for f in obj)
+
+    def _body(self, gen, env, lazy=False):
+        lines = list()
+        loops = list()
+        checks = dict()  # the conditions of the filters by loop depth
+        inner = env
+        joins = dict(
+            (name, (keys, probes)) for name, keys, probes in self.join_expr or ()
+        )
+        filters = dict()
+        for name, where in self.filter_expr or ():
+            filters.setdefault(name, []).append(where)
+        ## see symbols.flwrSequence, the results read lazily (or up to a
+        ## limit) do not batch the calls of batch methods
+        group = "%s" if lazy else "_group(%s)"
+        for i, (name, seq) in enumerate(self.for_expr or ()):
+            ## every sequence is computed with the enclosing bindings before
+            ## the loops start, like the product taken by the closures.
+            if name in joins:
+                keys, probes = joins[name]
+                bound = _bind(env, name, "v_" + name)
+                lines.append(
+                    "_s%d = _HashJoin(%s, lambda v_%s: (%s,))"
+                    % (
+                        i,
+                        group % seq.expr(gen, env),
+                        name,
+                        ", ".join(key.expr(gen, bound) for key in keys),
+                    )
+                )
+                loops.append(
+                    "for v_%s in _s%d.probe((%s,)):"
+                    % (name, i, ", ".join(probe.expr(gen, inner) for probe in probes))
+                )
+            elif i == 0:
+                ## only iterated once so it can be streamed when lazy
+                if lazy:
+                    lines.append("_s0 = %s" % seq.iterate(gen, env))
+                else:
+                    lines.append("_s0 = _group(%s)" % seq.expr(gen, env))
+                loops.append("for v_%s in _s0:" % name)
+            else:
+                lines.append(
+                    "_s%d = %s" % (i, group % ("list(%s)" % seq.expr(gen, env)))
+                )
+                loops.append("for v_%s in _s%d:" % (name, i))
+            inner = _bind(inner, name, "v_" + name)
+            for where in filters.get(name, ()):
+                checks.setdefault(i, []).append(where.expr(gen, inner))
+        if self.collecting:
+            lines.append("_rets = (%s,)" % ", ".join("{}" for _ in self.return_expr))
+        elif not lazy:
+            lines.append("_r = []")
+        if not loops:
+            ## run the body once, like the closures do without a for clause
+            loops.append("for _ in (None,):")
+        head = list()  # the lets and the where
+        for name, let in self.let_expr or ():
+            head.append("v_%s = %s" % (name, let.expr(gen, inner)))
+            inner = _bind(inner, name, "v_" + name)
+        if self.where_expr:
+            head.append("if not %s:" % self.where_expr.expr(gen, inner))
+            head.append("    continue")
+        body = list()
+        if self.collecting:
+            for i, collector in enumerate(self.return_expr):
+                body.append(
+                    "_c%d = (%s, %s, %s)"
+                    % (
+                        i,
+                        self._return(gen, inner, collector["value"]),
+                        collector["as"].expr(gen, inner),
+                        collector["with"].expr(gen, inner),
+                    )
+                )
+            for i in range(len(self.return_expr)):
+                body.append("_d = _rets[%d]" % i)
+                body.append(
+                    "_d[_c%d[1]] = _c%d[2](_d.get(_c%d[1], None), _c%d[0])"
+                    % (i, i, i, i)
+                )
+        elif lazy and self.flatten:
+            body.append(
+                "for _i in _flatten(%s):" % self.return_expr[0].expr(gen, inner)
+            )
+            body.append("    yield _i")
+        elif lazy:
+            body.append("yield %s" % self._return(gen, inner, self.return_expr))
+        elif self.flatten:
+            body.append(
+                "_r.extend(_flatten(%s))" % self.return_expr[0].expr(gen, inner)
+            )
+        else:
+            body.append("_r.append(%s)" % self._return(gen, inner, self.return_expr))
+        nest = list()
+        for depth, loop in enumerate(loops):
+            nest.append("    " * depth + loop)
+            for condition in checks.get(depth, ()):
+                nest.extend(
+                    _indent(["if not %s:" % condition, "    continue"], depth + 1)
+                )
+        if lazy:
+            lines.extend(nest + _indent(head + body, len(loops)))
+        else:
+            ## with a Prefetch running the bindings passing the where are
+            ## collected first and registered, so the calls of the return
+            ## values are batched over them only
+            names = list()
+            for name, _ in list(self.for_expr or ()) + list(self.let_expr or ()):
+                if "v_" + name not in names:
+                    names.append("v_" + name)
+            frame = ", ".join(names) + ("," if names else "")
+            lines.append("if _prefetching():")
+            lines.extend(
+                _indent(
+                    ["_b = []"]
+                    + nest
+                    + _indent(head + ["_b.append((%s))" % frame], len(loops))
+                    + ["_groups(_b)", "for %s in _b:" % (frame or "_")]
+                    + _indent(body)
+                )
+            )
+            lines.append("else:")
+            lines.extend(_indent(nest + _indent(head + body, len(loops))))
+        if self.collecting:
+            if len(self.return_expr) == 1:
+                lines.append("return _rets[0]")
+            else:
+                lines.append("return _rets")
+            return lines
+        if lazy:
+            return lines
+        if self.order_expr:
+            lines.extend(self._order())
+        lines.append("return tuple(_r)")
+        return lines
+
+    def _order(self, top=False):
+        attr, direction = self.order_expr
+        if top:
+            lines = [
+                "_first = next(_r, _missing)",
+                "if _first is _missing:",
+                "    return ()",
+                "_r = _chain((_first,), _r)",
+            ]
+        else:
+            lines = ["if not _r:", "    return ()"]
+        if isinstance(attr, str):
+            if not isinstance(self.return_expr[0], tuple):
+                lines.append(
+                    "raise SyntaxError(%r)"
+                    % "Using a name in the order by clause when not using named return values."
+                )
+                return lines
+        else:
+            if isinstance(self.return_expr[0], tuple):
+                lines.append(
+                    "raise SyntaxError(%r)"
+                    % "Using a number in the order by clause when not using positional return values."
+                )
+                return lines
+        reverse = direction != "ASCD"
+        if top:
+            if len(self.return_expr) == 1 and not isinstance(
+                self.return_expr[0], tuple
+            ):
+                key = "None"
+            else:
+                key = "_itemgetter(%r)" % attr
+            count, offset = self.limit_expr
+            lines.append(
+                "return tuple(_ordered(_r, %s, %r, %r, %d))"
+                % (key, reverse, count, offset)
+            )
+        elif len(self.return_expr) == 1 and not isinstance(self.return_expr[0], tuple):
+            lines.append("_r.sort(reverse=%r)" % reverse)
+        else:
+            lines.append("_r.sort(key=_itemgetter(%r), reverse=%r)" % (attr, reverse))
+        return lines
+
+
+def attributeValue(attribute_list, scalar=False, context="locals"):
+    if scalar:
+        return Scalar(attribute_list)
+    return Path(attribute_list)
+
+
+def operator(op):
+    if op not in ("==", "!=", "<=", ">=", "<", ">"):
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+def arith_operator(op):
+    if op not in ("+", "-", "*", "/", "//"):
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+def setoperator(op):
+    if op not in ("|", "&", "-"):
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+def setexprOperator1(op):
+    if op not in ("in", "not in"):
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+_set_comparisons = {
+    "is": "==",
+    "is not": "!=",
+    "subset": "<=",
+    "superset": ">=",
+    "proper subset": "<",
+    "proper superset": ">",
+}
+
+
+def setexprOperator2(op):
+    if op not in _set_comparisons:
+        raise Exception("operator %s not found" % op)
+    return _set_comparisons[op]
+
+
+def booleanOperator(op):
+    if op not in ("and", "or"):
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+def unaryOperator(op):
+    if op != "not":
+        raise Exception("operator %s not found" % op)
+    return op
+
+
+comparisonValue = Binary
+arithValue = Binary
+setValue = Binary
+setexprValue1 = Binary
+setexprValue2 = Binary
+booleanexprValue = Binary
+unaryexprValue = Unary
+booleanValue = Bool
+dictValue = Dict
+listValue = List
+queryValue = Query
+quantifiedValue = Quantified
+indexedQuery = Indexed
+flwrSequence = FLWR
+ifExpr = If
+
+
+def whereValue(val):
+    return val
+
+
+def functionDefinition(params, query):
+    raise Unsupported("function definitions")
+
+
+def generate(fragment, lazy=False):
+    """
+    Generates and compiles the source for the query rooted at fragment.
+    Returns the query function, its source is stored in __source__. When lazy
+    the query function returns an iterator over the results.
+    """
+    gen = Generator()
+    if lazy:
+        body = fragment.iterate(gen, dict())
+    else:
+        body = fragment.expr(gen, dict())
+    source = "\n\n".join(gen.helpers + ["def query(objs):\n    return %s\n" % body])
+    namespace = dict(runtime)
+    namespace.update(gen.constants)
+    exec(compile(source, "<pyflwor>", "exec"), namespace)
+    query = namespace["query"]
+    object.__setattr__(query, "__source__", source)
+    object.__setattr__(query, "__objquery__", True)
+    return query
@@ -0,0 +1,507 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: columnar.py
+Purpose: Evaluates queries over tables of NumPy columns with array operations.
+"""
+from builtins import object
+
+import operator as _operators
+
+try:
+    import numpy
+except ImportError:  # there are no tables, every query is evaluated row by row
+    numpy = None
+
+from pyflwor.symbols import Attribute, Call, Scope, _missing, attr
+
+# This module is a parser backend like symbols.py and codegen.py. Its
+# functions build Vectors, functions of the namespace computing a column (an
+# array with the value of every row) at once with NumPy instead of one row at
+# a time. A table is a dict of equal length 1-D arrays (its columns) or a
+# structured array, the for variable over one is bound to its Columns.
+#
+# Only flwr expressions with one for clause over a table and path expressions
+# of one step are vectorised, with where clauses and return values made of
+# attributes of the row, constants, comparisons, arithmetic, and, or and not.
+# Anything else raises Unsupported while lowering and the query is evaluated
+# row by row (with the rows of the tables as Row objects). A query meeting
+# data it can not vectorise while running (a namespace value which is not a
+# table, a division by zero, an integer overflow, a TypeError) is evaluated
+# again row by row too.
+
+
+class Unsupported(Exception):
+    """
+    Raised when the query or the data it reads can not be vectorised.
+    """
+
+
+class Row(object):
+    """
+    A row of a table, its columns are its attributes.
+    """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+    def __eq__(self, other):
+        return isinstance(other, Row) and self.__dict__ == other.__dict__
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.__dict__.items())))
+
+    def __repr__(self):
+        return "Row(%s)" % ", ".join(
+            "%s=%r" % item for item in sorted(self.__dict__.items())
+        )
+
+
+def table(value):
+    """
+    The columns (a dict) of the table value, value itself when it is a 1-D
+    array of scalars or None.
+    """
+    if numpy is None:
+        return None
+    if isinstance(value, numpy.ndarray):
+        if value.ndim != 1:
+            return None
+        if value.dtype.names:
+            return dict((name, value[name]) for name in value.dtype.names)
+        return value
+    if not isinstance(value, dict) or not value:
+        return None
+    lengths = set()
+    for column in value.values():
+        if not isinstance(column, numpy.ndarray) or column.ndim != 1:
+            return None
+        lengths.add(len(column))
+    return value if len(lengths) == 1 else None
+
+
+def rows(value):
+    """
+    The rows of value (see table) for the row by row evaluation.
+    """
+    if not isinstance(value, dict):
+        return value
+    names = list(value)
+    return [
+        Row(zip(names, values))
+        for values in zip(*[value[name].tolist() for name in names])
+    ]
+
+
+class Columns(object):
+    """
+    The values of a for variable: the columns of a table or the values of a
+    1-D array.
+    """
+
+    def __init__(self, columns=None, values=None):
+        self.columns = columns
+        self.values = values
+
+    def __len__(self):
+        if self.values is not None:
+            return len(self.values)
+        return len(next(iter(self.columns.values())))
+
+    def select(self, index):
+        """
+        The rows selected by index, a boolean mask or a slice.
+        """
+        if isinstance(index, (bool, numpy.bool_)):
+            index = slice(None) if index else slice(0, 0)
+        if self.values is not None:
+            return Columns(values=self.values[index])
+        return Columns(
+            dict((name, column[index]) for name, column in self.columns.items())
+        )
+
+    def rows(self):
+        if self.values is not None:
+            return self.values.tolist()
+        return rows(self.columns)
+
+
+def _mask(value):
+    """
+    The truth value of each row of value.
+    """
+    if isinstance(value, numpy.ndarray):
+        if value.dtype == bool:
+            return value
+        if value.dtype.kind in "iufc":
+            return value != 0
+        raise Unsupported("the truth value of %s" % value.dtype)
+    if isinstance(value, Columns):
+        raise Unsupported("the truth value of a row")
+    return bool(value)
+
+
+def _column(value, n):
+    """
+    The value of each of the n rows as python objects.
+    """
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, Columns):
+        return value.rows()
+    return [value] * n
+
+
+def _vectors(*values):
+    for value in values:
+        if not isinstance(value, Vector):
+            raise Unsupported("path expressions inside expressions")
+
+
+def _values(*values):
+    """
+    Checks the values are used for their value, not only for their truth value.
+    """
+    _vectors(*values)
+    for value in values:
+        if isinstance(value, Mask):
+            raise Unsupported("the value of and, or")
+
+
+def _operand(value):
+    """
+    value as an operand of an array operation: a value which is not a column
+    nor a scalar (a list, a tuple) is compared with each row as a whole, not
+    broadcast over the rows.
+    """
+    if isinstance(value, (numpy.ndarray, numpy.generic)) or numpy.isscalar(value):
+        return value
+    if isinstance(value, Columns):
+        raise Unsupported("operations on rows")
+    operand = numpy.empty((), dtype=object)
+    operand[()] = value
+    return operand
+
+
+class Vector(object):
+    """
+    Computes a column, or a scalar when it does not depend on the rows.
+    """
+
+    def __init__(self, f):
+        self.f = f
+
+    def __call__(self, objs):
+        return self.f(objs)
+
+
+class Mask(Vector):
+    """
+    Computes the truth values of an and, or: the rows of a where clause. The
+    values of and, or are their operands, not truth values, they are only
+    vectorised where their truth value is taken.
+    """
+
+
+def attributeValue(attribute_list, scalar=False, context="locals"):
+    if scalar:
+        return Vector(lambda objs: attribute_list)
+    if any(a.callchain for a in attribute_list):
+        raise Unsupported("calls")
+    name = attribute_list[0].name
+    names = [a.name for a in attribute_list[1:]]
+
+    def value(objs):
+        try:
+            value = objs[name]
+        except KeyError:
+            raise Unsupported("undefined name %s" % name)
+        if isinstance(value, Columns):
+            if not names:
+                return value if value.values is None else value.values
+            if value.columns is None or len(names) > 1:
+                raise Unsupported("the attributes of the values of a column")
+            if names[0] not in value.columns:
+                raise Unsupported("a table without column %s" % names[0])
+            return value.columns[names[0]]
+        for n in names:
+            value = attr(value, n)
+            if value is _missing:
+                raise Unsupported("a missing attribute")
+        if isinstance(value, numpy.ndarray):
+            raise Unsupported("an array which is not a column")
+        return value
+
+    return Vector(value)
+
+
+def operator(op):
+    return {
+        "==": _operators.eq,
+        "!=": _operators.ne,
+        "<=": _operators.le,
+        ">=": _operators.ge,
+        "<": _operators.lt,
+        ">": _operators.gt,
+    }[op]
+
+
+def arith_operator(op):
+    return {
+        "+": _operators.add,
+        "-": _operators.sub,
+        "*": _operators.mul,
+        "/": _operators.truediv,
+        "//": _operators.floordiv,
+    }[op]
+
+
+def booleanOperator(op):
+    return {"and": numpy.logical_and, "or": numpy.logical_or}[op]
+
+
+def unaryOperator(op):
+    return numpy.logical_not
+
+
+def comparisonValue(value1, op, value2):
+    _values(value1, value2)
+    return Vector(lambda objs: op(_operand(value1(objs)), _operand(value2(objs))))
+
+
+## how close to the bounds of its dtype an integer result is taken to overflow,
+## the bounds are computed with floats
+_MARGIN = 1 - 2.0**-20
+
+
+def _exact(op, x, y):
+    """
+    op(x, y), raising Unsupported when it is an array of integers which
+    overflowed (the python ints of the rows do not).
+    """
+    value = op(x, y)
+    if isinstance(value, (numpy.ndarray, numpy.generic)) and value.dtype.kind in "iu":
+        bounds = numpy.asarray(
+            op(numpy.asarray(x, dtype=float), numpy.asarray(y, dtype=float))
+        )
+        info = numpy.iinfo(value.dtype)
+        if bounds.size and (
+            bounds.min() < info.min * _MARGIN or bounds.max() > info.max * _MARGIN
+        ):
+            raise Unsupported("an integer overflow")
+    return value
+
+
+def arithValue(value1, op, value2):
+    _values(value1, value2)
+    return Vector(
+        lambda objs: _exact(op, _operand(value1(objs)), _operand(value2(objs)))
+    )
+
+
+def booleanexprValue(value1, op, value2):
+    _vectors(value1, value2)
+    return Mask(lambda objs: op(_mask(value1(objs)), _mask(value2(objs))))
+
+
+def unaryexprValue(op, value):
+    _vectors(value)
+    return Vector(lambda objs: op(_mask(value(objs))))
+
+
+def booleanValue(value):
+    _vectors(value)
+    return Vector(lambda objs: _mask(value(objs)))
+
+
+def whereValue(value):
+    return value
+
+
+class Path(object):
+    """
+    A path expression of one step over a table: the rows (Columns) of the
+    table satisfying the where clause.
+    """
+
+    def __init__(self, name, where):
+        self.name = name
+        self.where = where
+
+    def select(self, objs):
+        try:
+            value = table(objs[self.name])
+        except KeyError:
+            value = None
+        if value is None:
+            raise Unsupported("%s is not a table" % self.name)
+        if isinstance(value, dict):
+            columns = Columns(value)
+        else:
+            columns = Columns(values=value)
+        if self.where is None:
+            return columns
+        return columns.select(_mask(self.where(Scope(objs, {"self": columns}))))
+
+    def __call__(self, objs):
+        return self.select(objs).rows()
+
+
+def queryValue(q, probes=None):
+    if len(q) != 1:
+        raise Unsupported("paths of more than one step")
+    name, where = q[0]
+    if where is not None:
+        _vectors(where)
+    return Path(name, where)
+
+
+class FLWR(object):
+    """
+    A flwr expression with one for clause over a table. The lets and the
+    where clause are computed for every row, then the rows are filtered and
+    the return values computed for the ones left.
+    """
+
+    def __init__(self, return_expr, name, path, let_expr, where_expr, filters, limit):
+        self.return_expr = return_expr
+        self.name = name
+        self.path = path
+        self.let_expr = let_expr or ()
+        self.where_expr = where_expr
+        self.filters = filters
+        self.limit = limit
+
+    def __call__(self, objs):
+        columns = self.path.select(objs)
+        for where in self.filters:
+            columns = columns.select(_mask(where(Scope(objs, {self.name: columns}))))
+        cobjs = Scope(objs, {self.name: columns})
+        lets = list()
+        for name, let in self.let_expr:
+            value = let(cobjs)
+            if isinstance(value, numpy.ndarray):
+                value = Columns(values=value)
+                lets.append(name)
+            cobjs[name] = value
+
+        def select(index):
+            cobjs[self.name] = cobjs[self.name].select(index)
+            for name in lets:
+                cobjs[name] = cobjs[name].select(index)
+
+        if self.where_expr:
+            select(_mask(self.where_expr(cobjs)))
+        if self.limit:
+            count, offset = self.limit
+            select(slice(offset, None if count is None else offset + count))
+        n = len(cobjs[self.name])
+        output = self.return_expr
+        if isinstance(output[0], tuple):
+            names = [name for name, _ in output]
+            columns = [_column(f(cobjs), n) for _, f in output]
+            return tuple(dict(zip(names, values)) for values in zip(*columns))
+        if len(output) == 1:
+            return tuple(_column(output[0](cobjs), n))
+        return tuple(zip(*[_column(f(cobjs), n) for f in output]))
+
+
+def flwrSequence(
+    return_expr,
+    for_expr=None,
+    let_expr=None,
+    where_expr=None,
+    order_expr=None,
+    flatten=False,
+    collecting=False,
+    join_expr=None,
+    filter_expr=None,
+    limit_expr=None,
+):
+    if collecting or flatten or order_expr or join_expr:
+        raise Unsupported("collect, flatten, order by and joins")
+    if not for_expr or len(for_expr) != 1 or not isinstance(for_expr[0][1], Path):
+        raise Unsupported("for clauses other than one over a table")
+    values = [value[1] if isinstance(value, tuple) else value for value in return_expr]
+    values += [let for _, let in let_expr or ()]
+    _values(*values)
+    _vectors(*[where for _, where in filter_expr or ()])
+    if where_expr is not None:
+        _vectors(where_expr)
+    name, path = for_expr[0]
+    return FLWR(
+        return_expr,
+        name,
+        path,
+        let_expr,
+        where_expr,
+        [where for _, where in filter_expr or ()],
+        limit_expr,
+    )
+
+
+def _unsupported(what):
+    def factory(*args, **kwargs):
+        raise Unsupported(what)
+
+    return factory
+
+
+setoperator = _unsupported("set operations")
+setexprOperator1 = _unsupported("in")
+setexprOperator2 = _unsupported("set comparisons")
+setValue = setexprValue1 = setexprValue2 = setoperator
+dictValue = _unsupported("dict literals")
+listValue = _unsupported("list literals")
+quantifiedValue = _unsupported("quantified expressions")
+indexedQuery = _unsupported("semi-joins")
+ifExpr = _unsupported("if expressions")
+functionDefinition = _unsupported("function definitions")
+
+
+def _rows(objs, names):
+    """
+    The namespace of the row by row evaluation, where the tables are lists
+    of rows.
+    """
+    tables = dict()
+    for name in names:
+        value = objs[name] if name in objs else None
+        if isinstance(table(value), dict):
+            tables[name] = rows(table(value))
+    return Scope(objs, tables) if tables else objs
+
+
+def generate(vector, query, names):
+    """
+    The query function evaluating vector (None when the query could not be
+    lowered to this backend) and falling back on query, the row by row
+    evaluation, when it can not. names are the names the query reads.
+    """
+    if numpy is None:
+        return query
+
+    def columnar(objs):
+        if vector is not None:
+            try:
+                with numpy.errstate(divide="raise", over="raise", invalid="raise"):
+                    return vector(objs)
+            except (
+                Unsupported,
+                FloatingPointError,
+                OverflowError,
+                TypeError,
+                ValueError,
+            ):
+                pass  # evaluated row by row, which raises the proper error
+        return query(_rows(objs, names))
+
+    object.__setattr__(columnar, "__objquery__", True)
+    return columnar
@@ -148,8 +148,7 @@ if __name__ == "__main__":
     print(
         "1. Get names of products that are ordered by at least one customer three different times."
     )
-    q = pyflwor.compile(
-        """
+    q = pyflwor.compile("""
             products
             [
                 some o1 in <orders> satisfies
@@ -167,8 +166,7 @@ if __name__ == "__main__":
                 )
             ]
             /name
-        """
-    )
+        """)
     t = q(locals())
     for x in t:
         print(x)
@@ -179,8 +177,7 @@ if __name__ == "__main__":
     print(
         "2. Get product names that are ordered by at least three customers in the same city."
     )
-    q = pyflwor.compile(
-        """
+    q = pyflwor.compile("""
             products
             [
                 some o1 in <orders> satisfies
@@ -200,8 +197,7 @@ if __name__ == "__main__":
                 )
             ]
             /name
-        """
-    )
+        """)
     for x in q(locals()):
         print(x)
     print()
@@ -211,8 +207,7 @@ if __name__ == "__main__":
     print(
         """3. Get product names that are ordered by at least one customer in each and every customer city listed in the database (universal quantification)."""
     )
-    q = pyflwor.compile(
-        """
+    q = pyflwor.compile("""
             products
             [
                 every c1 in <customers> satisfies
@@ -227,8 +222,7 @@ if __name__ == "__main__":
                 )
             ]
             /name
-        """
-    )
+        """)
     for x in q(locals()):
         print(x)
     print()
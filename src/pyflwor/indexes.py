@@ -0,0 +1,617 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: indexes.py
+Purpose: Collections with secondary indexes consulted by path expressions.
+"""
+from builtins import object
+
+import datetime
+import decimal
+import fractions
+from bisect import bisect_left, bisect_right, insort
+from weakref import WeakSet
+
+import pyflwor.symbols as symbols
+
+
+class Observable(object):
+    """
+    Mixin of the observable collections. The observers attached to one (eg.
+    an IndexedCollection) are told about every change through their methods:
+
+        inserted(where, item)       item was added at where
+        removed(where, item)        item was removed from where
+        replaced(where, old, new)   the item at where was replaced
+        updated(item)               the attributes of item changed
+        reset()                     anything else, start over
+
+    where is the position of the item in a list, the item itself in a set and
+    its key in a dict (of which the values are the items). Observers are held
+    by weak references.
+    """
+
+    def _observe(self):
+        self._observers = WeakSet()
+
+    def attach(self, observer):
+        self._observers.add(observer)
+
+    def detach(self, observer):
+        self._observers.discard(observer)
+
+    def changed(self, item):
+        """
+        Marks item as dirty: its attributes changed, so the indexes of the
+        observers must be updated.
+        """
+        for observer in list(self._observers):
+            observer.updated(item)
+
+    def _notify(self, event, *args):
+        for observer in list(self._observers):
+            getattr(observer, event)(*args)
+
+
+class ObservableList(Observable, list):
+    """
+    A list telling its observers about its changes. Slice assignments,
+    sorting and reversing reset the observers. An insertion or removal
+    anywhere but at the end shifts the positions after it, in the list and in
+    the observers keeping track of them (see Stamped): like list.insert it
+    costs a copy of the positions following it.
+    """
+
+    def __init__(self, items=()):
+        list.__init__(self, items)
+        self._observe()
+
+    def append(self, item):
+        list.append(self, item)
+        self._notify("inserted", len(self) - 1, item)
+
+    def extend(self, items):
+        for item in list(items):  # items may be the list itself
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, i, item):
+        i = max(0, min(len(self), i + len(self) if i < 0 else i))
+        list.insert(self, i, item)
+        self._notify("inserted", i, item)
+
+    def remove(self, item):
+        del self[self.index(item)]
+
+    def pop(self, i=-1):
+        item = self[i]
+        del self[i]
+        return item
+
+    def clear(self):
+        del self[:]
+
+    def __setitem__(self, i, item):
+        if isinstance(i, slice):
+            list.__setitem__(self, i, item)
+            self._notify("reset")
+            return
+        i = i + len(self) if i < 0 else i
+        old = self[i]
+        list.__setitem__(self, i, item)
+        self._notify("replaced", i, old, item)
+
+    def __delitem__(self, i):
+        if isinstance(i, slice):
+            list.__delitem__(self, i)
+            self._notify("reset")
+            return
+        i = i + len(self) if i < 0 else i
+        item = self[i]
+        list.__delitem__(self, i)
+        self._notify("removed", i, item)
+
+    def __imul__(self, n):
+        list.__imul__(self, n)
+        self._notify("reset")
+        return self
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._notify("reset")
+
+    def reverse(self):
+        list.reverse(self)
+        self._notify("reset")
+
+
+class ObservableSet(Observable, set):
+    """
+    A set telling its observers about its changes. The operators updating the
+    set in place reset the observers.
+    """
+
+    def __init__(self, items=()):
+        set.__init__(self, items)
+        self._observe()
+
+    def add(self, item):
+        if item not in self:
+            set.add(self, item)
+            self._notify("inserted", item, item)
+
+    def update(self, *others):
+        for items in others:
+            for item in items:
+                self.add(item)
+
+    def discard(self, item):
+        if item in self:
+            set.discard(self, item)
+            self._notify("removed", item, item)
+
+    def remove(self, item):
+        set.remove(self, item)
+        self._notify("removed", item, item)
+
+    def pop(self):
+        item = set.pop(self)
+        self._notify("removed", item, item)
+        return item
+
+    def clear(self):
+        set.clear(self)
+        self._notify("reset")
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __iand__(self, other):
+        set.__iand__(self, other)
+        self._notify("reset")
+        return self
+
+    def __isub__(self, other):
+        set.__isub__(self, other)
+        self._notify("reset")
+        return self
+
+    def __ixor__(self, other):
+        set.__ixor__(self, other)
+        self._notify("reset")
+        return self
+
+    def difference_update(self, *others):
+        set.difference_update(self, *others)
+        self._notify("reset")
+
+    def intersection_update(self, *others):
+        set.intersection_update(self, *others)
+        self._notify("reset")
+
+    def symmetric_difference_update(self, other):
+        set.symmetric_difference_update(self, other)
+        self._notify("reset")
+
+
+class ObservableDict(Observable, dict):
+    """
+    A dict telling its observers about changes to its values.
+    """
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._observe()
+
+    def __setitem__(self, key, value):
+        if key in self:
+            old = self[key]
+            dict.__setitem__(self, key, value)
+            self._notify("replaced", key, old, value)
+        else:
+            dict.__setitem__(self, key, value)
+            self._notify("inserted", key, value)
+
+    def __delitem__(self, key):
+        value = self[key]
+        dict.__delitem__(self, key)
+        self._notify("removed", key, value)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        value = self[key]
+        del self[key]
+        return value
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._notify("removed", key, value)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        self._notify("reset")
+
+
+## the types whose values are totally ordered (but for NaN), the values of
+## the other types (and NaN) are kept out of the sorted indexes
+_ORDERED = frozenset(
+    (
+        int,
+        float,
+        bool,
+        str,
+        bytes,
+        decimal.Decimal,
+        fractions.Fraction,
+        datetime.date,
+        datetime.datetime,
+        datetime.time,
+        datetime.timedelta,
+    )
+)
+
+
+def _ordered(value):
+    return value.__class__ in _ORDERED and value == value
+
+
+class _Index(object):
+    """
+    The hash and sorted indexes of one key, from the stamps of the items (see
+    IndexedCollection) to their values. The stamps of a value in the hash
+    index are in order. The sorted index is built by the first range lookup,
+    the values which are not ordered (NaN, a set) are left out of it and
+    found by every range lookup, the where clause testing them. Either
+    becomes None once a value can not be hashed or ordered.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        self.hashed = dict()
+        self.sorted = symbols._missing
+        try:
+            for stamp in sorted(values):
+                self.hashed.setdefault(values[stamp], []).append(stamp)
+        except TypeError:
+            self.hashed = None
+
+    def add(self, stamp, value):
+        self.values[stamp] = value
+        if self.hashed is not None:
+            try:
+                stamps = self.hashed.setdefault(value, [])
+            except TypeError:
+                self.hashed = None
+            else:
+                if not stamps or stamps[-1] < stamp:
+                    stamps.append(stamp)
+                else:
+                    insort(stamps, stamp)
+        if self.sorted is not None and self.sorted is not symbols._missing:
+            values, stamps, unordered = self.sorted
+            if not _ordered(value):
+                unordered[stamp] = None
+                return
+            try:
+                i = bisect_right(values, value)
+            except TypeError:
+                self.sorted = None
+            else:
+                values.insert(i, value)
+                stamps.insert(i, stamp)
+
+    def remove(self, stamp):
+        value = self.values.pop(stamp)
+        if self.hashed is not None:
+            stamps = self.hashed[value]
+            del stamps[bisect_left(stamps, stamp)]
+            if not stamps:
+                del self.hashed[value]
+        if self.sorted is not None and self.sorted is not symbols._missing:
+            values, stamps, unordered = self.sorted
+            if stamp in unordered:
+                del unordered[stamp]
+                return
+            i = bisect_left(values, value)
+            i += stamps[i : bisect_right(values, value)].index(stamp)
+            del values[i]
+            del stamps[i]
+
+    def find(self, op, value):
+        """
+        The stamps of the items whose value compares to value with op (a
+        superset for the range comparisons), in order for ==, or None.
+        """
+        if op == "==":
+            if self.hashed is None:
+                return None
+            return self.hashed.get(value, ())
+        if not _ordered(value):
+            return None
+        if self.sorted is symbols._missing:
+            unordered = dict()
+            order = list()
+            for stamp, v in self.values.items():
+                if _ordered(v):
+                    order.append(stamp)
+                else:
+                    unordered[stamp] = None
+            try:
+                order.sort(key=self.values.__getitem__)
+                self.sorted = (
+                    [self.values[stamp] for stamp in order],
+                    order,
+                    unordered,
+                )
+            except TypeError:
+                self.sorted = None  # the values can not be ordered
+        if self.sorted is None:
+            return None
+        values, stamps, unordered = self.sorted
+        if op == "<":
+            found = stamps[: bisect_left(values, value)]
+        elif op == "<=":
+            found = stamps[: bisect_right(values, value)]
+        elif op == ">":
+            found = stamps[bisect_right(values, value) :]
+        elif op == ">=":
+            found = stamps[bisect_left(values, value) :]
+        else:
+            return None
+        return found + list(unordered) if unordered else found
+
+
+class Stamped(object):
+    """
+    Base of the observers of an observable collection which keep track of
+    its items. Every item has a stamp, a number ordered like the items, and
+    subclasses are told through _added(stamp, item) and _removed(stamp, item)
+    about the items coming and going (an updated item is removed and added
+    again). The items of a dict are its key/value pairs. A collection which
+    is not observable is copied into an ObservableList (items).
+    """
+
+    def __init__(self, items):
+        if not isinstance(items, Observable):
+            items = ObservableList(items)
+        self.items = items
+        self._pairs = isinstance(items, dict)
+        items.attach(self)
+        self.reset()
+
+    ## The stamps of a list are kept in a list next to it, an item inserted in
+    ## the middle gets the number between the stamps of its neighbours (the
+    ## stamps after it are moved, not renumbered, but the insertion into the
+    ## list of stamps is O(n)). When there is no number left between them the
+    ## stamps are all reset. The stamps of sets and dicts only grow, so
+    ## _items is ordered by stamp.
+
+    def reset(self):
+        self._items = dict()  # stamp -> item
+        self._ids = dict()  # id of the item -> set of stamps
+        if isinstance(self.items, list):
+            self._stamps = list(range(len(self.items)))
+            for stamp, item in enumerate(self.items):
+                self._add(stamp, item, item)
+        else:
+            self._stamps = dict()
+            for where in self.items:
+                self._stamps[where] = len(self._stamps)
+                item = self.items[where] if self._pairs else where
+                self._add(self._stamps[where], where, item)
+        self._next = len(self._stamps)
+
+    def inserted(self, where, item):
+        if not isinstance(self._stamps, list):
+            self._stamps[where] = stamp = self._next
+            self._next += 1
+        elif where == len(self._stamps):
+            stamp = self._stamps[-1] + 1 if self._stamps else 0
+            self._stamps.append(stamp)
+        else:
+            low = self._stamps[where - 1] if where else self._stamps[0] - 1
+            stamp = (low + self._stamps[where]) / 2.0
+            if stamp in (low, self._stamps[where]):
+                return self.reset()  # out of numbers between them
+            self._stamps.insert(where, stamp)
+        self._add(stamp, where, item)
+
+    def removed(self, where, item):
+        stamp = self._stamps.pop(where)
+        self._forget(stamp)
+        del self._items[stamp]
+
+    def replaced(self, where, old, new):
+        ## the new item takes the place of the old one in _items
+        stamp = self._stamps[where]
+        self._forget(stamp)
+        self._add(stamp, where, new)
+
+    def updated(self, item):
+        for stamp in list(self._ids.get(id(item), ())):
+            stored = self._items[stamp]
+            self._removed(stamp, stored)
+            self._added(stamp, stored)
+
+    def _add(self, stamp, where, item):
+        stored = symbols.KeyValuePair(where, item) if self._pairs else item
+        self._items[stamp] = stored
+        self._ids.setdefault(id(item), set()).add(stamp)
+        self._added(stamp, stored)
+
+    def _forget(self, stamp):
+        stored = self._items[stamp]
+        item = stored.value if self._pairs else stored
+        stamps = self._ids[id(item)]
+        stamps.discard(stamp)
+        if not stamps:
+            del self._ids[id(item)]
+        self._removed(stamp, stored)
+
+    def _added(self, stamp, item):
+        pass
+
+    def _removed(self, stamp, item):
+        pass
+
+
+class IndexedCollection(Stamped):
+    """
+    A collection of items with indexes on the values of some of their
+    attribute paths (keys, eg. "customer.name", or "" for the item itself). A
+    path step over the collection whose where clause compares an indexed key
+    of self to a value which does not depend on self with ==, <, <=, > or >=
+    only tests the items the index finds for that value instead of every item:
+
+        orders = IndexedCollection(orders, "customer.name", "quantity")
+        pyflwor.execute('orders[self.customer.name == "Steve"]', locals())
+
+    Equality uses a hash index, the other comparisons a sorted index (searched
+    with bisect) which leaves out NaN and the values of types which are not
+    ordered, every range lookup tests them. Each index is built the first time
+    it is used. The where clause is still evaluated on the items found, so a
+    key whose values can not be hashed or ordered (or which some item does
+    not have) only loses its index: the collection is scanned as if it were a
+    list.
+
+    The items are copied into an ObservableList (items). Built over an
+    observable collection the IndexedCollection is a view of it instead and
+    keeps its indexes up to date as the collection changes: a change costs a
+    hash and a binary search per index, and an insertion into (or removal
+    from) the lists the sorted index and the stamps of a list are kept in,
+    which copies the entries after it (O(n), as list.insert, but a memmove).
+    Appending to a list or changing a set or dict only moves the entries
+    after the value in the sorted index. Call changed(item) on the
+    collection when the indexed attributes of one of its items change. The
+    items of a dict are its key/value pairs, as in any path step.
+    """
+
+    def __init__(self, items, *keys):
+        self.keys = keys
+        Stamped.__init__(self, items)
+
+    def __iter__(self):
+        if isinstance(self.items, list):
+            return iter(self.items)
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def __repr__(self):
+        return "IndexedCollection(%r, %s)" % (
+            self.items,
+            ", ".join(repr(key) for key in self.keys),
+        )
+
+    def reset(self):
+        self._indexes = dict()  # key -> _Index, or None when it is not usable
+        Stamped.reset(self)
+
+    def _added(self, stamp, stored):
+        for key, index in list(self._indexes.items()):
+            value = self._value(key, stored)
+            if index is None or value is symbols._missing:
+                del self._indexes[key]  # built again by the next lookup
+            else:
+                index.add(stamp, value)
+
+    def _removed(self, stamp, stored):
+        for key, index in list(self._indexes.items()):
+            if index is None or index.hashed is None or index.sorted is None:
+                del self._indexes[key]  # the culprit may be going away
+            else:
+                index.remove(stamp)
+
+    def _value(self, key, item):
+        for name in key.split(".") if key else ():
+            item = symbols.attr(item, name)
+            if item is symbols._missing:
+                break
+        return item
+
+    def _build(self, key):
+        if key not in self._indexes:
+            index = None
+            values = dict()
+            for stamp, item in self._items.items():
+                values[stamp] = self._value(key, item)
+                if values[stamp] is symbols._missing:
+                    break
+            else:
+                index = _Index(values)
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def lookup(self, key, op, value):
+        """
+        The items whose value of key compares to value with op, in the order
+        of the collection. Returns None when key has no usable index.
+        """
+        if key not in self.keys:
+            return None
+        index = self._build(key)
+        try:
+            stamps = index.find(op, value) if index is not None else None
+        except TypeError:
+            return None  # value can not be hashed or compared to the keys
+        if stamps is None:
+            return None
+        if op != "==":
+            stamps = self._ordered(stamps)
+        return [self._items[stamp] for stamp in stamps]
+
+    def _ordered(self, stamps):
+        """
+        The stamps (found by a range lookup, ordered by value) in the order of
+        the collection: sorted when they are few, else picked from all the
+        stamps in order.
+        """
+        if len(stamps) * 8 < len(self._items):
+            return sorted(stamps)
+        found = set(stamps)
+        order = self._stamps if isinstance(self._stamps, list) else self._items
+        return [stamp for stamp in order if stamp in found]
+
+
+def lookup(v, probes):
+    """
+    The items of v (when it is an IndexedCollection) found through its
+    indexes for one of the probes, a list of (key, op, value) where value is a
+    function returning the value to compare to. Returns None when there is no
+    index to use, the value of a probe is only computed when there is.
+    """
+    if not isinstance(v, IndexedCollection):
+        return None
+    for key, op, value in probes:
+        if key in v.keys:
+            found = v.lookup(key, op, value())
+            if found is not None:
+                return found
+    return None
@@ -10,6 +10,8 @@ Purpose: The lexer front end for the Query Compiler.
 """
 from builtins import object
 
+import threading
+
 from ply import lex
 from ply.lex import Token
 
@@ -44,6 +46,8 @@ tokens = (
     "BY",
     "ASCD",
     "DESC",
+    "LIMIT",
+    "OFFSET",
     "STAR",
     "DASH",
     "PLUS",
@@ -90,6 +94,8 @@ reserved = {
     "by": "BY",
     "ascd": "ASCD",
     "desc": "DESC",
+    "limit": "LIMIT",
+    "offset": "OFFSET",
     "function": "FUNCTION",
     "if": "IF",
     "then": "THEN",
@@ -110,10 +116,17 @@ E = r"[Ee][+-]?(" + D + ")+"
 # Normally PLY works at the module level. I perfer having it encapsulated as
 # a class. Thus the strange construction of this class in the new method allows
 # PLY to do its magic.
+#
+# By default the master regular expressions are loaded from the lextab module
+# shipped with the package instead of being rebuilt from the token rules. Pass
+# tables=False to build them from the rules below (eg. while editing them, see
+# parser.write_tables to regenerate the shipped tables).
 class Lexer(object):
-    def __new__(cls, **kwargs):
-        self = super(Lexer, cls).__new__(cls, **kwargs)
-        self.lexer = lex.lex(object=self, debug=False, optimize=True, **kwargs)
+    def __new__(cls, tables=True, **kwargs):
+        self = super(Lexer, cls).__new__(cls)
+        if tables:
+            kwargs.setdefault("lextab", "pyflwor.lextab")
+        self.lexer = lex.lex(object=self, debug=False, optimize=tables, **kwargs)
         return self.lexer
 
     tokens = tokens
@@ -232,6 +245,21 @@ class Lexer(object):
         t.lexer.skip(1)
 
 
+_local = threading.local()
+
+
+def get_lexer():
+    """
+    Returns a lexer owned by the calling thread, building it on first use.
+    The lexer is reset so it can be handed straight to the parser.
+    """
+    lexer = getattr(_local, "lexer", None)
+    if lexer is None:
+        lexer = _local.lexer = Lexer()
+    lexer.lineno = 1
+    return lexer
+
+
 if __name__ == "__main__":
     lexer = Lexer()
     print(lexer.input("."))
@@ -0,0 +1,704 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: nodes.py
+Purpose: The abstract syntax tree of a query.
+"""
+from builtins import object
+
+from pyflwor.symbols import Attribute, Call
+
+# This module is a parser backend (see parser.py) which builds an abstract
+# syntax tree instead of composing functions. The functions at the bottom of
+# the file have the same signatures as the ones in symbols.py and return the
+# nodes defined here. The optimizer (optimizer.py) rewrites the tree, then
+# lower() composes the tree into a query function with another backend
+# (symbols.py or codegen.py) by calling its functions bottom up.
+#
+# Every node provides:
+#   map(f)        a copy of the node with f applied to each direct child node.
+#   names()       the set of variable names the node refers to without binding
+#                 them itself (its free names).
+#   lower(b)      the node composed with backend b.
+
+
+class Node(object):
+    fields = ()
+
+    def map(self, f):
+        return self
+
+    def names(self):
+        return set()
+
+    def lower(self, backend):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "%s(%s)" % (
+            self.__class__.__name__,
+            ", ".join(repr(getattr(self, field)) for field in self.fields),
+        )
+
+
+def free_names(nodes):
+    names = set()
+    for node in nodes:
+        names |= node.names()
+    return names
+
+
+class Scalar(Node):
+    fields = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def lower(self, backend):
+        return backend.attributeValue(self.value, scalar=True)
+
+
+class AttributeValue(Node):
+    """
+    An attribute lookup chain, eg. x.y(1)[2].z. attrs is a list of
+    symbols.Attribute whose call parameters are nodes.
+    """
+
+    fields = ("attrs",)
+
+    def __init__(self, attrs):
+        self.attrs = attrs
+
+    @property
+    def name(self):
+        return self.attrs[0].name
+
+    def params(self):
+        for attr in self.attrs:
+            for call in attr.callchain or ():
+                for param in call.params:
+                    yield param
+
+    def map(self, f):
+        return AttributeValue(
+            [
+                Attribute(
+                    attr.name,
+                    (
+                        [
+                            Call([f(p) for p in call.params], call.lookup)
+                            for call in attr.callchain
+                        ]
+                        if attr.callchain
+                        else attr.callchain
+                    ),
+                )
+                for attr in self.attrs
+            ]
+        )
+
+    def names(self):
+        return set([self.name]) | free_names(self.params())
+
+    def lower(self, backend):
+        return backend.attributeValue(
+            [
+                backend.Attribute(
+                    attr.name,
+                    (
+                        [
+                            backend.Call(
+                                [p.lower(backend) for p in call.params], call.lookup
+                            )
+                            for call in attr.callchain
+                        ]
+                        if attr.callchain
+                        else attr.callchain
+                    ),
+                )
+                for attr in self.attrs
+            ]
+        )
+
+
+class Binary(Node):
+    """
+    The base of the nodes with two operands and an operator.
+    """
+
+    fields = ("left", "op", "right")
+    factory = None
+    operator = None
+
+    def __init__(self, left, op, right):
+        self.left = left
+        self.op = op
+        self.right = right
+
+    def map(self, f):
+        return self.__class__(f(self.left), self.op, f(self.right))
+
+    def names(self):
+        return self.left.names() | self.right.names()
+
+    def lower(self, backend):
+        return getattr(backend, self.factory)(
+            self.left.lower(backend),
+            getattr(backend, self.operator)(self.op),
+            self.right.lower(backend),
+        )
+
+
+class Comparison(Binary):
+    factory = "comparisonValue"
+    operator = "operator"
+
+
+class Arith(Binary):
+    factory = "arithValue"
+    operator = "arith_operator"
+
+
+class SetOperation(Binary):
+    factory = "setValue"
+    operator = "setoperator"
+
+
+class Membership(Binary):
+    factory = "setexprValue1"
+    operator = "setexprOperator1"
+
+
+class SetComparison(Binary):
+    factory = "setexprValue2"
+    operator = "setexprOperator2"
+
+
+class BooleanOp(Binary):
+    factory = "booleanexprValue"
+    operator = "booleanOperator"
+
+
+class Not(Node):
+    fields = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def map(self, f):
+        return Not(f(self.value))
+
+    def names(self):
+        return self.value.names()
+
+    def lower(self, backend):
+        return backend.unaryexprValue(
+            backend.unaryOperator("not"), self.value.lower(backend)
+        )
+
+
+class Bool(Node):
+    fields = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def map(self, f):
+        return Bool(f(self.value))
+
+    def names(self):
+        return self.value.names()
+
+    def lower(self, backend):
+        return backend.booleanValue(self.value.lower(backend))
+
+
+class DictLiteral(Node):
+    fields = ("pairs",)
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def map(self, f):
+        return DictLiteral([(f(name), f(value)) for name, value in self.pairs])
+
+    def names(self):
+        return free_names(n for pair in self.pairs for n in pair)
+
+    def lower(self, backend):
+        return backend.dictValue(
+            [(name.lower(backend), value.lower(backend)) for name, value in self.pairs]
+        )
+
+
+class ListLiteral(Node):
+    fields = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    def map(self, f):
+        return ListLiteral([f(value) for value in self.values])
+
+    def names(self):
+        return free_names(self.values)
+
+    def lower(self, backend):
+        return backend.listValue([value.lower(backend) for value in self.values])
+
+
+class If(Node):
+    fields = ("condition", "then", "otherwise")
+
+    def __init__(self, condition, then, otherwise):
+        self.condition = condition
+        self.then = then
+        self.otherwise = otherwise
+
+    def map(self, f):
+        return If(f(self.condition), f(self.then), f(self.otherwise))
+
+    def names(self):
+        return free_names((self.condition, self.then, self.otherwise))
+
+    def lower(self, backend):
+        return backend.ifExpr(
+            self.condition.lower(backend),
+            self.then.lower(backend),
+            self.otherwise.lower(backend),
+        )
+
+
+class Path(Node):
+    """
+    A path expression, eg. a/b[self.x == 1]/c. steps is a list of
+    (name, where) where where is a node or None. The first name refers to a
+    variable, each where binds self to the object being tested. probes is a
+    list of (i, key, op, node), comparisons of the where of step i which an
+    indexes.IndexedCollection can look up (see optimizer.index_lookups).
+    """
+
+    fields = ("steps", "probes")
+
+    def __init__(self, steps, probes=None):
+        self.steps = steps
+        self.probes = probes
+
+    def map(self, f):
+        return Path(
+            [(name, where and f(where)) for name, where in self.steps],
+            self.probes
+            and [(i, key, op, f(value)) for i, key, op, value in self.probes],
+        )
+
+    def names(self):
+        names = set([self.steps[0][0]])
+        for _, where in self.steps:
+            if where is not None:
+                names |= where.names() - set(["self"])
+        return names | free_names(value for _, _, _, value in self.probes or ())
+
+    def lower(self, backend):
+        return backend.queryValue(
+            [
+                (
+                    name,
+                    None if where is None else backend.whereValue(where.lower(backend)),
+                )
+                for name, where in self.steps
+            ],
+            probes=self.probes
+            and [
+                (i, key, op, value.lower(backend)) for i, key, op, value in self.probes
+            ],
+        )
+
+
+class Quantified(Node):
+    """
+    A quantified expression. keys and probes are lists of nodes, when given
+    the quantifier is a semi-join: the elements of s are indexed on the keys
+    (which only refer to name) and the ones whose keys equal the probes are
+    tested with satisfies.
+    """
+
+    fields = ("mode", "name", "s", "satisfies", "keys", "probes")
+
+    def __init__(self, mode, name, s, satisfies, keys=None, probes=None):
+        self.mode = mode
+        self.name = name
+        self.s = s
+        self.satisfies = satisfies
+        self.keys = keys
+        self.probes = probes
+
+    def map(self, f):
+        return Quantified(
+            self.mode,
+            self.name,
+            f(self.s),
+            f(self.satisfies),
+            self.keys and [f(key) for key in self.keys],
+            self.probes and [f(probe) for probe in self.probes],
+        )
+
+    def names(self):
+        names = self.s.names() | free_names(self.probes or ())
+        inner = free_names([self.satisfies] + list(self.keys or ()))
+        return names | (inner - set([self.name]))
+
+    def lower(self, backend):
+        return backend.quantifiedValue(
+            self.mode,
+            self.name,
+            self.s.lower(backend),
+            self.satisfies.lower(backend),
+            keys=self.keys and [key.lower(backend) for key in self.keys],
+            probes=self.probes and [probe.lower(backend) for probe in self.probes],
+        )
+
+
+class Shared(Node):
+    """
+    A subexpression which occurs more than once in the expressions evaluated
+    with the same variables bound (see optimizer.share_subexpressions), it is
+    computed once for each binding of them. Backends without a sharedValue
+    compute value every time.
+    """
+
+    fields = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def key(self):
+        return "<shared %r>" % (self.value,)
+
+    def map(self, f):
+        return Shared(f(self.value))
+
+    def names(self):
+        return self.value.names()
+
+    def lower(self, backend):
+        factory = getattr(backend, "sharedValue", None)
+        if factory is None:
+            return self.value.lower(backend)
+        return factory(self.key, sorted(self.names()), self.value.lower(backend))
+
+
+class Indexed(Node):
+    """
+    The root of a query with semi-joins, it holds the indexes they build
+    during an execution.
+    """
+
+    fields = ("query",)
+
+    def __init__(self, query):
+        self.query = query
+
+    def map(self, f):
+        return Indexed(f(self.query))
+
+    def names(self):
+        return self.query.names()
+
+    def lower(self, backend):
+        return backend.indexedQuery(self.query.lower(backend))
+
+
+class Function(Node):
+    fields = ("params", "body")
+
+    def __init__(self, params, body):
+        self.params = params
+        self.body = body
+
+    def map(self, f):
+        return Function(self.params, f(self.body))
+
+    def names(self):
+        return self.body.names() - set(self.params)
+
+    def lower(self, backend):
+        return backend.functionDefinition(self.params, self.body.lower(backend))
+
+
+def _output(output, f):
+    """
+    Applies f to every node of an output list (OutputTuple or OutputDict).
+    """
+    if isinstance(output[0], tuple):
+        return [(name, f(node)) for name, node in output]
+    return [f(node) for node in output]
+
+
+def _output_nodes(output):
+    if isinstance(output[0], tuple):
+        return [node for _, node in output]
+    return list(output)
+
+
+class FLWR(Node):
+    """
+    A flwr expression. The fields mirror the parameters of
+    symbols.flwrSequence: for_expr and let_expr are lists of (name, node),
+    return_expr is an output list or, when collecting, a list of collectors
+    ({"value": output list, "as": node, "with": node}), join_expr is a list
+    of (name, keys, probes) where keys and probes are lists of nodes and
+    filter_expr is a list of (name, node). order_expr and limit_expr are kept
+    as they were parsed.
+    """
+
+    fields = (
+        "return_expr",
+        "for_expr",
+        "let_expr",
+        "where_expr",
+        "order_expr",
+        "flatten",
+        "collecting",
+        "join_expr",
+        "filter_expr",
+        "limit_expr",
+    )
+
+    def __init__(
+        self,
+        return_expr,
+        for_expr=None,
+        let_expr=None,
+        where_expr=None,
+        order_expr=None,
+        flatten=False,
+        collecting=False,
+        join_expr=None,
+        filter_expr=None,
+        limit_expr=None,
+    ):
+        self.return_expr = return_expr
+        self.for_expr = for_expr
+        self.let_expr = let_expr
+        self.where_expr = where_expr
+        self.order_expr = order_expr
+        self.flatten = flatten
+        self.collecting = collecting
+        self.join_expr = join_expr
+        self.filter_expr = filter_expr
+        self.limit_expr = limit_expr
+
+    def copy(self, **changes):
+        fields = dict((field, getattr(self, field)) for field in self.fields)
+        fields.update(changes)
+        return FLWR(**fields)
+
+    def _returns(self, f):
+        if not self.collecting:
+            return _output(self.return_expr, f)
+        return [
+            {
+                "value": _output(collector["value"], f),
+                "as": f(collector["as"]),
+                "with": f(collector["with"]),
+            }
+            for collector in self.return_expr
+        ]
+
+    def return_nodes(self):
+        """
+        The nodes evaluated to build the result of each binding.
+        """
+        nodes = list()
+        self._returns(nodes.append)
+        return nodes
+
+    def map(self, f):
+        return self.copy(
+            return_expr=self._returns(f),
+            for_expr=self.for_expr and [(name, f(seq)) for name, seq in self.for_expr],
+            let_expr=self.let_expr and [(name, f(let)) for name, let in self.let_expr],
+            where_expr=self.where_expr and f(self.where_expr),
+            join_expr=self.join_expr
+            and [
+                (name, [f(key) for key in keys], [f(probe) for probe in probes])
+                for name, keys, probes in self.join_expr
+            ],
+            filter_expr=self.filter_expr
+            and [(name, f(where)) for name, where in self.filter_expr],
+        )
+
+    def names(self):
+        names = set()
+        bound = set()
+        for name, seq in self.for_expr or ():
+            names |= seq.names()
+            bound.add(name)
+        for name, keys, probes in self.join_expr or ():
+            names |= free_names(keys + probes) - bound
+        for name, where in self.filter_expr or ():
+            names |= where.names() - bound
+        for name, let in self.let_expr or ():
+            if isinstance(let, Function):
+                ## the function can refer to itself, see symbols.flwrSequence
+                bound.add(name)
+            names |= let.names() - bound
+            bound.add(name)
+        if self.where_expr:
+            names |= self.where_expr.names() - bound
+        names |= free_names(self.return_nodes()) - bound
+        return names
+
+    def lower(self, backend):
+        return backend.flwrSequence(
+            self._returns(lambda node: node.lower(backend)),
+            for_expr=self.for_expr
+            and [(name, seq.lower(backend)) for name, seq in self.for_expr],
+            let_expr=self.let_expr
+            and [(name, let.lower(backend)) for name, let in self.let_expr],
+            where_expr=self.where_expr and self.where_expr.lower(backend),
+            order_expr=self.order_expr,
+            flatten=self.flatten,
+            collecting=self.collecting,
+            join_expr=self.join_expr
+            and [
+                (
+                    name,
+                    [key.lower(backend) for key in keys],
+                    [probe.lower(backend) for probe in probes],
+                )
+                for name, keys, probes in self.join_expr
+            ],
+            filter_expr=self.filter_expr
+            and [(name, where.lower(backend)) for name, where in self.filter_expr],
+            limit_expr=self.limit_expr,
+        )
+
+
+class Output(Node):
+    """
+    An output list (see FLWR) computed as one value, the way
+    symbols.flwrSequence builds the value of each binding.
+    """
+
+    fields = ("output",)
+
+    def __init__(self, output):
+        self.output = output
+
+    def map(self, f):
+        return Output(_output(self.output, f))
+
+    def names(self):
+        return free_names(_output_nodes(self.output))
+
+    def lower(self, backend):
+        output = _output(self.output, lambda node: node.lower(backend))
+        if isinstance(output[0], tuple):
+
+            def value(objs):
+                return dict((name, f(objs)) for name, f in output)
+
+        elif len(output) == 1:
+            value = output[0]
+        else:
+
+            def value(objs):
+                return tuple(f(objs) for f in output)
+
+        return value
+
+
+def collectors(tree, reducers=True):
+    """
+    Rewrites a collecting flwr expression to return, for each binding, the
+    [as, with, value] of each of its collectors ([as, value] without the
+    reducers).
+    """
+    if isinstance(tree, Indexed):
+        return Indexed(collectors(tree.query, reducers))
+    return tree.copy(
+        collecting=False,
+        return_expr=[
+            ListLiteral(
+                [
+                    ListLiteral(
+                        [collector["as"]]
+                        + [collector["with"]] * reducers
+                        + [Output(collector["value"])]
+                    )
+                    for collector in tree.return_expr
+                ]
+            )
+        ],
+    )
+
+
+def walk(node):
+    """
+    Yields node and every node below it.
+    """
+    yield node
+    children = list()
+    node.map(lambda child: children.append(child) or child)
+    for child in children:
+        for n in walk(child):
+            yield n
+
+
+## The parser backend. Operators are kept as their source text.
+
+
+def attributeValue(attribute_list, scalar=False, context="locals"):
+    if scalar:
+        return Scalar(attribute_list)
+    return AttributeValue(attribute_list)
+
+
+def _operator(*ops):
+    def operator(op):
+        if op not in ops:
+            raise Exception("operator %s not found" % op)
+        return op
+
+    return operator
+
+
+operator = _operator("==", "!=", "<=", ">=", "<", ">")
+arith_operator = _operator("+", "-", "*", "/", "//")
+setoperator = _operator("|", "&", "-")
+setexprOperator1 = _operator("in", "not in")
+setexprOperator2 = _operator(
+    "is", "is not", "subset", "superset", "proper subset", "proper superset"
+)
+booleanOperator = _operator("and", "or")
+unaryOperator = _operator("not")
+
+comparisonValue = Comparison
+arithValue = Arith
+setValue = SetOperation
+setexprValue1 = Membership
+setexprValue2 = SetComparison
+booleanexprValue = BooleanOp
+booleanValue = Bool
+dictValue = DictLiteral
+listValue = ListLiteral
+ifExpr = If
+queryValue = Path
+quantifiedValue = Quantified
+indexedQuery = Indexed
+flwrSequence = FLWR
+functionDefinition = Function
+
+
+def unaryexprValue(op, val):
+    return Not(val)
+
+
+def whereValue(val):
+    return val
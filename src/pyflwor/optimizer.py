@@ -0,0 +1,648 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: optimizer.py
+Purpose: Rewrites the abstract syntax tree of a query before it is lowered.
+"""
+import pyflwor.nodes as nodes
+import pyflwor.symbols as symbols
+
+# Each pass is a function taking the root of the tree and returning the
+# rewritten tree, the passes never modify nodes in place. The rewrites only
+# change how much work a query does, the results are the same. The one
+# exception are the side effects of the expressions they drop or move: a
+# predicate may be evaluated fewer times or in a different order than written.
+
+
+def split_and(node):
+    """
+    Returns the operands of a chain of ands: a and b and c -> [a, b, c]
+    """
+    if isinstance(node, nodes.BooleanOp) and node.op == "and":
+        return split_and(node.left) + split_and(node.right)
+    return [node]
+
+
+def join_and(conjuncts):
+    """
+    The inverse of split_and. Returns None when there are no conjuncts.
+    """
+    if not conjuncts:
+        return None
+    node = conjuncts[0]
+    for conjunct in conjuncts[1:]:
+        node = nodes.BooleanOp(node, "and", conjunct)
+    return node
+
+
+class Capture(Exception):
+    """
+    Raised by rename when the new name would be captured by a binding inside
+    the expression.
+    """
+
+
+def rename(node, old, new):
+    """
+    Renames the free occurrences of the variable old to new. Raises Capture
+    when an occurrence is inside a binding of new (or, for flwr expressions,
+    of either name) as the rename would change its meaning.
+    """
+
+    def _rename(node):
+        if old not in node.names():
+            return node
+        if isinstance(node, nodes.AttributeValue):
+            node = node.map(_rename)
+            if node.name == old:
+                attrs = list(node.attrs)
+                attrs[0] = symbols.Attribute(new, attrs[0].callchain)
+                node = nodes.AttributeValue(attrs)
+            return node
+        if isinstance(node, nodes.Path):
+            steps = list()
+            for name, where in node.steps:
+                if where is not None and old in where.names():
+                    if new == "self":
+                        raise Capture(new)
+                    where = _rename(where)
+                steps.append((name, where))
+            if steps[0][0] == old:
+                steps[0] = (new, steps[0][1])
+            return nodes.Path(
+                steps,
+                node.probes
+                and [(i, key, op, _rename(value)) for i, key, op, value in node.probes],
+            )
+        if isinstance(node, nodes.Quantified):
+            if node.name == new:
+                raise Capture(new)
+            if node.name == old:
+                return nodes.Quantified(
+                    node.mode,
+                    node.name,
+                    _rename(node.s),
+                    node.satisfies,
+                    node.keys,
+                    node.probes and [_rename(probe) for probe in node.probes],
+                )
+        elif isinstance(node, nodes.Function):
+            if new in node.params:
+                raise Capture(new)
+        elif isinstance(node, nodes.FLWR):
+            binds = set(name for name, _ in node.for_expr or ())
+            binds.update(name for name, _ in node.let_expr or ())
+            if old in binds or new in binds:
+                raise Capture(new)
+        return node.map(_rename)
+
+    return _rename(node)
+
+
+def _fold(node):
+    node = node.map(_fold)
+    scalar = lambda n: isinstance(n, nodes.Scalar)
+    try:
+        if (
+            isinstance(node, nodes.Comparison)
+            and scalar(node.left)
+            and scalar(node.right)
+        ):
+            op = symbols.operator(node.op)
+            return nodes.Scalar(op(node.left.value, node.right.value))
+        if isinstance(node, nodes.Arith) and scalar(node.left) and scalar(node.right):
+            op = symbols.arith_operator(node.op)
+            return nodes.Scalar(op(node.left.value, node.right.value))
+    except Exception:
+        return node  # leave it to fail when the query runs
+    if isinstance(node, nodes.BooleanOp) and scalar(node.left):
+        ## x and y evaluates to x when x is false and to y otherwise
+        if bool(node.left.value) == (node.op == "and"):
+            return node.right
+        return node.left
+    if isinstance(node, nodes.Not) and scalar(node.value):
+        return nodes.Scalar(not node.value.value)
+    if isinstance(node, nodes.Bool) and scalar(node.value):
+        return nodes.Scalar(bool(node.value.value))
+    if isinstance(node, nodes.If) and scalar(node.condition):
+        return node.then if node.condition.value else node.otherwise
+    return node
+
+
+def fold_constants(tree):
+    """
+    Evaluates the arithmetic, comparisons and boolean operators whose operands
+    are literals, eg. -1 is parsed as -1.0 * 1 and folded into -1.0.
+    """
+    return _fold(tree)
+
+
+def _push(node):
+    node = node.map(_push)
+    if not isinstance(node, nodes.FLWR) or not node.where_expr or not node.for_expr:
+        return node
+    for_names = [name for name, _ in node.for_expr]
+    let_names = set(name for name, _ in node.let_expr or ())
+    bound = set(for_names) | let_names | set(["self"])
+    sources = dict(node.for_expr)
+    remaining = list()
+    for conjunct in split_and(node.where_expr):
+        refs = conjunct.names() & bound
+        var = refs.pop() if len(refs) == 1 else None
+        if (
+            var not in sources
+            or var in let_names
+            or for_names.count(var) != 1
+            or not isinstance(sources[var], nodes.Path)
+        ):
+            remaining.append(conjunct)
+            continue
+        try:
+            predicate = rename(conjunct, var, "self")
+        except Capture:
+            remaining.append(conjunct)
+            continue
+        path = sources[var]
+        name, where = path.steps[-1]
+        if where is not None:
+            predicate = nodes.BooleanOp(where, "and", predicate)
+        sources[var] = nodes.Path(path.steps[:-1] + [(name, predicate)], path.probes)
+    return node.copy(
+        for_expr=[(name, sources[name]) for name in for_names],
+        where_expr=join_and(remaining),
+    )
+
+
+def push_predicates(tree):
+    """
+    Moves the conjuncts of a flwr where clause which only refer to one for
+    variable into the last step of that variable's path expression, so
+    objects failing them never take part in the cartesian product:
+
+        for x in <a/b>, y in <c> where x.q > 1 and x.q < y.q return x
+    becomes
+        for x in <a/b[self.q > 1]>, y in <c> where x.q < y.q return x
+    """
+    return _push(tree)
+
+
+def _join(node):
+    node = node.map(_join)
+    if not isinstance(node, nodes.FLWR) or not node.where_expr or not node.for_expr:
+        return node
+    for_names = [name for name, _ in node.for_expr]
+    if len(set(for_names)) != len(for_names):
+        return node
+    let_names = set(name for name, _ in node.let_expr or ())
+    bound = set(for_names) | let_names | set(["self"])
+    joins = dict((name, ([], [])) for name in for_names)
+    remaining = list()
+    for conjunct in split_and(node.where_expr):
+        if isinstance(conjunct, nodes.Comparison) and conjunct.op == "==":
+            for key, probe in (
+                (conjunct.left, conjunct.right),
+                (conjunct.right, conjunct.left),
+            ):
+                refs = key.names() & bound
+                if len(refs) != 1 or refs & (let_names | set(["self"])):
+                    continue
+                name = refs.pop()
+                earlier = set(for_names[: for_names.index(name)])
+                refs = probe.names() & bound
+                ## a let shadowing a for variable is bound after the join
+                if refs and refs <= earlier and not refs & let_names:
+                    joins[name][0].append(key)
+                    joins[name][1].append(probe)
+                    break
+            else:
+                remaining.append(conjunct)
+            continue
+        remaining.append(conjunct)
+    join_expr = [(name,) + joins[name] for name in for_names if joins[name][0]]
+    if not join_expr:
+        return node
+    return node.copy(where_expr=join_and(remaining), join_expr=join_expr)
+
+
+def plan_joins(tree):
+    """
+    Turns the equality conjuncts of a flwr where clause between an expression
+    of one for variable and an expression of the for variables before it into
+    hash joins: the values of the later variable are indexed on their side of
+    the equality and only the matching ones are bound.
+
+        for a in <A>, b in <B> where a.x == b.y return a, b
+
+    indexes B on b.y and binds b to the items whose y equals a.x instead of
+    testing every pair. The bindings come out in the same order as the
+    cartesian product.
+    """
+    return _join(tree)
+
+
+def _filter(node):
+    node = node.map(_filter)
+    if not isinstance(node, nodes.FLWR) or not node.where_expr or not node.for_expr:
+        return node
+    for_names = [name for name, _ in node.for_expr]
+    if len(set(for_names)) != len(for_names):
+        return node
+    let_names = set(name for name, _ in node.let_expr or ())
+    bound = set(for_names) | let_names | set(["self"])
+    filters = list()
+    remaining = list()
+    for conjunct in split_and(node.where_expr):
+        refs = conjunct.names() & bound
+        if refs & (let_names | set(["self"])):
+            remaining.append(conjunct)
+            continue
+        level = max([for_names.index(name) for name in refs] or [0])
+        filters.append((level, conjunct))
+    if not filters:
+        return node
+    ## sorted() is stable so the conjuncts of a level keep their order
+    filters = sorted(filters, key=lambda f: f[0])
+    return node.copy(
+        where_expr=join_and(remaining),
+        filter_expr=(node.filter_expr or [])
+        + [(for_names[level], conjunct) for level, conjunct in filters],
+    )
+
+
+def filter_early(tree):
+    """
+    Moves the conjuncts of a flwr where clause which do not refer to a let
+    variable into filters checked as soon as the last for variable they refer
+    to is bound, so the bindings failing them are never extended with the
+    later for variables:
+
+        for a in <A>, b in <B>, c in <C> where a.x < b.x and c.y return a, b, c
+
+    checks a.x < b.x once per (a, b) pair rather than once per (a, b, c).
+    """
+    return _filter(tree)
+
+
+def _map_scoped(node, f, bound):
+    """
+    Applies f(child, names) to the children of node where names is bound plus
+    the variables node binds around the child. Every variable of a flwr
+    expression is taken as bound in all of its clauses.
+    """
+    if isinstance(node, nodes.Path):
+        inner = bound | set(["self"])
+        return node.map(lambda child: f(child, inner))
+    if isinstance(node, nodes.Quantified):
+        inner = bound | set([node.name])
+        return nodes.Quantified(
+            node.mode,
+            node.name,
+            f(node.s, bound),
+            f(node.satisfies, inner),
+            node.keys and [f(key, inner) for key in node.keys],
+            node.probes and [f(probe, bound) for probe in node.probes],
+        )
+    if isinstance(node, nodes.Function):
+        inner = bound | set(node.params)
+        return node.map(lambda child: f(child, inner))
+    if isinstance(node, nodes.FLWR):
+        inner = set(bound)
+        inner.update(name for name, _ in node.for_expr or ())
+        inner.update(name for name, _ in node.let_expr or ())
+        return node.map(lambda child: f(child, inner))
+    return node.map(lambda child: f(child, bound))
+
+
+def _sink(path, name, bound):
+    """
+    Splits the conjuncts of the last where clause of path referring to the
+    variables in bound out of it, they are returned with self renamed to name.
+    """
+    last, where = path.steps[-1]
+    keep = list()
+    moved = list()
+    for conjunct in split_and(where) if where is not None else ():
+        if (conjunct.names() - set(["self"])) & bound and name not in conjunct.names():
+            try:
+                moved.append(rename(conjunct, "self", name))
+                continue
+            except Capture:
+                pass
+        keep.append(conjunct)
+    probes = [probe for probe in path.probes or () if probe[0] != len(path.steps) - 1]
+    return nodes.Path(path.steps[:-1] + [(last, join_and(keep))], probes or None), moved
+
+
+def _correlate(conjuncts, name, bound, hidden=frozenset()):
+    """
+    Splits the equalities between an expression of name (and of variables not
+    in bound) and an expression not referring to name out of conjuncts and out
+    of the conditions of the quantifiers among them, whose variables are in
+    hidden. Returns the remaining conjuncts, the keys and the probes.
+    """
+    keys = list()
+    probes = list()
+    remaining = list()
+    for conjunct in conjuncts:
+        if isinstance(conjunct, nodes.Quantified) and conjunct.name != name:
+            ## a quantifier is false when a conjunct of its condition which
+            ## does not refer to its variable is
+            inner, k, p = _correlate(
+                split_and(conjunct.satisfies),
+                name,
+                bound,
+                hidden | set([conjunct.name]),
+            )
+            if k:
+                conjunct = nodes.Quantified(
+                    conjunct.mode,
+                    conjunct.name,
+                    conjunct.s,
+                    join_and(inner) or nodes.Scalar(True),
+                    conjunct.keys,
+                    conjunct.probes,
+                )
+                keys.extend(k)
+                probes.extend(p)
+        elif isinstance(conjunct, nodes.Comparison) and conjunct.op == "==":
+            for key, probe in (
+                (conjunct.left, conjunct.right),
+                (conjunct.right, conjunct.left),
+            ):
+                refs = key.names()
+                if (
+                    name in refs
+                    and not (refs - set([name])) & (bound | hidden)
+                    and not probe.names() & (hidden | set([name]))
+                ):
+                    keys.append(key)
+                    probes.append(probe)
+                    break
+            else:
+                remaining.append(conjunct)
+            continue
+        remaining.append(conjunct)
+    return remaining, keys, probes
+
+
+def _semi(node, bound):
+    node = _map_scoped(node, _semi, bound)
+    if not isinstance(node, nodes.Quantified) or node.mode != "some" or node.keys:
+        return node
+    s = node.s
+    conjuncts = split_and(node.satisfies)
+    if isinstance(s, nodes.Path) and s.names() & bound:
+        path, moved = _sink(s, node.name, bound)
+        if not path.names() & bound:
+            s, conjuncts = path, moved + conjuncts
+    if s.names() & bound:
+        return node
+    remaining, keys, probes = _correlate(conjuncts, node.name, bound)
+    if not keys:
+        return node
+    return nodes.Quantified(
+        node.mode,
+        node.name,
+        s,
+        join_and(remaining) or nodes.Scalar(True),
+        keys,
+        probes,
+    )
+
+
+def semi_joins(tree):
+    """
+    Evaluates the some quantifiers whose condition tests the quantified
+    variable for equality with an outer expression through an index of the
+    quantified collection:
+
+        products[some o in <orders> satisfies (self == o.product and o.qty > 1)]
+
+    indexes orders on o.product once per execution and only tests the orders
+    of each product instead of all of them. The collection may not refer to
+    the variables bound around the quantifier, the conjuncts of the last where
+    clause of a path which do are moved into the condition. The equalities
+    found in the conditions of nested quantifiers are used as well, so
+
+        some a in <A> satisfies (some b in <B> satisfies (a.x == self and ...))
+
+    only tests the a whose x equals self.
+    """
+    if isinstance(tree, nodes.Indexed):
+        tree = tree.query
+    tree = _semi(tree, set())
+    for node in nodes.walk(tree):
+        if isinstance(node, nodes.Quantified) and node.keys:
+            return nodes.Indexed(tree)
+    return tree
+
+
+_flipped = {"==": "==", "<": ">", "<=": ">=", ">": "<", ">=": "<="}
+
+
+def _key(node):
+    """
+    The key (see indexes.IndexedCollection) of an attribute chain of self
+    without calls, or None.
+    """
+    if not isinstance(node, nodes.AttributeValue) or node.name != "self":
+        return None
+    if any(attr.callchain for attr in node.attrs):
+        return None
+    return ".".join(attr.name for attr in node.attrs[1:])
+
+
+def _lookups(node):
+    node = node.map(_lookups)
+    if not isinstance(node, nodes.Path):
+        return node
+    probes = list()
+    for i, (_, where) in enumerate(node.steps):
+        for conjunct in split_and(where) if where is not None else ():
+            if (
+                not isinstance(conjunct, nodes.Comparison)
+                or conjunct.op not in _flipped
+            ):
+                continue
+            for side, value, op in (
+                (conjunct.left, conjunct.right, conjunct.op),
+                (conjunct.right, conjunct.left, _flipped[conjunct.op]),
+            ):
+                key = _key(side)
+                if key is not None and "self" not in value.names():
+                    probes.append((i, key, op, value))
+                    break
+    if not probes:
+        return node
+    ## sorted() is stable, the equalities are tried first
+    return nodes.Path(node.steps, sorted(probes, key=lambda p: p[2] != "=="))
+
+
+def index_lookups(tree):
+    """
+    Records the comparisons between an attribute chain of self and a value not
+    depending on self in the where clauses of path expressions. When the path
+    step is over an indexes.IndexedCollection with an index on the chain the
+    items are looked up in it instead of being scanned:
+
+        orders[self.customer.name == "Steve" and self.quantity > 10]
+
+    probes the customer.name index of orders (if it has one, else the quantity
+    one). The where clause is still checked on the items found.
+    """
+    return _lookups(tree)
+
+
+def _pure(node):
+    ## function calls may have side effects, everything else is assumed not to
+    for n in nodes.walk(node):
+        if isinstance(n, nodes.AttributeValue):
+            for attr in n.attrs:
+                if any(not call.lookup for call in attr.callchain or ()):
+                    return False
+    return True
+
+
+def _dead_lets(node):
+    node = node.map(_dead_lets)
+    if not isinstance(node, nodes.FLWR) or not node.let_expr:
+        return node
+    live = nodes.free_names(node.return_nodes())
+    if node.where_expr:
+        live |= node.where_expr.names()
+    lets = list()
+    for name, let in reversed(node.let_expr):
+        if name not in live and _pure(let):
+            continue
+        live.discard(name)
+        live |= let.names()
+        lets.append((name, let))
+    lets.reverse()
+    return node.copy(let_expr=lets or None)
+
+
+def eliminate_dead_lets(tree):
+    """
+    Drops the let definitions of a flwr expression which are never used, as
+    long as computing them does not call any functions.
+    """
+    return _dead_lets(tree)
+
+
+## the nodes evaluated in frames of their own (see _share)
+_frames = (nodes.Path, nodes.Quantified, nodes.FLWR, nodes.Function)
+
+
+def _shareable(node):
+    ## the arithmetic and the attribute chains without function calls. a
+    ## name with one or two attributes is looked up with one attrgetter, which
+    ## costs about what reading the value kept in the frame does, it is not
+    ## shared
+    if isinstance(node, nodes.AttributeValue):
+        if len(node.attrs) <= 3 and not any(attr.callchain for attr in node.attrs):
+            return False
+    elif not isinstance(node, nodes.Arith):
+        return False
+    for n in nodes.walk(node):
+        if not isinstance(n, (nodes.AttributeValue, nodes.Arith, nodes.Scalar)):
+            return False
+    return _pure(node) and bool(node.names())
+
+
+def _frame(exprs):
+    """
+    Wraps the subexpressions occurring more than once in the expressions
+    exprs in nodes.Shared, returns the function rewriting one of them.
+    """
+    counts = dict()
+
+    def count(node):
+        if isinstance(node, _frames):
+            return node
+        if _shareable(node):
+            counts[repr(node)] = counts.get(repr(node), 0) + 1
+        return node.map(count)
+
+    def share(node):
+        if isinstance(node, _frames):
+            return node
+        if counts.get(repr(node), 0) > 1 and _shareable(node):
+            return nodes.Shared(node)
+        return node.map(share)
+
+    for expr in exprs:
+        count(expr)
+    return share
+
+
+def _share(node):
+    node = node.map(_share)
+    if isinstance(node, nodes.Path):
+        steps = list()
+        for name, where in node.steps:
+            if where is not None:
+                where = _frame([where])(where)
+            steps.append((name, where))
+        return nodes.Path(steps, node.probes)
+    if isinstance(node, nodes.Quantified):
+        share = _frame([node.satisfies])
+        return nodes.Quantified(
+            node.mode, node.name, node.s, share(node.satisfies), node.keys, node.probes
+        )
+    if not isinstance(node, nodes.FLWR):
+        return node
+    ## the lets, where and return values of a binding
+    exprs = [let for _, let in node.let_expr or ()] + node.return_nodes()
+    if node.where_expr:
+        exprs.append(node.where_expr)
+    share = _frame(exprs)
+    filters = dict()
+    for name, where in node.filter_expr or ():
+        filters.setdefault(name, []).append(where)
+    filters = dict((name, _frame(wheres)) for name, wheres in filters.items())
+    return node.copy(
+        let_expr=node.let_expr and [(name, share(let)) for name, let in node.let_expr],
+        where_expr=node.where_expr and share(node.where_expr),
+        return_expr=node._returns(share),
+        filter_expr=node.filter_expr
+        and [(name, filters[name](where)) for name, where in node.filter_expr],
+    )
+
+
+def share_subexpressions(tree):
+    """
+    Computes the attribute chains and arithmetic which occur more than once in
+    the expressions evaluated for the same binding once per binding:
+
+        orders[self.customer.city == "Porto" or self.customer.city == "Lisbon"]
+
+    looks self.customer.city up once for each order. The value is kept in the
+    scope of the binding, it is computed again when a variable it refers to
+    is bound to another object. The expressions evaluated
+    for a binding are the where clause of a path step, the condition of a
+    quantifier, the lets, where and return values of a flwr expression and
+    the filters of each of its for variables (see filter_early).
+    """
+    return _share(tree)
+
+
+passes = [
+    fold_constants,
+    push_predicates,
+    plan_joins,
+    filter_early,
+    semi_joins,
+    index_lookups,
+    eliminate_dead_lets,
+    share_subexpressions,
+]
+
+
+def optimize(tree):
+    for p in passes:
+        tree = p(tree)
+    return tree
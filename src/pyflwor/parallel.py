@@ -0,0 +1,320 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: parallel.py
+Purpose: Evaluates queries in a pool of workers.
+"""
+from builtins import object
+
+import os
+import pickle
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+import pyflwor.nodes as nodes
+import pyflwor.symbols as symbols
+from pyflwor.cache import QueryCache
+
+# The work is split by evaluating chunk queries, queries reading a list of
+# values (the chunk, bound to CHUNK) which are evaluated for each batch of
+# the values by the pool. Their results are concatenated in order.
+#
+# A flwr expression is evaluated in parallel by splitting the values of its
+# first for clause (the outer loop): its chunk query is the flwr expression
+# with the first for clause iterating over the chunk. The ordering and the
+# limit are applied again to the concatenation, each chunk only returning its
+# first offset + limit results. A collect expression returns the as values and
+# the values of its bindings instead, they are folded with the with functions
+# by the caller in the order of the bindings, so any reducer gives the result
+# it gives sequentially.
+#
+# A path expression is traversed one step at a time (level by level): the
+# values each step reaches from the values of the previous one are computed
+# by the caller, then its where is tested by the pool, the chunk query being
+# for self in <chunk> return bool(where). The values are kept in the order the
+# breadth first traversal of symbols.queryValue finds them.
+#
+# In a process pool the workers receive the chunk query, the namespace values
+# it reads and the chunk pickled (by the caller), they compile the chunk query
+# once per process and keep the last compiled ones. The values are copies of
+# the caller's. The process pool created for workers is shut down with the
+# query function (or at exit).
+#
+# The semi-joins of the optimizer (see optimizer.semi_joins) make the root of
+# the tree a nodes.Indexed. The query under it is evaluated in parallel, each
+# chunk query building the indexes it needs (as a sequential execution does).
+
+## the name the chunk is bound to, which no query can refer to
+CHUNK = "<chunk>"
+
+
+def split(tree):
+    """
+    The (sequence, chunk query, collect) of a flwr expression which can be
+    evaluated in parallel or None. sequence is the path expression of the
+    first for clause, chunk query the tree iterating over CHUNK instead and
+    collect the with expression of each collector (the chunk query returns
+    the as value and the value of each instead).
+    """
+    if not isinstance(tree, nodes.FLWR) or not tree.for_expr:
+        return None
+    name, seq = tree.for_expr[0]
+    if not isinstance(seq, nodes.Path):
+        return None
+    chunk = tree.copy(
+        for_expr=[(name, nodes.Path([(CHUNK, None)]))] + tree.for_expr[1:]
+    )
+    if tree.limit_expr:
+        count, offset = tree.limit_expr
+        chunk = chunk.copy(limit_expr=None if count is None else (offset + count, 0))
+    if not tree.collecting:
+        return seq, chunk, None
+    ## the reducers are evaluated by the caller, without the bindings
+    bound = set(name for name, _ in tree.for_expr)
+    bound |= set(name for name, _ in tree.let_expr or ())
+    reducers = [collector["with"] for collector in tree.return_expr]
+    if nodes.free_names(reducers) & bound:
+        return None
+    chunk = nodes.collectors(chunk.copy(order_expr=None), reducers=False)
+    return seq, chunk, reducers
+
+
+def chunks(items, n):
+    """
+    Splits the list items into n chunks (at most) of about the same size.
+    """
+    size, extra = divmod(len(items), n)
+    start = 0
+    for i in range(min(n, len(items))):
+        end = start + size + (i < extra)
+        yield items[start:end]
+        start = end
+
+
+## the chunk queries compiled by the worker processes, by key
+_queries = QueryCache(64)
+
+
+def _run(key, tree, namespace, chunk):
+    """
+    Evaluates the chunk query tree (see Chunk) in a worker process, namespace
+    and chunk being pickled.
+    """
+
+    def build():
+        from pyflwor.pyflwor import _build
+
+        return _build(tree, key[1], False)
+
+    query = _queries.get(key, build)
+    namespace = pickle.loads(namespace)
+    namespace[CHUNK] = pickle.loads(chunk)
+    return query(namespace)
+
+
+def _unpicklable(values):
+    for name, value in values:
+        try:
+            pickle.dumps(value)
+        except Exception as e:
+            return name, e
+    return None
+
+
+class Chunk(object):
+    """
+    A chunk query, compiled with the backend of key ((query, backend,
+    optimize, ...), unique to the chunk query) by build.
+    """
+
+    def __init__(self, key, tree, build):
+        self.key = key
+        self.tree = tree
+        self.query = build(tree, key[1], False)
+        self.names = tree.names() - set([CHUNK])
+
+
+class Pool(object):
+    """
+    Evaluates chunk queries with executor, or a pool of workers processes
+    created on first use and shut down when the Pool is collected. Each task
+    evaluates batch_size values, or the values are split into four tasks per
+    worker.
+    """
+
+    def __init__(self, executor=None, workers=None, batch_size=None):
+        self.executor = executor
+        self.workers = workers
+        self.batch_size = batch_size
+
+    def pool(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+            weakref.finalize(self, self.executor.shutdown, False)
+        return self.executor
+
+    def batches(self, items):
+        if self.batch_size:
+            size = self.batch_size
+            return [items[i : i + size] for i in range(0, len(items), size)]
+        pool = self.pool()
+        n = self.workers or getattr(pool, "_max_workers", None) or os.cpu_count()
+        return list(chunks(items, 4 * n))
+
+    def evaluate(self, chunk, objs, items):
+        """
+        The concatenated results of the chunk query over the batches of the
+        list items, one batch is evaluated by the caller.
+        """
+        batches = self.batches(items)
+        if len(batches) <= 1:
+            return list(chunk.query(symbols.Scope(objs, {CHUNK: items})))
+        pool = self.pool()
+        if not isinstance(pool, ProcessPoolExecutor):
+            futures = [
+                pool.submit(chunk.query, symbols.Scope(objs, {CHUNK: batch}))
+                for batch in batches
+            ]
+            return [r for future in futures for r in future.result()]
+        namespace = dict((name, objs[name]) for name in chunk.names if name in objs)
+        try:
+            ## pickled once for all the tasks, the errors of the tasks are not
+            ## mistaken for the values which can not be sent
+            data = pickle.dumps(namespace, pickle.HIGHEST_PROTOCOL)
+            batches = [pickle.dumps(b, pickle.HIGHEST_PROTOCOL) for b in batches]
+        except (pickle.PicklingError, AttributeError, TypeError):
+            failed = _unpicklable(
+                list(namespace.items()) + [("a value evaluated by the workers", items)]
+            )
+            if failed is None:
+                raise
+            raise ValueError(
+                "%s can not be sent to the worker processes (%s), evaluate the query "
+                "with a thread pool (executor=ThreadPoolExecutor(n)) or without "
+                "workers" % (failed[0], failed[1])
+            )
+        futures = [
+            pool.submit(_run, chunk.key, chunk.tree, data, batch) for batch in batches
+        ]
+        return [r for future in futures for r in future.result()]
+
+
+def _indexed(tree, indexed):
+    return nodes.Indexed(tree) if indexed else tree
+
+
+def _scope(objs, indexed):
+    ## the indexes of the semi-joins evaluated by the caller, see indexedQuery
+    return symbols.Scope(objs, {symbols._indexes: dict()}) if indexed else objs
+
+
+class Path(object):
+    """
+    The query function traversing a path expression level by level, the
+    wheres of each step tested by the pool, see generate.
+    """
+
+    def __init__(self, pool, key, tree, build, indexed=False):
+        self.pool = pool
+        self.indexed = indexed
+        self.attrs = [(name, None) for name, _ in tree.steps]
+        self.lookups = dict()
+        for i, k, op, value in tree.probes or ():
+            self.lookups.setdefault(i, []).append((k, op, value.lower(symbols)))
+        self.tests = [
+            where
+            and Chunk(
+                key + (i,),
+                _indexed(
+                    nodes.FLWR(
+                        [nodes.Bool(where)],
+                        for_expr=[("self", nodes.Path([(CHUNK, None)]))],
+                    ),
+                    indexed,
+                ),
+                build,
+            )
+            for i, (_, where) in enumerate(tree.steps)
+        ]
+        self.__objquery__ = True
+
+    def __call__(self, objs):
+        objs = _scope(objs, self.indexed)
+        values = [None]  # the first name is looked up in objs
+        for i, test in enumerate(self.tests):
+            values = [
+                v
+                for u in values
+                for v in symbols.step(objs, self.attrs, self.lookups, u, i)
+            ]
+            if test is not None:
+                tests = self.pool.evaluate(test, objs, values)
+                values = [v for v, passed in zip(values, tests) if passed]
+        return values
+
+
+class FLWR(object):
+    """
+    The query function evaluating the iterations of a flwr expression in
+    parallel, see generate.
+    """
+
+    def __init__(self, pool, key, tree, split, build, indexed=False):
+        seq, chunk, reducers = split
+        if reducers is not None:  # nodes.Output is only lowered by symbols
+            key = (key[0], "closures") + key[2:]
+        self.pool = pool
+        self.indexed = indexed
+        self.seq = Path(pool, key + ("for",), seq, build, indexed)
+        self.chunk = Chunk(key, _indexed(chunk, indexed), build)
+        self.reducers = reducers and [reducer.lower(symbols) for reducer in reducers]
+        self.order = None
+        if tree.order_expr and not tree.collecting:
+            self.order = symbols.order_key(tree.return_expr, tree.order_expr)
+        self.limit = tree.limit_expr
+        self.__objquery__ = True
+
+    def __call__(self, objs):
+        objs = _scope(objs, self.indexed)
+        items = self.seq(objs)
+        results = self.pool.evaluate(self.chunk, objs, items) if items else []
+        if self.order and results:
+            _, key, reverse = self.order
+            count, offset = self.limit or (None, 0)
+            results = symbols.ordered(results, key, reverse, count, offset)
+        elif self.limit:
+            count, offset = self.limit
+            results = results[offset : None if count is None else offset + count]
+        if self.reducers is None:
+            return tuple(results)
+        rfs = [reducer(objs) for reducer in self.reducers]
+        rets = tuple(dict() for _ in rfs)
+        for binding in results:
+            for i, (_as, value) in enumerate(binding):
+                rets[i][_as] = rfs[i](rets[i].get(_as, None), value)
+        return rets[0] if len(rets) == 1 else rets
+
+
+def generate(key, tree, query, build, executor=None, workers=None, batch_size=None):
+    """
+    The query function evaluating tree, the query of key ((query, backend,
+    optimize)), in parallel with executor or a pool of workers processes.
+    build compiles the chunk queries (build(tree, backend, lazy)), batch_size
+    is the number of values of each task. Expressions other than paths and
+    flwr expressions over a path are evaluated by query, the sequential query
+    function.
+    """
+    pool = Pool(executor, workers, batch_size)
+    indexed = isinstance(tree, nodes.Indexed)
+    if indexed:
+        tree = tree.query
+    if isinstance(tree, nodes.Path):
+        return Path(pool, key, tree, build, indexed)
+    parts = split(tree)
+    if parts is None:
+        return query
+    return FLWR(pool, key, tree, parts, build, indexed)
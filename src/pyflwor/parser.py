@@ -10,28 +10,46 @@ Purpose: The LALR parser for the query compiler.
 """
 from builtins import object
 
+import os
+import sys
+import threading
+
 from ply import yacc
 from pyflwor.lexer import tokens, Lexer
 import pyflwor.symbols as symbols
 
-# The parser does not build an abstract syntax tree nor does it build
-# intermediate code, instead it composes functions and objects together. These
-# functions are defined in symbols.py file. The composed function returned
-# computes the query based on the object dictionary passed into it. This
-# dictionary (objs) is passed down through the functions (sometimes with
-# modification).
+# The grammar actions do not construct anything themselves, they call the
+# functions of the parser's "backend" module (self.symbols). The default,
+# symbols.py, composes functions and objects together. The composed function
+# returned computes the query based on the object dictionary passed into it.
+# This dictionary (objs) is passed down through the functions (sometimes with
+# modification). codegen.py provides the same functions but composes python
+# source instead of closures and nodes.py builds an abstract syntax tree which
+# the optimizer rewrites before it is lowered into one of the other two.
+
 
 # If you are confused about the syntax in this file I recommend reading the
 # documentation on the PLY website to see how this compiler compiler's syntax
 # works.
+#
+# Building the LALR tables is by far the most expensive part of constructing a
+# parser so by default they are loaded from the parsetab module shipped with
+# the package. PLY checks the signature of the shipped tables against the
+# grammar below and silently rebuilds them if they are stale. Pass tables=False
+# to always build them from the grammar. Run write_tables() after changing the
+# grammar.
 class Parser(object):
-    def __new__(cls, **kwargs):
+    def __new__(cls, tables=True, backend=symbols, **kwargs):
         ## Does magic to allow PLY to do its thing.
-        self = super(Parser, cls).__new__(cls, **kwargs)
+        self = super(Parser, cls).__new__(cls)
         self.names = dict()
-        self.yacc = yacc.yacc(
-            module=self, debug=False, optimize=True, write_tables=False, **kwargs
+        self.symbols = backend
+        ## PLY only skips reading the tables when the table module cannot be
+        ## imported, so point it at a module which does not exist.
+        kwargs.setdefault(
+            "tabmodule", "pyflwor.parsetab" if tables else "pyflwor.parsetab_disabled"
         )
+        self.yacc = yacc.yacc(module=self, debug=False, write_tables=False, **kwargs)
         return self.yacc
 
     tokens = tokens
@@ -50,25 +68,25 @@ class Parser(object):
 
     def p_FLWRexpr1(self, t):
         "FLWRexpr : ForExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[2][0], for_expr=t[1], flatten=t[2][1], collecting=t[2][2]
         )
 
     def p_FLWRexpr2(self, t):
         "FLWRexpr : ForExpr LetExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[3][0], for_expr=t[1], flatten=t[3][1], collecting=t[3][2], let_expr=t[2]
         )
 
     def p_FLWRexpr3(self, t):
         "FLWRexpr : ForExpr WhereExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[3][0], for_expr=t[1], flatten=t[3][1], collecting=t[3][2], where_expr=t[2]
         )
 
     def p_FLWRexpr4(self, t):
         "FLWRexpr : ForExpr LetExpr WhereExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[4][0],
             for_expr=t[1],
             flatten=t[4][1],
@@ -79,51 +97,59 @@ class Parser(object):
 
     def p_FLWRexpr5(self, t):
         "FLWRexpr : ForExpr OrderByExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
-            t[3][0], for_expr=t[1], flatten=t[3][1], collecting=t[3][2], order_expr=t[2]
+        t[0] = self.symbols.flwrSequence(
+            t[3][0],
+            for_expr=t[1],
+            flatten=t[3][1],
+            collecting=t[3][2],
+            order_expr=t[2][0],
+            limit_expr=t[2][1],
         )
 
     def p_FLWRexpr6(self, t):
         "FLWRexpr : ForExpr LetExpr OrderByExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[4][0],
             for_expr=t[1],
             flatten=t[4][1],
             collecting=t[4][2],
             let_expr=t[2],
-            order_expr=t[3],
+            order_expr=t[3][0],
+            limit_expr=t[3][1],
         )
 
     def p_FLWRexpr7(self, t):
         "FLWRexpr : ForExpr WhereExpr OrderByExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[4][0],
             for_expr=t[1],
             flatten=t[4][1],
             collecting=t[4][2],
             where_expr=t[2],
-            order_expr=t[3],
+            order_expr=t[3][0],
+            limit_expr=t[3][1],
         )
 
     def p_FLWRexpr8(self, t):
         "FLWRexpr : ForExpr LetExpr WhereExpr OrderByExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[5][0],
             for_expr=t[1],
             flatten=t[5][1],
             collecting=t[5][2],
             let_expr=t[2],
             where_expr=t[3],
-            order_expr=t[4],
+            order_expr=t[4][0],
+            limit_expr=t[4][1],
         )
 
     def p_FLWRexpr9(self, t):
         "FLWRexpr : ReturnExpr"
-        t[0] = symbols.flwrSequence(t[1][0], flatten=t[1][1], collecting=t[1][2])
+        t[0] = self.symbols.flwrSequence(t[1][0], flatten=t[1][1], collecting=t[1][2])
 
     def p_FLWRexpr10(self, t):
         "FLWRexpr : LetExpr ReturnExpr"
-        t[0] = symbols.flwrSequence(
+        t[0] = self.symbols.flwrSequence(
             t[2][0], flatten=t[2][1], collecting=t[2][2], let_expr=t[1]
         )
 
@@ -181,7 +207,7 @@ class Parser(object):
 
     def p_LetDefinition4(self, t):
         "LetDefinition : NAME EQ Function"
-        t[0] = (t[1], symbols.functionDefinition(*t[3]))
+        t[0] = (t[1], self.symbols.functionDefinition(*t[3]))
 
     def p_Function1(self, t):
         "Function : FUNCTION LPAREN RPAREN LCURLY FBody RCURLY"
@@ -212,13 +238,46 @@ class Parser(object):
         t[0] = t[2]
 
     def p_OrderByExpr1(self, t):
-        "OrderByExpr : ORDER BY NUMBER OrderDirection"
-        t[0] = (t[3], t[4])
+        "OrderByExpr : OrderBy"
+        t[0] = (t[1], None)
 
     def p_OrderByExpr2(self, t):
-        "OrderByExpr : ORDER BY STRING OrderDirection"
+        "OrderByExpr : OrderBy LimitExpr"
+        t[0] = (t[1], t[2])
+
+    def p_OrderByExpr3(self, t):
+        "OrderByExpr : LimitExpr"
+        t[0] = (None, t[1])
+
+    def p_OrderBy1(self, t):
+        "OrderBy : ORDER BY NUMBER OrderDirection"
         t[0] = (t[3], t[4])
 
+    def p_OrderBy2(self, t):
+        "OrderBy : ORDER BY STRING OrderDirection"
+        t[0] = (t[3], t[4])
+
+    def p_LimitExpr1(self, t):
+        "LimitExpr : LIMIT Count"
+        t[0] = (t[2], 0)
+
+    def p_LimitExpr2(self, t):
+        "LimitExpr : OFFSET Count"
+        t[0] = (None, t[2])
+
+    def p_LimitExpr3(self, t):
+        "LimitExpr : LIMIT Count OFFSET Count"
+        t[0] = (t[2], t[4])
+
+    def p_Count(self, t):
+        "Count : NUMBER"
+        ## not a SyntaxError, PLY would treat it as a recoverable parse error
+        if not isinstance(t[1], int) or t[1] < 0:
+            raise Exception(
+                "limit and offset must be non negative integers, got %s" % t[1]
+            )
+        t[0] = t[1]
+
     def p_OrderDirection1(self, t):
         "OrderDirection : ASCD"
         t[0] = "ASCD"
@@ -261,11 +320,11 @@ class Parser(object):
 
     def p_CollectFunction1(self, t):
         "CollectFunction : AttributeValue"
-        t[0] = symbols.attributeValue(t[1])
+        t[0] = self.symbols.attributeValue(t[1])
 
     def p_CollectFunction2(self, t):
         "CollectFunction : Function"
-        t[0] = symbols.functionDefinition(*t[1])
+        t[0] = self.symbols.functionDefinition(*t[1])
 
     def p_OutputTuple1(self, t):
         "OutputTuple : OutputTuple COMMA OutputValue"
@@ -297,7 +356,7 @@ class Parser(object):
 
     def p_Set1(self, t):
         "Set : Set DASH UnionExpr"
-        t[0] = symbols.setValue(t[1], symbols.setoperator(t[2]), t[3])
+        t[0] = self.symbols.setValue(t[1], self.symbols.setoperator(t[2]), t[3])
 
     def p_Set2(self, t):
         "Set : UnionExpr"
@@ -305,7 +364,7 @@ class Parser(object):
 
     def p_UnionExpr1(self, t):
         "UnionExpr : UnionExpr UNION IntersectionExpr"
-        t[0] = symbols.setValue(t[1], symbols.setoperator(t[2]), t[3])
+        t[0] = self.symbols.setValue(t[1], self.symbols.setoperator(t[2]), t[3])
 
     def p_UnionExpr2(self, t):
         "UnionExpr : IntersectionExpr"
@@ -313,7 +372,7 @@ class Parser(object):
 
     def p_IntersectionExpr1(self, t):
         "IntersectionExpr : IntersectionExpr INTERSECTION Collection"
-        t[0] = symbols.setValue(t[1], symbols.setoperator(t[2]), t[3])
+        t[0] = self.symbols.setValue(t[1], self.symbols.setoperator(t[2]), t[3])
 
     def p_IntersectionExpr2(self, t):
         "IntersectionExpr : Collection"
@@ -329,7 +388,7 @@ class Parser(object):
 
     def p_QueryStart(self, t):
         "Query : Query_"
-        t[0] = symbols.queryValue(t[1])
+        t[0] = self.symbols.queryValue(t[1])
 
     def p_Query1(self, t):
         "Query_ : Query_ SLASH Entity"
@@ -340,12 +399,12 @@ class Parser(object):
         t[0] = [t[1]]
 
     def p_Entity1(self, t):
-        "Entity : NAME"
-        t[0] = (t[1], symbols.whereValue(lambda objs: True))
+        "Entity : Name"
+        t[0] = (t[1], None)
 
     def p_Entity2(self, t):
-        "Entity : NAME LSQUARE Where RSQUARE"
-        t[0] = (t[1], symbols.whereValue(t[3]))
+        "Entity : Name LSQUARE Where RSQUARE"
+        t[0] = (t[1], self.symbols.whereValue(t[3]))
 
     def p_Where(self, t):
         "Where : OrExpr"
@@ -353,7 +412,9 @@ class Parser(object):
 
     def p_OrExpr1(self, t):
         "OrExpr : OrExpr OR AndExpr"
-        t[0] = symbols.booleanexprValue(t[1], symbols.booleanOperator(t[2]), t[3])
+        t[0] = self.symbols.booleanexprValue(
+            t[1], self.symbols.booleanOperator(t[2]), t[3]
+        )
 
     def p_OrExpr2(self, t):
         "OrExpr : AndExpr"
@@ -361,7 +422,9 @@ class Parser(object):
 
     def p_AndExpr1(self, t):
         "AndExpr : AndExpr AND NotExpr"
-        t[0] = symbols.booleanexprValue(t[1], symbols.booleanOperator(t[2]), t[3])
+        t[0] = self.symbols.booleanexprValue(
+            t[1], self.symbols.booleanOperator(t[2]), t[3]
+        )
 
     def p_AndExpr2(self, t):
         "AndExpr : NotExpr"
@@ -369,7 +432,7 @@ class Parser(object):
 
     def p_NotExpr1(self, t):
         "NotExpr : NOT BooleanExpr"
-        t[0] = symbols.unaryexprValue(symbols.unaryOperator(t[1]), t[2])
+        t[0] = self.symbols.unaryexprValue(self.symbols.unaryOperator(t[1]), t[2])
 
     def p_NotExpr2(self, t):
         "NotExpr : BooleanExpr"
@@ -389,7 +452,7 @@ class Parser(object):
 
     def p_BooleanExpr4(self, t):
         "BooleanExpr : ArithExpr"
-        t[0] = symbols.booleanValue(t[1])
+        t[0] = self.symbols.booleanValue(t[1])
 
     def p_BooleanExpr5(self, t):
         "BooleanExpr : LPAREN Where RPAREN"
@@ -397,7 +460,7 @@ class Parser(object):
 
     def p_CmpExpr(self, t):
         "CmpExpr : ArithExpr CmpOp ArithExpr"
-        t[0] = symbols.comparisonValue(t[1], t[2], t[3])
+        t[0] = self.symbols.comparisonValue(t[1], t[2], t[3])
 
     def p_CmpOp(self, t):
         """CmpOp : EQEQ
@@ -406,7 +469,7 @@ class Parser(object):
         | LE
         | RANGLE
         | GE"""
-        t[0] = symbols.operator(t[1])
+        t[0] = self.symbols.operator(t[1])
 
     def p_ArithExpr(self, t):
         "ArithExpr : AddSub"
@@ -415,12 +478,12 @@ class Parser(object):
     def p_AddSub1(self, t):
         "AddSub : AddSub PLUS MulDiv"
         # t[0] = Node('+').addkid(t[1]).addkid(t[3])
-        t[0] = symbols.arithValue(t[1], symbols.arith_operator(t[2]), t[3])
+        t[0] = self.symbols.arithValue(t[1], self.symbols.arith_operator(t[2]), t[3])
 
     def p_AddSub2(self, t):
         "AddSub : AddSub DASH MulDiv"
         # t[0] = Node('-').addkid(t[1]).addkid(t[3])
-        t[0] = symbols.arithValue(t[1], symbols.arith_operator(t[2]), t[3])
+        t[0] = self.symbols.arithValue(t[1], self.symbols.arith_operator(t[2]), t[3])
 
     def p_AddSub3(self, t):
         "AddSub : MulDiv"
@@ -429,15 +492,15 @@ class Parser(object):
     def p_MulDiv1(self, t):
         "MulDiv : MulDiv STAR ArithUnary"
         # t[0] = Node('*').addkid(t[1]).addkid(t[3])
-        t[0] = symbols.arithValue(t[1], symbols.arith_operator(t[2]), t[3])
+        t[0] = self.symbols.arithValue(t[1], self.symbols.arith_operator(t[2]), t[3])
 
     def p_MulDiv2(self, t):
         "MulDiv : MulDiv SLASHSLASH ArithUnary"
-        t[0] = symbols.arithValue(t[1], symbols.arith_operator(t[2]), t[3])
+        t[0] = self.symbols.arithValue(t[1], self.symbols.arith_operator(t[2]), t[3])
 
     def p_MulDiv3(self, t):
         "MulDiv : MulDiv SLASH ArithUnary"
-        t[0] = symbols.arithValue(t[1], symbols.arith_operator(t[2]), t[3])
+        t[0] = self.symbols.arithValue(t[1], self.symbols.arith_operator(t[2]), t[3])
 
     def p_MulDiv4(self, t):
         "MulDiv : ArithUnary"
@@ -449,8 +512,10 @@ class Parser(object):
 
     def p_ArithUnary2(self, t):
         "ArithUnary : DASH Atomic"
-        t[0] = symbols.arithValue(
-            symbols.attributeValue(-1.0, scalar=True), symbols.arith_operator("*"), t[2]
+        t[0] = self.symbols.arithValue(
+            self.symbols.attributeValue(-1.0, scalar=True),
+            self.symbols.arith_operator("*"),
+            t[2],
         )
 
     def p_Atomic1(self, t):
@@ -463,27 +528,27 @@ class Parser(object):
 
     def p_Value1(self, t):
         "Value : NUMBER"
-        t[0] = symbols.attributeValue(t[1], scalar=True)
+        t[0] = self.symbols.attributeValue(t[1], scalar=True)
 
     def p_Value2(self, t):
         "Value : STRING"
-        t[0] = symbols.attributeValue(t[1], scalar=True)
+        t[0] = self.symbols.attributeValue(t[1], scalar=True)
 
     def p_Value3(self, t):
         "Value : IF Where THEN IfBody ELSE IfBody"
-        t[0] = symbols.ifExpr(t[2], t[4], t[6])
+        t[0] = self.symbols.ifExpr(t[2], t[4], t[6])
 
     def p_Value4(self, t):
         "Value : AttributeValue"
-        t[0] = symbols.attributeValue(t[1])
+        t[0] = self.symbols.attributeValue(t[1])
 
     def p_Value5(self, t):
         "Value : LCURLY NameValPairs RCURLY"
-        t[0] = symbols.dictValue(t[2])
+        t[0] = self.symbols.dictValue(t[2])
 
     def p_Value6(self, t):
         "Value : LSQUARE ValueList RSQUARE"
-        t[0] = symbols.listValue(t[2])
+        t[0] = self.symbols.listValue(t[2])
 
     def p_NameValPairs1(self, t):
         "NameValPairs : NameValPairs COMMA NameValPair"
@@ -546,12 +611,20 @@ class Parser(object):
         t[0] = t[2]
 
     def p_Attr1(self, t):
-        "Attr : NAME"
-        t[0] = symbols.Attribute(t[1])
+        "Attr : Name"
+        t[0] = self.symbols.Attribute(t[1])
 
     def p_Attr2(self, t):
-        "Attr : NAME Call"
-        t[0] = symbols.Attribute(t[1], t[2])
+        "Attr : Name Call"
+        t[0] = self.symbols.Attribute(t[1], t[2])
+
+    def p_Name(self, t):
+        """Name : NAME
+        | LIMIT
+        | OFFSET"""
+        ## limit and offset are only keywords after the clauses of a flwr
+        ## expression, elsewhere they are names (x.limit, a/offset)
+        t[0] = t[1]
 
     def p_Call1(self, t):
         "Call : Call Call_"
@@ -571,23 +644,23 @@ class Parser(object):
 
     def p_Fcall1(self, t):
         "Fcall : LPAREN RPAREN"
-        t[0] = symbols.Call([])
+        t[0] = self.symbols.Call([])
 
     def p_Fcall2(self, t):
         "Fcall : LPAREN ParameterList RPAREN"
-        t[0] = symbols.Call(t[2])
+        t[0] = self.symbols.Call(t[2])
 
     def p_Dcall(self, t):
         "Dcall : LSQUARE ArithExpr RSQUARE"
-        t[0] = symbols.Call([t[2]], lookup=True)
+        t[0] = self.symbols.Call([t[2]], lookup=True)
 
     def p_QuantifiedExpr1(self, t):
         "QuantifiedExpr : Quantifier NAME IN LANGLE Set RANGLE SATISFIES LPAREN Where RPAREN"
-        t[0] = symbols.quantifiedValue(t[1], t[2], t[5], t[9])
+        t[0] = self.symbols.quantifiedValue(t[1], t[2], t[5], t[9])
 
     def p_QuantifiedExpr2(self, t):
         "QuantifiedExpr : Quantifier NAME IN LCURLY FLWRexpr RCURLY SATISFIES LPAREN Where RPAREN"
-        t[0] = symbols.quantifiedValue(t[1], t[2], t[5], t[9])
+        t[0] = self.symbols.quantifiedValue(t[1], t[2], t[5], t[9])
 
     def p_Quantifier1(self, t):
         "Quantifier : EVERY"
@@ -599,62 +672,76 @@ class Parser(object):
 
     def p_SetExpr__1(self, t):
         "SetExpr : ArithExpr IN AttributeValue"
-        t[0] = symbols.setexprValue1(
-            t[1], symbols.setexprOperator1("in"), symbols.attributeValue(t[3])
+        t[0] = self.symbols.setexprValue1(
+            t[1], self.symbols.setexprOperator1("in"), self.symbols.attributeValue(t[3])
         )
 
     def p_SetExpr__2(self, t):
         "SetExpr : ArithExpr NOT IN AttributeValue"
-        t[0] = symbols.setexprValue1(
-            t[1], symbols.setexprOperator1("not in"), symbols.attributeValue(t[4])
+        t[0] = self.symbols.setexprValue1(
+            t[1],
+            self.symbols.setexprOperator1("not in"),
+            self.symbols.attributeValue(t[4]),
         )
 
     def p_SetExpr1(self, t):
         "SetExpr : ArithExpr IN LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue1(t[1], symbols.setexprOperator1("in"), t[4])
+        t[0] = self.symbols.setexprValue1(
+            t[1], self.symbols.setexprOperator1("in"), t[4]
+        )
 
     def p_SetExpr2(self, t):
         "SetExpr : ArithExpr NOT IN LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue1(t[1], symbols.setexprOperator1("not in"), t[5])
+        t[0] = self.symbols.setexprValue1(
+            t[1], self.symbols.setexprOperator1("not in"), t[5]
+        )
 
     def p_SetExpr3(self, t):
         "SetExpr : LANGLE Set RANGLE SUBSET LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(t[2], symbols.setexprOperator2("subset"), t[6])
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("subset"), t[6]
+        )
 
     def p_SetExpr4(self, t):
         "SetExpr : LANGLE Set RANGLE SUPERSET LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(t[2], symbols.setexprOperator2("superset"), t[6])
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("superset"), t[6]
+        )
 
     def p_SetExpr5(self, t):
         "SetExpr : LANGLE Set RANGLE PROPER SUBSET LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(
-            t[2], symbols.setexprOperator2("proper subset"), t[7]
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("proper subset"), t[7]
         )
 
     def p_SetExpr6(self, t):
         "SetExpr : LANGLE Set RANGLE PROPER SUPERSET LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(
-            t[2], symbols.setexprOperator2("proper superset"), t[7]
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("proper superset"), t[7]
         )
 
     def p_SetExpr7(self, t):
         "SetExpr : LANGLE Set RANGLE IS LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(t[2], symbols.setexprOperator2("is"), t[6])
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("is"), t[6]
+        )
 
     def p_SetExpr8(self, t):
         "SetExpr : LANGLE Set RANGLE IS NOT LANGLE Set RANGLE"
-        t[0] = symbols.setexprValue2(t[2], symbols.setexprOperator2("is not"), t[7])
+        t[0] = self.symbols.setexprValue2(
+            t[2], self.symbols.setexprOperator2("is not"), t[7]
+        )
 
     def p_SetExpr9(self, t):
         "SetExpr : ArithExpr IN LSQUARE ValueList RSQUARE"
-        t[0] = symbols.setexprValue1(
-            t[1], symbols.setexprOperator1("in"), symbols.listValue(t[4])
+        t[0] = self.symbols.setexprValue1(
+            t[1], self.symbols.setexprOperator1("in"), self.symbols.listValue(t[4])
         )
 
     def p_SetExpr10(self, t):
         "SetExpr : ArithExpr NOT IN LSQUARE ValueList RSQUARE"
-        t[0] = symbols.setexprValue1(
-            t[1], symbols.setexprOperator1("not in"), symbols.listValue(t[5])
+        t[0] = self.symbols.setexprValue1(
+            t[1], self.symbols.setexprOperator1("not in"), self.symbols.listValue(t[5])
         )
 
     def p_error(self, t):
@@ -664,6 +751,45 @@ class Parser(object):
             raise SyntaxError("Syntax error at '%s', %s.%s" % (t, t.lineno, t.lexpos))
 
 
+_local = threading.local()
+
+
+def get_parser(backend=symbols):
+    """
+    Returns a parser for the given backend owned by the calling thread,
+    building it on first use. PLY parsers keep their state on the parser
+    object while parsing so they must not be shared between threads, but can
+    be reused for any number of sequential parses.
+    """
+    parsers = getattr(_local, "parsers", None)
+    if parsers is None:
+        parsers = _local.parsers = dict()
+    parser = parsers.get(backend.__name__)
+    if parser is None:
+        parser = parsers[backend.__name__] = Parser(backend=backend)
+    return parser
+
+
+def write_tables(outputdir=None):
+    """
+    Regenerates the parsetab and lextab modules shipped with the package.
+    """
+    if outputdir is None:
+        outputdir = os.path.dirname(os.path.abspath(__file__))
+    for name in ("parsetab", "lextab"):
+        path = os.path.join(outputdir, name + ".py")
+        if os.path.exists(path):
+            os.remove(path)
+        sys.modules.pop("pyflwor." + name, None)
+    yacc.yacc(
+        module=super(Parser, Parser).__new__(Parser),
+        debug=False,
+        tabmodule="parsetab",
+        outputdir=outputdir,
+    )
+    Lexer(lextab="lextab", outputdir=outputdir)
+
+
 if __name__ == "__main__":
     # Parser().parse('''a/b[x == y and not (1 == 1 or 1 == 2) and not c == d]/c/d''', lexer=Lexer())
     try:
@@ -0,0 +1,184 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'rightRSQUARErightDASHPLUSSLASHSLASHSLASHSTARAND AS ASCD BY COLLECT COLON COMMA DASH DESC DOT ELSE EQ EQEQ EVERY FLATTEN FOR FUNCTION GE IF IN INTERSECTION IS LANGLE LCURLY LE LET LIMIT LPAREN LSQUARE NAME NOT NQ NUMBER OFFSET OR ORDER PLUS PROPER RANGLE RCURLY RETURN RPAREN RSQUARE SATISFIES SLASH SLASHSLASH SOME STAR STRING SUBSET SUPERSET THEN UNION WHERE WITHStart : SetStart : FLWRexprFLWRexpr : ForExpr ReturnExprFLWRexpr : ForExpr LetExpr ReturnExprFLWRexpr : ForExpr WhereExpr ReturnExprFLWRexpr : ForExpr LetExpr WhereExpr ReturnExprFLWRexpr : ForExpr OrderByExpr ReturnExprFLWRexpr : ForExpr LetExpr OrderByExpr ReturnExprFLWRexpr : ForExpr WhereExpr OrderByExpr ReturnExprFLWRexpr : ForExpr LetExpr WhereExpr OrderByExpr ReturnExprFLWRexpr : ReturnExprFLWRexpr : LetExpr ReturnExprForExpr : FOR ForListForList : ForList COMMA ForDefinitionForList : ForDefinitionForDefinition : NAME IN LANGLE Set RANGLEForDefinition : NAME IN LCURLY FLWRexpr RCURLYForDefinition : NAME IN ValueLetExpr : LetExpr LET LetListLetExpr : LET LetListLetList : LetList COMMA LetDefinitionLetList : LetDefinitionLetDefinition : NAME EQ LANGLE Set RANGLELetDefinition : NAME EQ LCURLY FLWRexpr RCURLYLetDefinition : NAME EQ ArithExprLetDefinition : NAME EQ FunctionFunction : FUNCTION LPAREN RPAREN LCURLY FBody RCURLYFunction : FUNCTION LPAREN FParams RPAREN LCURLY FBody RCURLYFParams : FParams COMMA NAMEFParams : NAMEFBody : FLWRexprFBody : ArithExprWhereExpr : WHERE WhereOrderByExpr : OrderByOrderByExpr : OrderBy LimitExprOrderByExpr : LimitExprOrderBy : ORDER BY NUMBER OrderDirectionOrderBy : ORDER BY STRING OrderDirectionLimitExpr : LIMIT CountLimitExpr : OFFSET CountLimitExpr : LIMIT Count OFFSET CountCount : NUMBEROrderDirection : ASCDOrderDirection : DESCReturnExpr : RETURN OutputTupleReturnExpr : RETURN OutputDictReturnExpr : RETURN FLATTEN OutputValueReturnExpr : CollectListCollectList : CollectList CollectCollectList : CollectCollect : COLLECT OutputTuple AS ArithExpr WITH CollectFunctionCollect : COLLECT OutputDict AS ArithExpr WITH CollectFunctionCollectFunction : AttributeValueCollectFunction : FunctionOutputTuple : OutputTuple COMMA OutputValueOutputTuple : OutputValueOutputDict : OutputDict COMMA STRING COLON OutputValueOutputDict : STRING COLON OutputValueOutputValue : ArithExprOutputValue : LANGLE Set RANGLEOutputValue : LCURLY FLWRexpr RCURLYSet : Set DASH UnionExprSet : UnionExprUnionExpr : UnionExpr UNION IntersectionExprUnionExpr : IntersectionExprIntersectionExpr : IntersectionExpr INTERSECTION CollectionIntersectionExpr : CollectionCollection : QueryCollection : LPAREN Set RPARENQuery : Query_Query_ : Query_ SLASH EntityQuery_ : EntityEntity : NameEntity : Name LSQUARE Where RSQUAREWhere : OrExprOrExpr : OrExpr OR AndExprOrExpr : AndExprAndExpr : AndExpr AND NotExprAndExpr : NotExprNotExpr : NOT BooleanExprNotExpr : BooleanExprBooleanExpr : CmpExprBooleanExpr : QuantifiedExprBooleanExpr : SetExprBooleanExpr : ArithExprBooleanExpr : LPAREN Where RPARENCmpExpr : ArithExpr CmpOp ArithExprCmpOp : EQEQ\n        | NQ\n        | LANGLE\n        | LE\n        | RANGLE\n        | GEArithExpr : AddSubAddSub : AddSub PLUS MulDivAddSub : AddSub DASH MulDivAddSub : MulDivMulDiv : MulDiv STAR ArithUnaryMulDiv : MulDiv SLASHSLASH ArithUnaryMulDiv : MulDiv SLASH ArithUnaryMulDiv : ArithUnaryArithUnary : AtomicArithUnary : DASH AtomicAtomic : ValueAtomic : LPAREN ArithExpr RPARENValue : NUMBERValue : STRINGValue : IF Where THEN IfBody ELSE IfBodyValue : AttributeValueValue : LCURLY NameValPairs RCURLYValue : LSQUARE ValueList RSQUARENameValPairs : NameValPairs COMMA NameValPairNameValPairs : NameValPairNameValPair : ArithExpr COLON ArithExprValueList : ValueList COMMA ArithExprValueList : ArithExprIfBody : ArithExprIfBody : LANGLE Set RANGLEIfBody : LCURLY FLWRexpr RCURLYAttributeValue : AttributeValue DOT AttrAttributeValue : AttrParameterList : ParameterList COMMA ParameterParameterList : ParameterParameter : ArithExprParameter : LANGLE Set RANGLEParameter : LCURLY FLWRexpr RCURLYAttr : NameAttr : Name CallName : NAME\n        | LIMIT\n        | OFFSETCall : Call Call_Call : Call_Call_ : FcallCall_ : DcallFcall : LPAREN RPARENFcall : LPAREN ParameterList RPARENDcall : LSQUARE ArithExpr RSQUAREQuantifiedExpr : Quantifier NAME IN LANGLE Set RANGLE SATISFIES LPAREN Where RPARENQuantifiedExpr : Quantifier NAME IN LCURLY FLWRexpr RCURLY SATISFIES LPAREN Where RPARENQuantifier : EVERYQuantifier : SOMESetExpr : ArithExpr IN AttributeValueSetExpr : ArithExpr NOT IN AttributeValueSetExpr : ArithExpr IN LANGLE Set RANGLESetExpr : ArithExpr NOT IN LANGLE Set RANGLESetExpr : LANGLE Set RANGLE SUBSET LANGLE Set RANGLESetExpr : LANGLE Set RANGLE SUPERSET LANGLE Set RANGLESetExpr : LANGLE Set RANGLE PROPER SUBSET LANGLE Set RANGLESetExpr : LANGLE Set RANGLE PROPER SUPERSET LANGLE Set RANGLESetExpr : LANGLE Set RANGLE IS LANGLE Set RANGLESetExpr : LANGLE Set RANGLE IS NOT LANGLE Set RANGLESetExpr : ArithExpr IN LSQUARE ValueList RSQUARESetExpr : ArithExpr NOT IN LSQUARE ValueList RSQUARE'
+    
+_lr_action_items = {'FOR':([0,49,164,190,194,225,243,281,297,],[9,9,9,9,9,9,9,9,9,]),'RETURN':([0,5,7,21,22,23,27,28,29,31,32,39,40,49,50,51,53,54,55,57,59,61,62,64,65,75,76,78,80,81,82,83,85,86,87,88,89,96,97,99,100,101,102,120,126,127,128,129,140,145,162,164,165,171,174,175,176,177,178,179,181,182,184,185,190,192,194,195,196,202,203,204,205,209,212,213,214,215,216,223,225,227,231,239,243,248,249,257,258,266,267,278,279,280,281,284,285,297,301,302,305,307,311,312,313,314,317,318,],[10,10,10,-129,-130,-131,10,10,10,-34,-36,-13,-15,10,-94,-97,-101,-102,-104,-106,-109,-121,-127,-20,-22,10,10,10,-33,-75,-77,-79,-81,-82,-83,-84,-85,-107,-35,-39,-42,-40,-19,-103,-128,-133,-134,-135,10,-80,-14,10,-18,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,10,-21,10,-25,-26,-76,-78,-87,-143,-86,-37,-43,-44,-38,-41,-117,10,-137,-138,-144,10,-16,-17,-23,-24,-145,-153,-108,-118,-119,10,-146,-154,10,-147,-148,-151,-27,-149,-150,-152,-28,-139,-140,]),'LET':([0,5,7,21,22,23,27,39,40,49,50,51,53,54,55,57,59,61,62,64,65,96,102,120,126,127,128,129,162,164,165,171,174,175,176,177,178,179,181,182,184,185,190,192,194,195,196,223,225,227,231,243,248,249,257,258,278,279,280,281,297,307,314,],[12,12,37,-129,-130,-131,37,-13,-15,12,-94,-97,-101,-102,-104,-106,-109,-121,-127,-20,-22,-107,-19,-103,-128,-133,-134,-135,-14,12,-18,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,12,-21,12,-25,-26,-117,12,-137,-138,12,-16,-17,-23,-24,-108,-118,-119,12,12,-27,-28,]),'LPAREN':([0,10,16,17,21,22,23,24,25,30,38,44,48,49,52,56,58,60,62,71,84,90,92,93,106,109,115,116,117,118,119,126,127,128,129,130,131,133,135,136,143,144,146,149,150,151,152,153,154,163,164,172,173,180,183,184,185,189,190,193,194,197,206,207,219,224,225,227,228,231,240,241,242,251,272,273,276,281,290,291,293,297,299,300,309,310,],[16,56,16,56,-129,-130,-131,16,16,90,16,56,16,56,56,56,90,56,130,90,90,90,16,56,56,56,56,56,56,56,56,130,-133,-134,-135,56,56,56,56,56,90,90,56,-90,-92,-88,-89,-91,-93,16,56,56,56,56,56,-132,-136,16,56,16,56,234,16,56,56,16,56,-137,56,-138,16,56,16,56,16,16,16,56,16,16,16,56,309,310,90,90,]),'COLLECT':([0,5,7,11,14,21,22,23,27,28,29,31,32,39,40,49,50,51,53,54,55,57,59,61,62,63,64,65,75,76,78,80,81,82,83,85,86,87,88,89,96,97,99,100,101,102,120,126,127,128,129,140,145,162,164,165,171,174,175,176,177,178,179,181,182,184,185,190,192,194,195,196,202,203,204,205,209,212,213,214,215,216,223,225,227,231,239,243,248,249,257,258,262,263,264,265,266,267,278,279,280,281,284,285,297,301,302,305,307,311,312,313,314,317,318,],[17,17,17,17,-50,-129,-130,-131,17,17,17,-34,-36,-13,-15,17,-94,-97,-101,-102,-104,-106,-109,-121,-127,-49,-20,-22,17,17,17,-33,-75,-77,-79,-81,-82,-83,-84,-85,-107,-35,-39,-42,-40,-19,-103,-128,-133,-134,-135,17,-80,-14,17,-18,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,17,-21,17,-25,-26,-76,-78,-87,-143,-86,-37,-43,-44,-38,-41,-117,17,-137,-138,-144,17,-16,-17,-23,-24,-51,-53,-54,-52,-145,-153,-108,-118,-119,17,-146,-154,17,-147,-148,-151,-27,-149,-150,-152,-28,-139,-140,]),'NAME':([0,9,10,12,16,17,24,25,30,37,38,44,48,49,52,56,58,60,70,71,84,90,91,92,93,94,95,104,105,106,109,115,116,117,118,119,123,130,131,132,133,135,136,143,144,146,147,149,150,151,152,153,154,163,164,172,173,180,183,189,190,193,194,206,207,208,219,224,225,228,234,235,236,240,241,242,251,272,273,276,281,283,290,291,293,297,309,310,],[21,41,21,66,21,21,21,21,21,66,21,21,21,21,21,21,21,21,21,21,21,21,157,21,21,-141,-142,41,21,21,21,21,21,21,21,21,21,21,21,66,21,21,21,21,21,21,21,-90,-92,-88,-89,-91,-93,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,261,21,21,21,21,21,21,21,21,21,21,298,21,21,21,21,21,21,]),'LIMIT':([0,5,10,16,17,21,22,23,24,25,27,28,30,31,38,39,40,44,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,64,65,70,71,75,80,81,82,83,84,85,86,87,88,89,90,92,93,96,102,105,106,109,115,116,117,118,119,120,123,126,127,128,129,130,131,133,135,136,143,144,145,146,147,149,150,151,152,153,154,162,163,164,165,171,172,173,174,175,176,177,178,179,180,181,182,183,184,185,189,190,192,193,194,195,196,202,203,204,205,206,207,208,209,212,213,214,215,219,223,224,225,227,228,231,235,236,239,240,241,242,248,249,251,257,258,266,267,272,273,276,278,279,280,281,284,285,290,291,293,297,301,302,305,307,309,310,311,312,313,314,317,318,],[22,34,22,22,22,-129,-130,-131,22,22,34,34,22,34,22,-13,-15,22,22,22,-94,-97,22,-101,-102,-104,22,-106,22,-109,22,-121,-127,-20,-22,22,22,34,-33,-75,-77,-79,22,-81,-82,-83,-84,-85,22,22,22,-107,-19,22,22,22,22,22,22,22,22,-103,22,-128,-133,-134,-135,22,22,22,22,22,22,22,-80,22,22,-90,-92,-88,-89,-91,-93,-14,22,22,-18,-110,22,22,-95,-96,-98,-99,-100,-105,22,-120,-111,22,-132,-136,22,22,-21,22,22,-25,-26,-76,-78,-87,-143,22,22,22,-86,-37,-43,-44,-38,22,-117,22,22,-137,22,-138,22,22,-144,22,22,22,-16,-17,22,-23,-24,-145,-153,22,22,22,-108,-118,-119,22,-146,-154,22,22,22,22,-147,-148,-151,-27,22,22,-149,-150,-152,-28,-139,-140,]),'OFFSET':([0,5,10,16,17,21,22,23,24,25,27,28,30,31,38,39,40,44,48,49,50,51,52,53,54,55,56,57,58,59,60,61,62,64,65,70,71,75,80,81,82,83,84,85,86,87,88,89,90,92,93,96,99,100,102,105,106,109,115,116,117,118,119,120,123,126,127,128,129,130,131,133,135,136,143,144,145,146,147,149,150,151,152,153,154,162,163,164,165,171,172,173,174,175,176,177,178,179,180,181,182,183,184,185,189,190,192,193,194,195,196,202,203,204,205,206,207,208,209,212,213,214,215,219,223,224,225,227,228,231,235,236,239,240,241,242,248,249,251,257,258,266,267,272,273,276,278,279,280,281,284,285,290,291,293,297,301,302,305,307,309,310,311,312,313,314,317,318,],[23,35,23,23,23,-129,-130,-131,23,23,35,35,23,35,23,-13,-15,23,23,23,-94,-97,23,-101,-102,-104,23,-106,23,-109,23,-121,-127,-20,-22,23,23,35,-33,-75,-77,-79,23,-81,-82,-83,-84,-85,23,23,23,-107,161,-42,-19,23,23,23,23,23,23,23,23,-103,23,-128,-133,-134,-135,23,23,23,23,23,23,23,-80,23,23,-90,-92,-88,-89,-91,-93,-14,23,23,-18,-110,23,23,-95,-96,-98,-99,-100,-105,23,-120,-111,23,-132,-136,23,23,-21,23,23,-25,-26,-76,-78,-87,-143,23,23,23,-86,-37,-43,-44,-38,23,-117,23,23,-137,23,-138,23,23,-144,23,23,23,-16,-17,23,-23,-24,-145,-153,23,23,23,-108,-118,-119,23,-146,-154,23,23,23,23,-147,-148,-151,-27,23,23,-149,-150,-152,-28,-139,-140,]),'$end':([1,2,3,4,6,8,11,13,14,15,18,19,20,21,22,23,26,36,42,43,45,46,47,50,51,53,54,55,57,59,61,62,63,72,73,74,77,79,96,103,108,120,126,127,128,129,134,137,139,141,142,166,168,169,170,171,174,175,176,177,178,179,181,182,184,185,200,201,223,227,231,250,262,263,264,265,278,279,280,307,314,],[0,-1,-2,-63,-11,-65,-48,-67,-50,-68,-70,-72,-73,-129,-130,-131,-3,-12,-45,-46,-56,-107,-59,-94,-97,-101,-102,-104,-106,-109,-121,-127,-49,-62,-64,-4,-5,-7,-107,-66,-47,-103,-128,-133,-134,-135,-69,-71,-6,-8,-9,-55,-58,-60,-61,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-74,-10,-117,-137,-138,-57,-51,-53,-54,-52,-108,-118,-119,-27,-28,]),'DASH':([2,4,8,10,13,15,17,18,19,20,21,22,23,30,44,46,49,50,51,53,54,55,56,57,58,59,60,61,62,67,71,72,73,84,90,93,96,103,106,109,110,115,116,117,118,119,120,126,127,128,129,130,131,133,134,135,136,137,143,144,146,149,150,151,152,153,154,158,164,171,172,173,174,175,176,177,178,179,180,181,182,183,184,185,190,194,200,207,217,219,223,225,227,228,229,231,232,237,241,251,252,268,270,278,279,280,281,288,289,292,297,303,304,306,309,310,],[24,-63,-65,52,-67,-68,52,-70,-72,-73,-129,-130,-131,52,52,-107,52,116,-97,-101,-102,-104,52,-106,52,-109,52,-121,-127,24,52,-62,-64,52,52,52,-107,-66,52,52,24,52,52,52,52,52,-103,-128,-133,-134,-135,52,52,52,-69,52,52,-71,52,52,52,-90,-92,-88,-89,-91,-93,24,52,-110,52,52,-95,-96,-98,-99,-100,-105,52,-120,-111,52,-132,-136,52,52,-74,52,24,52,-117,52,-137,52,24,-138,24,24,52,52,24,24,24,-108,-118,-119,52,24,24,24,52,24,24,24,52,52,]),'RPAREN':([4,8,13,15,18,19,20,21,22,23,50,51,53,54,55,57,59,61,62,67,72,73,81,82,83,85,86,87,88,89,96,103,120,121,126,127,128,129,130,134,137,145,155,156,171,174,175,176,177,178,179,181,182,184,185,186,187,188,200,202,203,204,205,209,223,227,231,234,239,254,255,256,260,261,266,267,278,279,280,284,285,298,301,302,305,311,312,313,315,316,317,318,],[-63,-65,-67,-68,-70,-72,-73,-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,134,-62,-64,-75,-77,-79,-81,-82,-83,-84,-85,-107,-66,-103,179,-128,-133,-134,-135,185,-69,-71,-80,209,179,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,227,-123,-124,-74,-76,-78,-87,-143,-86,-117,-137,-138,259,-144,-122,-125,-126,282,-30,-145,-153,-108,-118,-119,-146,-154,-29,-147,-148,-151,-149,-150,-152,317,318,-139,-140,]),'RANGLE':([4,8,13,15,18,19,20,21,22,23,50,51,53,54,55,57,59,61,62,72,73,89,96,103,110,120,126,127,128,129,134,137,156,158,171,174,175,176,177,178,179,181,182,184,185,200,217,223,227,229,231,232,237,252,268,270,278,279,280,288,289,292,303,304,306,],[-63,-65,-67,-68,-70,-72,-73,-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,-62,-64,150,-107,-66,169,-103,-128,-133,-134,-135,-69,-71,150,211,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-74,248,-117,-137,255,-138,257,266,279,284,286,-108,-118,-119,301,302,305,311,312,313,]),'UNION':([4,8,13,15,18,19,20,21,22,23,72,73,103,134,137,200,],[25,-65,-67,-68,-70,-72,-73,-129,-130,-131,25,-64,-66,-69,-71,-74,]),'WHERE':([5,21,22,23,27,39,40,50,51,53,54,55,57,59,61,62,64,65,96,102,120,126,127,128,129,162,165,171,174,175,176,177,178,179,181,182,184,185,192,195,196,223,227,231,248,249,257,258,278,279,280,307,314,],[30,-129,-130,-131,30,-13,-15,-94,-97,-101,-102,-104,-106,-109,-121,-127,-20,-22,-107,-19,-103,-128,-133,-134,-135,-14,-18,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-21,-25,-26,-117,-137,-138,-16,-17,-23,-24,-108,-118,-119,-27,-28,]),'ORDER':([5,21,22,23,27,28,39,40,50,51,53,54,55,57,59,61,62,64,65,75,80,81,82,83,85,86,87,88,89,96,102,120,126,127,128,129,145,162,165,171,174,175,176,177,178,179,181,182,184,185,192,195,196,202,203,204,205,209,223,227,231,239,248,249,257,258,266,267,278,279,280,284,285,301,302,305,307,311,312,313,314,317,318,],[33,-129,-130,-131,33,33,-13,-15,-94,-97,-101,-102,-104,-106,-109,-121,-127,-20,-22,33,-33,-75,-77,-79,-81,-82,-83,-84,-85,-107,-19,-103,-128,-133,-134,-135,-80,-14,-18,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-21,-25,-26,-76,-78,-87,-143,-86,-117,-137,-138,-144,-16,-17,-23,-24,-145,-153,-108,-118,-119,-146,-154,-147,-148,-151,-27,-149,-150,-152,-28,-139,-140,]),'RCURLY':([6,11,14,21,22,23,26,36,42,43,45,46,47,50,51,53,54,55,57,59,61,62,63,74,77,79,96,108,111,112,113,120,126,127,128,129,139,141,142,166,168,169,170,171,174,175,176,177,178,179,181,182,184,185,201,218,220,221,223,227,230,231,233,250,253,262,263,264,265,271,278,279,280,294,295,296,307,308,314,],[-11,-48,-50,-129,-130,-131,-3,-12,-45,-46,-56,-107,-59,-94,-97,-101,-102,-104,-106,-109,-121,-127,-49,-4,-5,-7,-107,-47,170,171,-113,-103,-128,-133,-134,-135,-6,-8,-9,-55,-58,-60,-61,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-10,249,-112,-114,-117,-137,256,-138,258,-57,280,-51,-53,-54,-52,287,-108,-118,-119,307,-31,-32,-27,314,-28,]),'INTERSECTION':([8,13,15,18,19,20,21,22,23,73,103,134,137,200,],[38,-67,-68,-70,-72,-73,-129,-130,-131,38,-66,-69,-71,-74,]),'FLATTEN':([10,],[44,]),'STRING':([10,17,30,44,49,52,56,58,60,71,84,90,93,98,105,106,107,109,115,116,117,118,119,130,131,133,135,136,143,144,146,149,150,151,152,153,154,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[46,46,96,96,96,96,96,96,96,96,96,96,96,160,96,96,167,96,96,96,96,96,96,96,96,96,96,96,96,96,96,-90,-92,-88,-89,-91,-93,96,96,96,96,96,96,96,96,96,96,96,96,96,96,96,96,96,]),'LANGLE':([10,17,21,22,23,30,44,50,51,53,54,55,57,58,59,61,62,71,84,89,90,96,105,106,109,120,126,127,128,129,130,133,143,144,147,156,171,174,175,176,177,178,179,180,181,182,184,185,208,210,219,223,227,228,231,244,245,247,251,274,275,277,278,279,280,309,310,],[48,48,-129,-130,-131,92,48,-94,-97,-101,-102,-104,-106,92,-109,-121,-127,92,92,149,92,-107,163,48,48,-103,-128,-133,-134,-135,189,193,92,92,206,149,-110,-95,-96,-98,-99,-100,-105,224,-120,-111,-132,-136,240,242,48,-117,-137,189,-138,272,273,276,224,290,291,293,-108,-118,-119,92,92,]),'LCURLY':([10,17,30,44,49,52,56,58,60,71,84,90,93,105,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,149,150,151,152,153,154,164,172,173,180,183,190,194,207,210,219,225,228,241,251,259,281,282,297,309,310,],[49,49,93,49,93,93,93,93,93,93,93,93,93,164,49,49,93,93,93,93,93,190,93,194,93,93,93,93,93,-90,-92,-88,-89,-91,-93,93,93,93,225,93,93,93,93,243,49,93,190,93,225,281,93,297,93,93,93,]),'NUMBER':([10,17,30,34,35,44,49,52,56,58,60,71,84,90,93,98,105,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,149,150,151,152,153,154,161,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[57,57,57,100,100,57,57,57,57,57,57,57,57,57,57,159,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,-90,-92,-88,-89,-91,-93,100,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,57,]),'IF':([10,17,30,44,49,52,56,58,60,71,84,90,93,105,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,149,150,151,152,153,154,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,-90,-92,-88,-89,-91,-93,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,58,]),'LSQUARE':([10,17,20,21,22,23,30,44,49,52,56,58,60,62,71,84,90,93,105,106,109,115,116,117,118,119,126,127,128,129,130,131,133,135,136,143,144,146,147,149,150,151,152,153,154,164,172,173,180,183,184,185,190,194,207,208,219,225,227,228,231,241,251,281,297,309,310,],[60,60,71,-129,-130,-131,60,60,60,60,60,60,60,131,60,60,60,60,60,60,60,60,60,60,60,60,131,-133,-134,-135,60,60,60,60,60,60,60,60,207,-90,-92,-88,-89,-91,-93,60,60,60,60,60,-132,-136,60,60,60,241,60,60,-137,60,-138,60,60,60,60,60,60,]),'SLASH':([18,19,20,21,22,23,46,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,137,171,174,175,176,177,178,179,181,182,184,185,200,223,227,231,278,279,280,],[70,-72,-73,-129,-130,-131,-107,-94,119,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-71,-110,119,119,-98,-99,-100,-105,-120,-111,-132,-136,-74,-117,-137,-138,-108,-118,-119,]),'DOT':([21,22,23,59,61,62,126,127,128,129,181,184,185,205,227,231,239,263,],[-129,-130,-131,123,-121,-127,-128,-133,-134,-135,-120,-132,-136,123,-137,-138,123,123,]),'STAR':([21,22,23,46,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-107,-94,117,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-110,117,117,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'SLASHSLASH':([21,22,23,46,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-107,-94,118,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-110,118,118,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'PLUS':([21,22,23,46,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-107,115,-97,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'COMMA':([21,22,23,39,40,42,43,45,46,47,50,51,53,54,55,57,59,61,62,64,65,68,69,96,102,112,113,120,124,125,126,127,128,129,162,165,166,168,169,170,171,174,175,176,177,178,179,181,182,184,185,186,187,188,192,195,196,220,221,223,226,227,231,238,248,249,250,254,255,256,257,258,260,261,269,278,279,280,298,307,314,],[-129,-130,-131,104,-15,106,107,-56,-107,-59,-94,-97,-101,-102,-104,-106,-109,-121,-127,132,-22,106,107,-107,132,172,-113,-103,183,-116,-128,-133,-134,-135,-14,-18,-55,-58,-60,-61,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,228,-123,-124,-21,-25,-26,-112,-114,-117,-115,-137,-138,183,-16,-17,-57,-122,-125,-126,-23,-24,283,-30,183,-108,-118,-119,-29,-27,-28,]),'AS':([21,22,23,45,46,47,50,51,53,54,55,57,59,61,62,68,69,96,120,126,127,128,129,166,168,169,170,171,174,175,176,177,178,179,181,182,184,185,223,227,231,250,278,279,280,],[-129,-130,-131,-56,-107,-59,-94,-97,-101,-102,-104,-106,-109,-121,-127,135,136,-107,-103,-128,-133,-134,-135,-55,-58,-60,-61,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-57,-108,-118,-119,]),'IN':([21,22,23,41,50,51,53,54,55,57,59,61,62,89,96,120,126,127,128,129,148,156,157,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,105,-94,-97,-101,-102,-104,-106,-109,-121,-127,147,-107,-103,-128,-133,-134,-135,208,147,210,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'NOT':([21,22,23,30,50,51,53,54,55,57,58,59,61,62,71,89,90,96,120,126,127,128,129,143,144,156,171,174,175,176,177,178,179,181,182,184,185,223,227,231,247,278,279,280,309,310,],[-129,-130,-131,84,-94,-97,-101,-102,-104,-106,84,-109,-121,-127,84,148,84,-107,-103,-128,-133,-134,-135,84,84,148,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,277,-108,-118,-119,84,84,]),'EQEQ':([21,22,23,50,51,53,54,55,57,59,61,62,89,96,120,126,127,128,129,156,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,151,-107,-103,-128,-133,-134,-135,151,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'NQ':([21,22,23,50,51,53,54,55,57,59,61,62,89,96,120,126,127,128,129,156,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,152,-107,-103,-128,-133,-134,-135,152,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'LE':([21,22,23,50,51,53,54,55,57,59,61,62,89,96,120,126,127,128,129,156,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,153,-107,-103,-128,-133,-134,-135,153,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'GE':([21,22,23,50,51,53,54,55,57,59,61,62,89,96,120,126,127,128,129,156,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,154,-107,-103,-128,-133,-134,-135,154,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'AND':([21,22,23,50,51,53,54,55,57,59,61,62,82,83,85,86,87,88,89,96,120,126,127,128,129,145,156,171,174,175,176,177,178,179,181,182,184,185,202,203,204,205,209,223,227,231,239,266,267,278,279,280,284,285,301,302,305,311,312,313,317,318,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,144,-79,-81,-82,-83,-84,-85,-107,-103,-128,-133,-134,-135,-80,-85,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,144,-78,-87,-143,-86,-117,-137,-138,-144,-145,-153,-108,-118,-119,-146,-154,-147,-148,-151,-149,-150,-152,-139,-140,]),'OR':([21,22,23,50,51,53,54,55,57,59,61,62,81,82,83,85,86,87,88,89,96,120,126,127,128,129,145,156,171,174,175,176,177,178,179,181,182,184,185,202,203,204,205,209,223,227,231,239,266,267,278,279,280,284,285,301,302,305,311,312,313,317,318,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,143,-77,-79,-81,-82,-83,-84,-85,-107,-103,-128,-133,-134,-135,-80,-85,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-76,-78,-87,-143,-86,-117,-137,-138,-144,-145,-153,-108,-118,-119,-146,-154,-147,-148,-151,-149,-150,-152,-139,-140,]),'COLON':([21,22,23,46,50,51,53,54,55,57,59,61,62,96,114,120,126,127,128,129,167,171,174,175,176,177,178,179,181,182,184,185,223,227,231,278,279,280,],[-129,-130,-131,109,-94,-97,-101,-102,-104,-106,-109,-121,-127,-107,173,-103,-128,-133,-134,-135,219,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-117,-137,-138,-108,-118,-119,]),'THEN':([21,22,23,50,51,53,54,55,57,59,61,62,81,82,83,85,86,87,88,89,96,120,122,126,127,128,129,145,171,174,175,176,177,178,179,181,182,184,185,202,203,204,205,209,223,227,231,239,266,267,278,279,280,284,285,301,302,305,311,312,313,317,318,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,-75,-77,-79,-81,-82,-83,-84,-85,-107,-103,180,-128,-133,-134,-135,-80,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,-76,-78,-87,-143,-86,-117,-137,-138,-144,-145,-153,-108,-118,-119,-146,-154,-147,-148,-151,-149,-150,-152,-139,-140,]),'RSQUARE':([21,22,23,50,51,53,54,55,57,59,61,62,81,82,83,85,86,87,88,89,96,120,124,125,126,127,128,129,138,145,171,174,175,176,177,178,179,181,182,184,185,191,202,203,204,205,209,223,226,227,231,238,239,266,267,269,278,279,280,284,285,301,302,305,311,312,313,317,318,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,-75,-77,-79,-81,-82,-83,-84,-85,-107,-103,182,-116,-128,-133,-134,-135,200,-80,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,231,-76,-78,-87,-143,-86,-117,-115,-137,-138,267,-144,-145,-153,285,-108,-118,-119,-146,-154,-147,-148,-151,-149,-150,-152,-139,-140,]),'WITH':([21,22,23,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,171,174,175,176,177,178,179,181,182,184,185,198,199,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,235,236,-117,-137,-138,-108,-118,-119,]),'ELSE':([21,22,23,50,51,53,54,55,57,59,61,62,96,120,126,127,128,129,171,174,175,176,177,178,179,181,182,184,185,222,223,227,231,278,279,280,],[-129,-130,-131,-94,-97,-101,-102,-104,-106,-109,-121,-127,-107,-103,-128,-133,-134,-135,-110,-95,-96,-98,-99,-100,-105,-120,-111,-132,-136,251,-117,-137,-138,-108,-118,-119,]),'EVERY':([30,58,71,84,90,143,144,309,310,],[94,94,94,94,94,94,94,94,94,]),'SOME':([30,58,71,84,90,143,144,309,310,],[95,95,95,95,95,95,95,95,95,]),'BY':([33,],[98,]),'EQ':([66,],[133,]),'FUNCTION':([133,235,236,],[197,197,197,]),'ASCD':([159,160,],[213,213,]),'DESC':([159,160,],[214,214,]),'SUBSET':([211,246,],[244,274,]),'SUPERSET':([211,246,],[245,275,]),'PROPER':([211,],[246,]),'IS':([211,],[247,]),'SATISFIES':([286,287,],[299,300,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'Start':([0,],[1,]),'Set':([0,16,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[2,67,110,158,217,229,232,237,252,268,270,288,289,292,303,304,306,]),'FLWRexpr':([0,49,164,190,194,225,243,281,297,],[3,111,218,230,233,253,271,295,295,]),'UnionExpr':([0,16,24,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[4,4,72,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,]),'ForExpr':([0,49,164,190,194,225,243,281,297,],[5,5,5,5,5,5,5,5,5,]),'ReturnExpr':([0,5,7,27,28,29,49,75,76,78,140,164,190,194,225,243,281,297,],[6,26,36,74,77,79,6,139,141,142,201,6,6,6,6,6,6,6,]),'LetExpr':([0,5,49,164,190,194,225,243,281,297,],[7,27,7,7,7,7,7,7,7,7,]),'IntersectionExpr':([0,16,24,25,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[8,8,8,73,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,]),'CollectList':([0,5,7,27,28,29,49,75,76,78,140,164,190,194,225,243,281,297,],[11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,]),'Collection':([0,16,24,25,38,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[13,13,13,13,103,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,]),'Collect':([0,5,7,11,27,28,29,49,75,76,78,140,164,190,194,225,243,281,297,],[14,14,14,63,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,]),'Query':([0,16,24,25,38,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,]),'Query_':([0,16,24,25,38,48,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,]),'Entity':([0,16,24,25,38,48,70,92,163,189,193,206,224,240,242,272,273,276,290,291,293,],[19,19,19,19,19,19,137,19,19,19,19,19,19,19,19,19,19,19,19,19,19,]),'Name':([0,10,16,17,24,25,30,38,44,48,49,52,56,58,60,70,71,84,90,92,93,105,106,109,115,116,117,118,119,123,130,131,133,135,136,143,144,146,147,163,164,172,173,180,183,189,190,193,194,206,207,208,219,224,225,228,235,236,240,241,242,251,272,273,276,281,290,291,293,297,309,310,],[20,62,20,62,20,20,62,20,62,20,62,62,62,62,62,20,62,62,62,20,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,62,20,62,62,62,62,62,20,62,20,62,20,62,62,62,20,62,62,62,62,20,62,20,62,20,20,20,62,20,20,20,62,62,62,]),'WhereExpr':([5,27,],[28,75,]),'OrderByExpr':([5,27,28,75,],[29,76,78,140,]),'OrderBy':([5,27,28,75,],[31,31,31,31,]),'LimitExpr':([5,27,28,31,75,],[32,32,32,97,32,]),'ForList':([9,],[39,]),'ForDefinition':([9,104,],[40,162,]),'OutputTuple':([10,17,],[42,68,]),'OutputDict':([10,17,],[43,69,]),'OutputValue':([10,17,44,106,109,219,],[45,45,108,166,168,250,]),'ArithExpr':([10,17,30,44,49,56,58,60,71,84,90,93,106,109,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[47,47,89,47,114,121,89,125,89,89,156,114,47,47,188,191,195,198,199,89,89,204,114,114,221,223,226,114,114,125,47,114,188,125,223,296,296,89,89,]),'AddSub':([10,17,30,44,49,56,58,60,71,84,90,93,106,109,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,50,]),'MulDiv':([10,17,30,44,49,56,58,60,71,84,90,93,106,109,115,116,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[51,51,51,51,51,51,51,51,51,51,51,51,51,51,174,175,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,51,]),'ArithUnary':([10,17,30,44,49,56,58,60,71,84,90,93,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,176,177,178,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,53,]),'Atomic':([10,17,30,44,49,52,56,58,60,71,84,90,93,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[54,54,54,54,54,120,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,54,]),'Value':([10,17,30,44,49,52,56,58,60,71,84,90,93,105,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,164,172,173,180,183,190,194,207,219,225,228,241,251,281,297,309,310,],[55,55,55,55,55,55,55,55,55,55,55,55,55,165,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,55,]),'AttributeValue':([10,17,30,44,49,52,56,58,60,71,84,90,93,105,106,109,115,116,117,118,119,130,131,133,135,136,143,144,146,147,164,172,173,180,183,190,194,207,208,219,225,228,235,236,241,251,281,297,309,310,],[59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,59,205,59,59,59,59,59,59,59,59,239,59,59,59,263,263,59,59,59,59,59,59,]),'Attr':([10,17,30,44,49,52,56,58,60,71,84,90,93,105,106,109,115,116,117,118,119,123,130,131,133,135,136,143,144,146,147,164,172,173,180,183,190,194,207,208,219,225,228,235,236,241,251,281,297,309,310,],[61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,181,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,61,]),'LetList':([12,37,],[64,102,]),'LetDefinition':([12,37,132,],[65,65,192,]),'Where':([30,58,71,90,309,310,],[80,122,138,155,315,316,]),'OrExpr':([30,58,71,90,309,310,],[81,81,81,81,81,81,]),'AndExpr':([30,58,71,90,143,309,310,],[82,82,82,82,202,82,82,]),'NotExpr':([30,58,71,90,143,144,309,310,],[83,83,83,83,83,203,83,83,]),'BooleanExpr':([30,58,71,84,90,143,144,309,310,],[85,85,85,145,85,85,85,85,85,]),'CmpExpr':([30,58,71,84,90,143,144,309,310,],[86,86,86,86,86,86,86,86,86,]),'QuantifiedExpr':([30,58,71,84,90,143,144,309,310,],[87,87,87,87,87,87,87,87,87,]),'SetExpr':([30,58,71,84,90,143,144,309,310,],[88,88,88,88,88,88,88,88,88,]),'Quantifier':([30,58,71,84,90,143,144,309,310,],[91,91,91,91,91,91,91,91,91,]),'Count':([34,35,161,],[99,101,216,]),'NameValPairs':([49,93,164,190,194,225,],[112,112,112,112,112,112,]),'NameValPair':([49,93,164,172,190,194,225,],[113,113,113,220,113,113,113,]),'ValueList':([60,207,241,],[124,238,269,]),'Call':([62,],[126,]),'Call_':([62,126,],[127,184,]),'Fcall':([62,126,],[128,128,]),'Dcall':([62,126,],[129,129,]),'CmpOp':([89,156,],[146,146,]),'ParameterList':([130,],[186,]),'Parameter':([130,228,],[187,254,]),'Function':([133,235,236,],[196,264,264,]),'OrderDirection':([159,160,],[212,215,]),'IfBody':([180,251,],[222,278,]),'FParams':([234,],[260,]),'CollectFunction':([235,236,],[262,265,]),'FBody':([281,297,],[294,308,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> Start","S'",1,None,None,None),
+  ('Start -> Set','Start',1,'p_Start1','parser.py',62),
+  ('Start -> FLWRexpr','Start',1,'p_Start2','parser.py',66),
+  ('FLWRexpr -> ForExpr ReturnExpr','FLWRexpr',2,'p_FLWRexpr1','parser.py',70),
+  ('FLWRexpr -> ForExpr LetExpr ReturnExpr','FLWRexpr',3,'p_FLWRexpr2','parser.py',76),
+  ('FLWRexpr -> ForExpr WhereExpr ReturnExpr','FLWRexpr',3,'p_FLWRexpr3','parser.py',82),
+  ('FLWRexpr -> ForExpr LetExpr WhereExpr ReturnExpr','FLWRexpr',4,'p_FLWRexpr4','parser.py',88),
+  ('FLWRexpr -> ForExpr OrderByExpr ReturnExpr','FLWRexpr',3,'p_FLWRexpr5','parser.py',99),
+  ('FLWRexpr -> ForExpr LetExpr OrderByExpr ReturnExpr','FLWRexpr',4,'p_FLWRexpr6','parser.py',110),
+  ('FLWRexpr -> ForExpr WhereExpr OrderByExpr ReturnExpr','FLWRexpr',4,'p_FLWRexpr7','parser.py',122),
+  ('FLWRexpr -> ForExpr LetExpr WhereExpr OrderByExpr ReturnExpr','FLWRexpr',5,'p_FLWRexpr8','parser.py',134),
+  ('FLWRexpr -> ReturnExpr','FLWRexpr',1,'p_FLWRexpr9','parser.py',147),
+  ('FLWRexpr -> LetExpr ReturnExpr','FLWRexpr',2,'p_FLWRexpr10','parser.py',151),
+  ('ForExpr -> FOR ForList','ForExpr',2,'p_ForExpr','parser.py',157),
+  ('ForList -> ForList COMMA ForDefinition','ForList',3,'p_ForList1','parser.py',161),
+  ('ForList -> ForDefinition','ForList',1,'p_ForList2','parser.py',165),
+  ('ForDefinition -> NAME IN LANGLE Set RANGLE','ForDefinition',5,'p_ForDefinition1','parser.py',169),
+  ('ForDefinition -> NAME IN LCURLY FLWRexpr RCURLY','ForDefinition',5,'p_ForDefinition2','parser.py',173),
+  ('ForDefinition -> NAME IN Value','ForDefinition',3,'p_ForDefinition3','parser.py',177),
+  ('LetExpr -> LetExpr LET LetList','LetExpr',3,'p_LetExpr1','parser.py',181),
+  ('LetExpr -> LET LetList','LetExpr',2,'p_LetExpr2','parser.py',185),
+  ('LetList -> LetList COMMA LetDefinition','LetList',3,'p_LetList1','parser.py',189),
+  ('LetList -> LetDefinition','LetList',1,'p_LetList2','parser.py',193),
+  ('LetDefinition -> NAME EQ LANGLE Set RANGLE','LetDefinition',5,'p_LetDefinition1','parser.py',197),
+  ('LetDefinition -> NAME EQ LCURLY FLWRexpr RCURLY','LetDefinition',5,'p_LetDefinition2','parser.py',201),
+  ('LetDefinition -> NAME EQ ArithExpr','LetDefinition',3,'p_LetDefinition3','parser.py',205),
+  ('LetDefinition -> NAME EQ Function','LetDefinition',3,'p_LetDefinition4','parser.py',209),
+  ('Function -> FUNCTION LPAREN RPAREN LCURLY FBody RCURLY','Function',6,'p_Function1','parser.py',213),
+  ('Function -> FUNCTION LPAREN FParams RPAREN LCURLY FBody RCURLY','Function',7,'p_Function2','parser.py',217),
+  ('FParams -> FParams COMMA NAME','FParams',3,'p_FParams1','parser.py',221),
+  ('FParams -> NAME','FParams',1,'p_FParams2','parser.py',225),
+  ('FBody -> FLWRexpr','FBody',1,'p_Fbody1','parser.py',229),
+  ('FBody -> ArithExpr','FBody',1,'p_Fbody3','parser.py',233),
+  ('WhereExpr -> WHERE Where','WhereExpr',2,'p_WhereExpr','parser.py',237),
+  ('OrderByExpr -> OrderBy','OrderByExpr',1,'p_OrderByExpr1','parser.py',241),
+  ('OrderByExpr -> OrderBy LimitExpr','OrderByExpr',2,'p_OrderByExpr2','parser.py',245),
+  ('OrderByExpr -> LimitExpr','OrderByExpr',1,'p_OrderByExpr3','parser.py',249),
+  ('OrderBy -> ORDER BY NUMBER OrderDirection','OrderBy',4,'p_OrderBy1','parser.py',253),
+  ('OrderBy -> ORDER BY STRING OrderDirection','OrderBy',4,'p_OrderBy2','parser.py',257),
+  ('LimitExpr -> LIMIT Count','LimitExpr',2,'p_LimitExpr1','parser.py',261),
+  ('LimitExpr -> OFFSET Count','LimitExpr',2,'p_LimitExpr2','parser.py',265),
+  ('LimitExpr -> LIMIT Count OFFSET Count','LimitExpr',4,'p_LimitExpr3','parser.py',269),
+  ('Count -> NUMBER','Count',1,'p_Count','parser.py',273),
+  ('OrderDirection -> ASCD','OrderDirection',1,'p_OrderDirection1','parser.py',282),
+  ('OrderDirection -> DESC','OrderDirection',1,'p_OrderDirection2','parser.py',286),
+  ('ReturnExpr -> RETURN OutputTuple','ReturnExpr',2,'p_ReturnExpr1','parser.py',290),
+  ('ReturnExpr -> RETURN OutputDict','ReturnExpr',2,'p_ReturnExpr2','parser.py',294),
+  ('ReturnExpr -> RETURN FLATTEN OutputValue','ReturnExpr',3,'p_ReturnExpr3','parser.py',298),
+  ('ReturnExpr -> CollectList','ReturnExpr',1,'p_ReturnExpr4','parser.py',302),
+  ('CollectList -> CollectList Collect','CollectList',2,'p_CollectList1','parser.py',306),
+  ('CollectList -> Collect','CollectList',1,'p_CollectList2','parser.py',310),
+  ('Collect -> COLLECT OutputTuple AS ArithExpr WITH CollectFunction','Collect',6,'p_Collect1','parser.py',314),
+  ('Collect -> COLLECT OutputDict AS ArithExpr WITH CollectFunction','Collect',6,'p_Collect2','parser.py',318),
+  ('CollectFunction -> AttributeValue','CollectFunction',1,'p_CollectFunction1','parser.py',322),
+  ('CollectFunction -> Function','CollectFunction',1,'p_CollectFunction2','parser.py',326),
+  ('OutputTuple -> OutputTuple COMMA OutputValue','OutputTuple',3,'p_OutputTuple1','parser.py',330),
+  ('OutputTuple -> OutputValue','OutputTuple',1,'p_OutputTuple2','parser.py',334),
+  ('OutputDict -> OutputDict COMMA STRING COLON OutputValue','OutputDict',5,'p_OutputDict1','parser.py',338),
+  ('OutputDict -> STRING COLON OutputValue','OutputDict',3,'p_OutputDict2','parser.py',342),
+  ('OutputValue -> ArithExpr','OutputValue',1,'p_OutputValue1','parser.py',346),
+  ('OutputValue -> LANGLE Set RANGLE','OutputValue',3,'p_OutputValue2','parser.py',350),
+  ('OutputValue -> LCURLY FLWRexpr RCURLY','OutputValue',3,'p_OutputValue3','parser.py',354),
+  ('Set -> Set DASH UnionExpr','Set',3,'p_Set1','parser.py',358),
+  ('Set -> UnionExpr','Set',1,'p_Set2','parser.py',362),
+  ('UnionExpr -> UnionExpr UNION IntersectionExpr','UnionExpr',3,'p_UnionExpr1','parser.py',366),
+  ('UnionExpr -> IntersectionExpr','UnionExpr',1,'p_UnionExpr2','parser.py',370),
+  ('IntersectionExpr -> IntersectionExpr INTERSECTION Collection','IntersectionExpr',3,'p_IntersectionExpr1','parser.py',374),
+  ('IntersectionExpr -> Collection','IntersectionExpr',1,'p_IntersectionExpr2','parser.py',378),
+  ('Collection -> Query','Collection',1,'p_Collection1','parser.py',382),
+  ('Collection -> LPAREN Set RPAREN','Collection',3,'p_Collection2','parser.py',386),
+  ('Query -> Query_','Query',1,'p_QueryStart','parser.py',390),
+  ('Query_ -> Query_ SLASH Entity','Query_',3,'p_Query1','parser.py',394),
+  ('Query_ -> Entity','Query_',1,'p_Query2','parser.py',398),
+  ('Entity -> Name','Entity',1,'p_Entity1','parser.py',402),
+  ('Entity -> Name LSQUARE Where RSQUARE','Entity',4,'p_Entity2','parser.py',406),
+  ('Where -> OrExpr','Where',1,'p_Where','parser.py',410),
+  ('OrExpr -> OrExpr OR AndExpr','OrExpr',3,'p_OrExpr1','parser.py',414),
+  ('OrExpr -> AndExpr','OrExpr',1,'p_OrExpr2','parser.py',420),
+  ('AndExpr -> AndExpr AND NotExpr','AndExpr',3,'p_AndExpr1','parser.py',424),
+  ('AndExpr -> NotExpr','AndExpr',1,'p_AndExpr2','parser.py',430),
+  ('NotExpr -> NOT BooleanExpr','NotExpr',2,'p_NotExpr1','parser.py',434),
+  ('NotExpr -> BooleanExpr','NotExpr',1,'p_NotExpr2','parser.py',438),
+  ('BooleanExpr -> CmpExpr','BooleanExpr',1,'p_BooleanExpr1','parser.py',442),
+  ('BooleanExpr -> QuantifiedExpr','BooleanExpr',1,'p_BooleanExpr2','parser.py',446),
+  ('BooleanExpr -> SetExpr','BooleanExpr',1,'p_BooleanExpr3','parser.py',450),
+  ('BooleanExpr -> ArithExpr','BooleanExpr',1,'p_BooleanExpr4','parser.py',454),
+  ('BooleanExpr -> LPAREN Where RPAREN','BooleanExpr',3,'p_BooleanExpr5','parser.py',458),
+  ('CmpExpr -> ArithExpr CmpOp ArithExpr','CmpExpr',3,'p_CmpExpr','parser.py',462),
+  ('CmpOp -> EQEQ','CmpOp',1,'p_CmpOp','parser.py',466),
+  ('CmpOp -> NQ','CmpOp',1,'p_CmpOp','parser.py',467),
+  ('CmpOp -> LANGLE','CmpOp',1,'p_CmpOp','parser.py',468),
+  ('CmpOp -> LE','CmpOp',1,'p_CmpOp','parser.py',469),
+  ('CmpOp -> RANGLE','CmpOp',1,'p_CmpOp','parser.py',470),
+  ('CmpOp -> GE','CmpOp',1,'p_CmpOp','parser.py',471),
+  ('ArithExpr -> AddSub','ArithExpr',1,'p_ArithExpr','parser.py',475),
+  ('AddSub -> AddSub PLUS MulDiv','AddSub',3,'p_AddSub1','parser.py',479),
+  ('AddSub -> AddSub DASH MulDiv','AddSub',3,'p_AddSub2','parser.py',484),
+  ('AddSub -> MulDiv','AddSub',1,'p_AddSub3','parser.py',489),
+  ('MulDiv -> MulDiv STAR ArithUnary','MulDiv',3,'p_MulDiv1','parser.py',493),
+  ('MulDiv -> MulDiv SLASHSLASH ArithUnary','MulDiv',3,'p_MulDiv2','parser.py',498),
+  ('MulDiv -> MulDiv SLASH ArithUnary','MulDiv',3,'p_MulDiv3','parser.py',502),
+  ('MulDiv -> ArithUnary','MulDiv',1,'p_MulDiv4','parser.py',506),
+  ('ArithUnary -> Atomic','ArithUnary',1,'p_ArithUnary1','parser.py',510),
+  ('ArithUnary -> DASH Atomic','ArithUnary',2,'p_ArithUnary2','parser.py',514),
+  ('Atomic -> Value','Atomic',1,'p_Atomic1','parser.py',522),
+  ('Atomic -> LPAREN ArithExpr RPAREN','Atomic',3,'p_Atomic2','parser.py',526),
+  ('Value -> NUMBER','Value',1,'p_Value1','parser.py',530),
+  ('Value -> STRING','Value',1,'p_Value2','parser.py',534),
+  ('Value -> IF Where THEN IfBody ELSE IfBody','Value',6,'p_Value3','parser.py',538),
+  ('Value -> AttributeValue','Value',1,'p_Value4','parser.py',542),
+  ('Value -> LCURLY NameValPairs RCURLY','Value',3,'p_Value5','parser.py',546),
+  ('Value -> LSQUARE ValueList RSQUARE','Value',3,'p_Value6','parser.py',550),
+  ('NameValPairs -> NameValPairs COMMA NameValPair','NameValPairs',3,'p_NameValPairs1','parser.py',554),
+  ('NameValPairs -> NameValPair','NameValPairs',1,'p_NameValPairs2','parser.py',558),
+  ('NameValPair -> ArithExpr COLON ArithExpr','NameValPair',3,'p_NameValPair','parser.py',562),
+  ('ValueList -> ValueList COMMA ArithExpr','ValueList',3,'p_ValueList1','parser.py',566),
+  ('ValueList -> ArithExpr','ValueList',1,'p_ValueList2','parser.py',570),
+  ('IfBody -> ArithExpr','IfBody',1,'p_IfBody1','parser.py',574),
+  ('IfBody -> LANGLE Set RANGLE','IfBody',3,'p_IfBody2','parser.py',578),
+  ('IfBody -> LCURLY FLWRexpr RCURLY','IfBody',3,'p_IfBody3','parser.py',582),
+  ('AttributeValue -> AttributeValue DOT Attr','AttributeValue',3,'p_AttributeValue1','parser.py',586),
+  ('AttributeValue -> Attr','AttributeValue',1,'p_AttributeValue2','parser.py',590),
+  ('ParameterList -> ParameterList COMMA Parameter','ParameterList',3,'p_ParameterList1','parser.py',594),
+  ('ParameterList -> Parameter','ParameterList',1,'p_ParameterList2','parser.py',598),
+  ('Parameter -> ArithExpr','Parameter',1,'p_Parameter1','parser.py',602),
+  ('Parameter -> LANGLE Set RANGLE','Parameter',3,'p_Parameter2','parser.py',606),
+  ('Parameter -> LCURLY FLWRexpr RCURLY','Parameter',3,'p_Parameter3','parser.py',610),
+  ('Attr -> Name','Attr',1,'p_Attr1','parser.py',614),
+  ('Attr -> Name Call','Attr',2,'p_Attr2','parser.py',618),
+  ('Name -> NAME','Name',1,'p_Name','parser.py',622),
+  ('Name -> LIMIT','Name',1,'p_Name','parser.py',623),
+  ('Name -> OFFSET','Name',1,'p_Name','parser.py',624),
+  ('Call -> Call Call_','Call',2,'p_Call1','parser.py',630),
+  ('Call -> Call_','Call',1,'p_Call2','parser.py',634),
+  ('Call_ -> Fcall','Call_',1,'p_Call_1','parser.py',638),
+  ('Call_ -> Dcall','Call_',1,'p_Call_2','parser.py',642),
+  ('Fcall -> LPAREN RPAREN','Fcall',2,'p_Fcall1','parser.py',646),
+  ('Fcall -> LPAREN ParameterList RPAREN','Fcall',3,'p_Fcall2','parser.py',650),
+  ('Dcall -> LSQUARE ArithExpr RSQUARE','Dcall',3,'p_Dcall','parser.py',654),
+  ('QuantifiedExpr -> Quantifier NAME IN LANGLE Set RANGLE SATISFIES LPAREN Where RPAREN','QuantifiedExpr',10,'p_QuantifiedExpr1','parser.py',658),
+  ('QuantifiedExpr -> Quantifier NAME IN LCURLY FLWRexpr RCURLY SATISFIES LPAREN Where RPAREN','QuantifiedExpr',10,'p_QuantifiedExpr2','parser.py',662),
+  ('Quantifier -> EVERY','Quantifier',1,'p_Quantifier1','parser.py',666),
+  ('Quantifier -> SOME','Quantifier',1,'p_Quantifier2','parser.py',670),
+  ('SetExpr -> ArithExpr IN AttributeValue','SetExpr',3,'p_SetExpr__1','parser.py',674),
+  ('SetExpr -> ArithExpr NOT IN AttributeValue','SetExpr',4,'p_SetExpr__2','parser.py',680),
+  ('SetExpr -> ArithExpr IN LANGLE Set RANGLE','SetExpr',5,'p_SetExpr1','parser.py',688),
+  ('SetExpr -> ArithExpr NOT IN LANGLE Set RANGLE','SetExpr',6,'p_SetExpr2','parser.py',694),
+  ('SetExpr -> LANGLE Set RANGLE SUBSET LANGLE Set RANGLE','SetExpr',7,'p_SetExpr3','parser.py',700),
+  ('SetExpr -> LANGLE Set RANGLE SUPERSET LANGLE Set RANGLE','SetExpr',7,'p_SetExpr4','parser.py',706),
+  ('SetExpr -> LANGLE Set RANGLE PROPER SUBSET LANGLE Set RANGLE','SetExpr',8,'p_SetExpr5','parser.py',712),
+  ('SetExpr -> LANGLE Set RANGLE PROPER SUPERSET LANGLE Set RANGLE','SetExpr',8,'p_SetExpr6','parser.py',718),
+  ('SetExpr -> LANGLE Set RANGLE IS LANGLE Set RANGLE','SetExpr',7,'p_SetExpr7','parser.py',724),
+  ('SetExpr -> LANGLE Set RANGLE IS NOT LANGLE Set RANGLE','SetExpr',8,'p_SetExpr8','parser.py',730),
+  ('SetExpr -> ArithExpr IN LSQUARE ValueList RSQUARE','SetExpr',5,'p_SetExpr9','parser.py',736),
+  ('SetExpr -> ArithExpr NOT IN LSQUARE ValueList RSQUARE','SetExpr',6,'p_SetExpr10','parser.py',742),
+]
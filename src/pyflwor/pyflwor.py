@@ -10,24 +10,244 @@ Purpose: The public API for PyFlwor.
 """
 from builtins import bytes
 
-from pyflwor.parser import Parser
-from pyflwor.lexer import Lexer
+from concurrent.futures import ThreadPoolExecutor
 
+from pyflwor.parser import get_parser
+from pyflwor.lexer import get_lexer
+from pyflwor.cache import QueryCache
+import pyflwor.symbols as symbols
+import pyflwor.aio as aio
+import pyflwor.batch as batch
+import pyflwor.codegen as codegen
+import pyflwor.columnar as columnar
+import pyflwor.nodes as nodes
+import pyflwor.optimizer as optimizer
+import pyflwor.parallel as parallel
 
-def compile(query):
+## The process wide cache of compiled queries. Use query_cache.maxsize to
+## resize it, query_cache.info() for the hit/miss counters and
+## query_cache.clear() to empty it.
+query_cache = QueryCache()
+
+
+backends = ("closures", "codegen", "columnar")
+
+
+def parse(query):
+    """
+    Parses a query string into its abstract syntax tree, see nodes.py.
+    """
+    return get_parser(nodes).parse(
+        bytes(query, "utf-8").decode("unicode_escape"), lexer=get_lexer()
+    )
+
+
+def _iterate(query):
+    iterate = getattr(query, "iterate", None)
+    if iterate is None:
+
+        def iterate(objs):
+            return iter(query(objs))
+
+        object.__setattr__(iterate, "__objquery__", True)
+    return iterate
+
+
+def _map(query):
+    def map(namespaces, workers=None):
+        """
+        The results of the query for each of the namespaces, in order. With
+        workers the namespaces are evaluated by a pool of that many threads.
+        """
+        if workers is None:
+            return [query(objs) for objs in namespaces]
+        with ThreadPoolExecutor(workers) as pool:
+            return list(pool.map(query, namespaces))
+
+    return map
+
+
+def _asynchronous(tree):
+    """
+    The aexecute and aiter functions of the query tree, evaluated by aio.py.
+    The tree is compiled on first use.
+    """
+    queries = list()
+
+    def query():
+        if not queries:
+            query = tree.lower(aio)
+            if not hasattr(query, "iterate"):
+                query = aio.iterate(query)
+            queries.append(aio.loaded(query))
+        return queries[0]
+
+    async def aexecute(objs):
+        """
+        Awaits the results of the query for the namespace objs.
+        """
+        return await query()(objs)
+
+    def aiter(objs):
+        """
+        An async iterator over the results of the query for the namespace
+        objs.
+        """
+        return query().iterate(objs)
+
+    return aexecute, aiter
+
+
+def _compile(
+    query, backend, optimize, lazy, executor=None, workers=None, batch_size=None
+):
+    if backend not in backends:
+        raise ValueError(
+            "unknown backend %r, expected one of %s" % (backend, ", ".join(backends))
+        )
+    if lazy and (executor is not None or workers is not None):
+        raise ValueError("the results of a parallel query can not be iterated")
+    tree = parse(query)
+    if lazy and isinstance(tree, nodes.FLWR) and tree.collecting:
+        raise ValueError("the results of a collect expression can not be iterated")
+    if optimize:
+        tree = optimizer.optimize(tree)
+    compiled = _build(tree, backend, lazy)
+    if not lazy:
+        compiled = batch.prefetched(compiled)
+    if executor is not None or workers is not None:
+        compiled = parallel.generate(
+            (query, backend, optimize),
+            tree,
+            compiled,
+            _build,
+            executor,
+            workers,
+            batch_size,
+        )
+    object.__setattr__(compiled, "map", _map(compiled))
+    aexecute, aiter = _asynchronous(tree)
+    object.__setattr__(compiled, "aexecute", aexecute)
+    object.__setattr__(compiled, "aiter", aiter)
+    return compiled
+
+
+def _build(tree, backend, lazy):
+    if backend == "columnar":
+        vector = None
+        if columnar.numpy is not None and not lazy:
+            try:
+                vector = tree.lower(columnar)
+            except columnar.Unsupported:
+                pass  # evaluated row by row
+        rows = tree.lower(symbols)
+        return columnar.generate(vector, _iterate(rows) if lazy else rows, tree.names())
+    if backend == "codegen":
+        try:
+            return codegen.generate(tree.lower(codegen), lazy=lazy)
+        except codegen.Unsupported:
+            pass  # fall back on the closures
+    if lazy:
+        return _iterate(tree.lower(symbols))
+    return tree.lower(symbols)
+
+
+def compile(
+    query,
+    cache=True,
+    backend="closures",
+    optimize=True,
+    lazy=False,
+    executor=None,
+    workers=None,
+    batch_size=None,
+):
     """
     Compiles a query string into a python function that takes one parameter, the execution namespace.
     The compiled function is re-usable. For information on the grammar see X.
+
+    Compiled queries are kept in query_cache, so compiling the same query text twice returns the
+    same function. Pass cache=False to always build a fresh one.
+
+    backend selects how the query is compiled:
+        "closures" composes the functions in symbols.py (the default).
+        "codegen" generates the python source of a single function, see codegen.py. The source is
+            available as the __source__ attribute of the returned function. Queries using
+            constructs the code generator does not support are compiled with "closures".
+        "columnar" evaluates the queries over tables of NumPy columns (a dict of equal length
+            1-D arrays or a structured array) with array operations, see columnar.py. Other
+            queries, and queries over other data, are evaluated as with "closures", the rows of
+            the tables being columnar.Row objects.
+
+    The query is parsed into an abstract syntax tree which is rewritten by the passes in
+    optimizer.py before being compiled, pass optimize=False to skip them.
+
+    With lazy=True the compiled function returns an iterator over the results instead of a list or
+    tuple. Path expressions and flwr expressions without an order by clause yield each result as
+    soon as it is found, without holding on to the others.
+
+    With executor (a concurrent.futures executor) or workers the query is evaluated in parallel,
+    by the executor or by a ProcessPoolExecutor of that many workers, see parallel.py. The
+    iterations of the first for clause of a flwr expression are split into chunks, the results
+    are merged in order and collect expressions fold the values of the chunks in order. Path
+    expressions are traversed one step at a time, the where of each step being tested over all
+    the values the step reaches. Each task evaluates batch_size values, by default the values
+    are split into four tasks per worker. A process pool receives the namespace values the query
+    reads and the values of the tasks pickled, a ValueError is raised when they can not be
+    pickled, use a ThreadPoolExecutor for them. Parallel queries are not kept in query_cache,
+    the process pool of workers is shut down when the compiled function is collected: keep the
+    compiled function to reuse its pool.
+
+    The map attribute of the compiled function evaluates it over a sequence of namespaces, see
+    execute_many. Its aexecute and aiter attributes evaluate it with asyncio, see aexecute.
+    """
+    if not cache or executor is not None or workers is not None:
+        ## a parallel query holds on to its executor and pool, it is not kept
+        ## in the process wide cache
+        return _compile(query, backend, optimize, lazy, executor, workers, batch_size)
+    return query_cache.get(
+        QueryCache.key(query, backend=backend, optimize=optimize, lazy=lazy),
+        lambda: _compile(query, backend, optimize, lazy),
+    )
+
+
+def execute(query, namespace, **options):
+    """
+    Compiles the query string and executes it with the suppied namespace. The compiled query is
+    looked up in (and stored into) query_cache, so repeatedly executing the same query text only
+    parses it once. Any options are passed on to compile.
+    """
+    return compile(query, **options)(namespace)
+
+
+def execute_many(query, namespaces, workers=None, **options):
+    """
+    Compiles the query string once and executes it with each of the namespaces, returning the
+    list of their results in order. With workers the namespaces are evaluated by a pool of that
+    many threads. Any options are passed on to compile.
+    """
+    return compile(query, **options).map(namespaces, workers=workers)
+
+
+async def aexecute(query, namespace, **options):
+    """
+    Compiles the query string and awaits its results for the namespace. The awaitable values
+    the query computes (the coroutines returned by async functions, futures, tasks) are awaited
+    and the async iterables (async generators) are read with async for, see aio.py. The
+    independent parts of the query (the bindings of the for clauses of a flwr expression, the
+    values of the steps of a path expression) are evaluated concurrently with asyncio.gather.
+    Any options are passed on to compile.
     """
-    return Parser().parse(bytes(query, "utf-8").decode("unicode_escape"), lexer=Lexer())
+    return await compile(query, **options).aexecute(namespace)
 
 
-def execute(query, namespace):
+def aiter(query, namespace, **options):
     """
-    Compiles the query string and executes it with the suppied namespace. If you want to execute a
-    particular query many times, use compile to get a query function.
+    Compiles the query string and returns an async iterator over its results for the namespace,
+    see aexecute. The bindings of a flwr expression (without an order by clause) are evaluated
+    aio.BATCH at a time.
     """
-    return compile(query)(namespace)
+    return compile(query, **options).aiter(namespace)
 
 
 if __name__ == "__main__":
@@ -13,8 +13,15 @@ from builtins import str
 from builtins import range
 from builtins import object
 
+import heapq
 from collections import deque
-from itertools import product
+from itertools import chain, islice, product
+from operator import attrgetter, itemgetter
+
+import pyflwor.indexes as indexes
+import pyflwor.batch as batch
+
+_missing = object()
 
 
 class Attribute(object):
@@ -79,6 +86,262 @@ class KeyValuePair(object):
         return "<key:%s, value:%s>" % (self.key, self.value)
 
 
+## How the values of each type are expanded into the children of a path step:
+## strings and values which can not be iterated are a single child,
+## dictionaries are iterated as KeyValuePairs and the other iterables are
+## iterated. The kind is worked out on the first value of a type and cached
+## for the type, as checking it is a good part of the cost of a step. The
+## types are the keys, so a class which is redefined gets an entry of its own.
+_SCALAR, _ITERABLE, _MAPPING = range(3)
+_kinds = dict()
+_kinds_max = 1024
+
+
+def kind(t):
+    """
+    The kind of the values of type t, see _kinds.
+    """
+    k = _kinds.get(t)
+    if k is None:
+        if issubclass(t, str) or not hasattr(t, "__iter__"):
+            k = _SCALAR
+        elif issubclass(t, dict):
+            k = _MAPPING
+        else:
+            k = _ITERABLE
+        if len(_kinds) >= _kinds_max:
+            _kinds.clear()
+        _kinds[t] = k
+    return k
+
+
+def children(v, following=None):
+    """
+    The children of a value during a path step. A dict with a key named like
+    the following step is a single child, the step reads the key.
+    """
+    if following is not None and v.__class__ is dict and following in v:
+        return (v,)
+    k = _kinds.get(type(v))
+    if k is None:
+        k = kind(type(v))
+    if k == _SCALAR:
+        return (v,)
+    if k == _MAPPING:
+        return [KeyValuePair(z, v[z]) for z in v]
+    return v
+
+
+def attr(obj, name):
+    """
+    The attribute name of obj or _missing. The keys of a dict are looked up
+    before its attributes, as by the steps of a path expression (see reach),
+    so JSON-like data can be queried without wrapping it in objects first,
+    even with keys named like the methods of a dict (items, values, ...).
+    """
+    if obj.__class__ is dict:
+        x = obj.get(name, _missing)
+        if x is not _missing:
+            return x
+    return getattr(obj, name, _missing)
+
+
+## the type of the bound methods of the builtin types, eg. {}.items
+_builtin_method = type({}.items)
+
+
+class Scope(object):
+    """
+    A namespace layered over another one (parent, a Scope or any mapping). The
+    variables bound by a query (for and let variables, self in the where
+    clauses, etc.) are stored in the scope's own small dictionary (vars) so
+    binding one never copies the namespace the query was called with. Lookups
+    go through the chain of parents until the name is found.
+
+    eg.
+        cobjs = Scope(objs, {"self": obj})
+        cobjs["self"] -> obj
+        cobjs["x"] -> objs["x"]
+    """
+
+    __slots__ = ("parent", "vars")
+
+    def __init__(self, parent, vars=None):
+        self.parent = parent
+        self.vars = dict() if vars is None else vars
+
+    def __getitem__(self, name):
+        scope = self
+        while isinstance(scope, Scope):
+            value = scope.vars.get(name, _missing)
+            if value is not _missing:
+                return value
+            scope = scope.parent
+        return scope[name]
+
+    def __contains__(self, name):
+        scope = self
+        while isinstance(scope, Scope):
+            if name in scope.vars:
+                return True
+            scope = scope.parent
+        return name in scope
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __setitem__(self, name, value):
+        self.vars[name] = value
+
+    def update(self, *args, **kwargs):
+        self.vars.update(*args, **kwargs)
+
+    def keys(self):
+        names = set(self.vars)
+        names.update(self.parent.keys())
+        return names
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+
+class HashJoin(object):
+    """
+    The inner side of an equi-join between the for variables of a flwr
+    expression (or of a semi-join, see quantifiedValue). The items of the
+    sequence are indexed on their key (key is a function of an item) and
+    probe() yields the items whose key equals the one given, in the order of
+    the sequence. The items are only indexed as probes need them: a probe
+    reads the sequence up to its end, yielding the matches as it finds them,
+    so a probe which is stopped early leaves the rest unread. When a key
+    cannot be hashed the items are compared one by one. The keys are compared
+    with == alone, as the where clause does: a key holding a value which is
+    not equal to itself (a NaN) matches no key, not even itself.
+    """
+
+    def __init__(self, items, key):
+        self.items = iter(items)
+        self.key = key
+        self.keyed = list()
+        self.index = dict()  # key -> positions in keyed
+
+    def _next(self):
+        """
+        Indexes the next item, returns False when there are none left.
+        """
+        for item in self.items:
+            key = self.key(item)
+            if not reflexive(key):
+                key = _missing  # never probed
+            elif self.index is not None:
+                try:
+                    self.index.setdefault(key, []).append(len(self.keyed))
+                except TypeError:
+                    self.index = None  # unhashable key
+            self.keyed.append((key, item))
+            return True
+        return False
+
+    def empty(self):
+        return not self.keyed and not self._next()
+
+    def probe(self, key):
+        if not reflexive(key):
+            return
+        n = len(self.keyed)
+        matches = range(n)
+        if self.index is not None:
+            try:
+                matches = self.index.get(key, ())
+            except TypeError:
+                pass
+        for i in matches:
+            if i >= n:
+                break  # indexed by another probe, checked below
+            k, item = self.keyed[i]
+            if k is not _missing and k == key:
+                yield item
+        while n < len(self.keyed) or self._next():
+            k, item = self.keyed[n]
+            n += 1
+            if k is not _missing and k == key:
+                yield item
+
+
+def reflexive(key):
+    """
+    Whether the values of the key tuple are equal to themselves: the identity
+    of two NaNs makes the tuples holding them equal (and the same dict key)
+    when the NaNs are not.
+    """
+    for x in key if key.__class__ is tuple else (key,):
+        try:
+            if not x == x:
+                return False
+        except Exception:
+            pass  # eg. a numpy array, compared by the probes
+    return True
+
+
+## the name of the dictionary holding the indexes built during one execution
+## of a query, see indexedQuery
+_indexes = "<indexes>"
+
+
+def index(objs, token, items, key):
+    """
+    Returns the HashJoin indexing the items (a function returning them) on
+    key. The index is built once per execution of the query and kept under
+    token in the indexes of the execution. When objs holds no indexes it is
+    built on every call.
+    """
+    indexes = objs.get(_indexes)
+    if indexes is None:
+        return HashJoin(items(), key)
+    if token not in indexes:
+        indexes[token] = HashJoin(items(), key)
+    return indexes[token]
+
+
+def ordered(results, key=None, reverse=False, limit=None, offset=0):
+    """
+    Sorts the results (stably) and returns the ones from offset to offset +
+    limit. With a limit only the first offset + limit results are kept while
+    sorting so the top k of n results take O(n log k) time and O(k) memory.
+    """
+    if limit is None:
+        return sorted(results, key=key, reverse=reverse)[offset:]
+    select = heapq.nlargest if reverse else heapq.nsmallest
+    return select(offset + limit, results, key=key)[offset:]
+
+
+def order_key(output, order_expr):
+    """
+    The (error, key, reverse) the results of the output list are ordered with
+    by the order by clause, error is the message of the SyntaxError raised
+    when the clause does not match the return values, or None.
+    """
+    attr, direction = order_expr
+    named = isinstance(output[0], tuple)
+    error = None
+    if isinstance(attr, str) and not named:
+        error = (
+            "Using a name in the order by clause when not using named return values."
+        )
+    elif not isinstance(attr, str) and named:
+        error = "Using a number in the order by clause when not using positional return values."
+    key = None
+    if len(output) != 1 or named:
+        key = itemgetter(attr)
+    return error, key, direction != "ASCD"
+
+
 def attributeValue(attribute_list, scalar=False, context="locals"):
     """
     Transforms a AttributeValue into its actual value.
@@ -98,53 +361,136 @@ def attributeValue(attribute_list, scalar=False, context="locals"):
     context is no longer used and should be removed.
     """
 
-    def expand(objs, obj, attr, x):
-        """
-        Expands the the value of one attribute by looking the name up in the
-        objs dict and then performing and function calls and dictionary lookups
-        specified in the callchain.
-        """
-        if attr.callchain:
-            for call in attr.callchain:
-                p = list()
-                for param in call.params:
-                    if (
-                        isinstance(param, type(value))
-                        and value.__code__ == param.__code__
-                        or isinstance(param, type(value))
-                        and hasattr(param, "__objquery__")
-                    ):
-                        p.append(param(objs))
-                    else:
-                        p.append(param)
-                if call.lookup:
-                    x = x.__getitem__(p[0])
-                else:
-                    x = x.__call__(*p)
-        return x
+    if scalar:
+
+        def value(objs):
+            return attribute_list
+
+        object.__setattr__(value, "__objquery__", True)
+        return value
+
+    def query_function(param):
+        return isinstance(param, type(query_function)) and hasattr(
+            param, "__objquery__"
+        )
+
+    def constant(param):
+        return lambda objs: param
+
+    ## the plan of the lookups is worked out once, here: every call parameter
+    ## becomes a function of the namespace (literals are wrapped) and
+    ## attributes without calls are looked up with one attrgetter
+    plan = [
+        (
+            attr.name,
+            [
+                (
+                    call.lookup,
+                    [p if query_function(p) else constant(p) for p in call.params],
+                )
+                for call in attr.callchain or ()
+            ],
+        )
+        for attr in attribute_list
+    ]
 
-    def value(objs):
+    def expand(objs, x, calls):
         """
-        The computation function returned the user. Computes the actual value
-        of the the attribute expression when @objs is passed in.
+        Performs the function calls and dictionary lookups specified in the
+        callchain of an attribute on its value x.
         """
-        if scalar:
-            return attribute_list
-        # if context == 'self': return objs[context]
-        attr0 = attribute_list[0]
-        obj = expand(objs, objs, attr0, objs[attr0.name])
-        for attr in attribute_list[1:]:
-            if hasattr(obj, attr.name):
-                obj = expand(objs, obj, attr, getattr(obj, attr.name))
+        for lookup, params in calls:
+            p = [param(objs) for param in params]
+            if lookup:
+                x = x.__getitem__(p[0])
             else:
-                raise Exception(
-                    "object %s did not have attr %s" % (str(obj), attr.name)
-                )
+                x = x.__call__(*p)
+        return x
+
+    def lookup(objs, obj, attrs):
+        for name, calls in attrs:
+            x = attr(obj, name)
+            if x is _missing:
+                raise Exception("object %s did not have attr %s" % (str(obj), name))
+            obj = expand(objs, x, calls) if calls else x
         return obj
 
+    name0, calls0 = plan[0]
+    if len(plan) == 1 and not calls0:
+
+        def value(objs):
+            return objs[name0]
+
+    elif not any(calls for _, calls in plan):
+        getter = attrgetter(".".join(name for name, _ in plan[1:]))
+
+        def value(objs):
+            obj = objs[name0]
+            try:
+                x = getter(obj)
+            except AttributeError:
+                return lookup(objs, obj, plan[1:])  # raises the missing one
+            if x.__class__ is _builtin_method and x.__self__.__class__ is dict:
+                ## the key of a dict named like one of its methods
+                return lookup(objs, obj, plan[1:])
+            return x
+
+    else:
+
+        def value(objs):
+            """
+            The computation function returned the user. Computes the actual
+            value of the the attribute expression when @objs is passed in.
+            """
+            return lookup(objs, expand(objs, objs[name0], calls0), plan[1:])
+
+    object.__setattr__(value, "__objquery__", True)
     return value
 
 
+def sharedValue(key, names, value):
+    """
+    The value of a subexpression shared by the expressions evaluated with the
+    same variables bound, see nodes.Shared. It is kept under key in the Scope
+    they are evaluated in (the frame of the binding) with the values the names
+    it refers to have in the frame, and computed again when one of them is
+    bound to another object.
+    """
+
+    if len(names) == 1:
+        name = names[0]
+
+        def shared(objs):
+            try:
+                frame = objs.vars
+            except AttributeError:  # not a Scope
+                return value(objs)
+            cached = frame.get(key)
+            if cached is not None and cached[0] is frame.get(name):
+                return cached[1]
+            v = value(objs)
+            frame[key] = (frame.get(name), v)
+            return v
+
+    else:
+
+        def shared(objs):
+            try:
+                frame = objs.vars
+            except AttributeError:
+                return value(objs)
+            roots = [frame.get(name) for name in names]
+            cached = frame.get(key)
+            if cached is not None and all(x is y for x, y in zip(roots, cached[0])):
+                return cached[1]
+            v = value(objs)
+            frame[key] = (roots, v)
+            return v
+
+    object.__setattr__(shared, "__objquery__", True)
+    return shared
+
+
 def operator(op):
     """
     Returns a function which performs comparision operations
@@ -382,99 +728,160 @@ def listValue(values):
 
 # note this function was written well before I wrote any other pare of the code
 # as a technology demo. I need to refactor some parts of it...
-def queryValue(q):
+def reach(objs, attrs, u, i):
+    """
+    The value of the attribute of step i of the path expression attrs on u
+    (the name looked up in objs for the first step) or _missing.
+    """
+    attrname = attrs[i][0]
+    if i == 0:
+        return objs[attrname] if attrname in objs else _missing
+    if u.__class__ is dict:
+        v = u.get(attrname, _missing)
+        if v is _missing:  # nor does the dict have the key
+            return getattr(u, attrname, _missing)
+        return v
+    return getattr(u, attrname, _missing)
+
+
+def expand(objs, attrs, lookups, v, i):
+    """
+    The values step i of the path expression attrs reaches from the value v
+    of its attribute, before its where is tested: v when it is not iterable
+    (or a dict the next step reads a key of), its children otherwise.
+    lookups are the probes of the steps by index, see queryValue.
+    """
+    k = _kinds.get(type(v))
+    if k is None:
+        k = kind(type(v))
+    if k == _SCALAR or (
+        k == _MAPPING
+        and v.__class__ is dict
+        and i + 1 < len(attrs)
+        and attrs[i + 1][0] in v
+    ):  # it is not iterable, or a dict the next step reads a key of
+        return (v,)
+    if i in lookups and isinstance(v, indexes.IndexedCollection):
+        found = indexes.lookup(
+            v,
+            [
+                (key, op, lambda value=value: value(objs))
+                for key, op, value in lookups[i]
+            ],
+        )
+        if found is not None:
+            return found  # only the items found by the index are tested
+    if k == _ITERABLE:
+        return v
+    return children(v)
+
+
+def step(objs, attrs, lookups, u, i):
+    """
+    The values step i of the path expression attrs reaches from u, see reach
+    and expand.
+    """
+    v = reach(objs, attrs, u, i)
+    if v is _missing:  # the current object does not have the attr
+        return ()
+    return expand(objs, attrs, lookups, v, i)
+
+
+def queryValue(q, probes=None):
     """
     Computes a path expression. The query (@q) is a list of attribute names and
     associated where expressions. The function returned computes the result when
-    called.
+    called, its iterate attribute yields the results one at a time instead.
+    probes is a list of (i, key, op, value) which the where of step i can be
+    looked up with in an indexes.IndexedCollection, see indexes.lookup.
     """
     attrs = q
+    lookups = dict()
+    for i, key, op, value in probes or ():
+        lookups.setdefault(i, []).append((key, op, value))
+
+    def select(objs, attrs, batched=False):
+        """a generator which computes the actual results. The queue holds
+        (object, i) pairs where i is the index of the attribute to look up
+        on the object next, the objects themselves are never modified. When
+        batched the values tested by a where are registered with the
+        Prefetch running."""
+
+        queue = deque()
+        queue.appendleft((None, 0))  # the first name is looked up in objs
+        while len(queue) > 0:
+            u, i = queue.pop()
+            where = attrs[i][1]
+            nexts = step(objs, attrs, lookups, u, i)
+            if batched and where is not None:
+                batch.group(nexts)  # the values the where calls batch methods of
+            for next in nexts:
+                # add each value into the processing queue but only if its
+                # where condition is satisfied
+                if where is not None:
+                    if not where(Scope(objs, {"self": next})):
+                        continue
+                # if this is the last attribute yield the obj
+                if i + 1 == len(attrs):
+                    yield next
+                else:
+                    queue.appendleft((next, i + 1))  # otherwise add to the queue
 
-    def query(objs):
-        def select(objs, attrs):
-            """a generator which computes the actual results"""
+    def query(objs, lazy=False):
+        if lazy:
+            return select(objs, attrs)
+        return list(select(objs, attrs, True))
 
-            def add(queue, u, v, i):
-                """adds the object v to the queue. It looks like u
-                isn't necessary anymore. I should fix that..."""
-                args = (v, "_objquery__i", i + 1)
-                try:
-                    object.__setattr__(*args)
-                except TypeError:
-                    setattr(*args)
-                except:
-                    raise
-                queue.appendleft(v)
-
-            queue = deque()
-            add(queue, None, type("base", (object,), objs), -1)
-            while len(queue) > 0:
-                u = queue.pop()
-                i = object.__getattribute__(u, "_objquery__i")
-                attrname, where = attrs[i]
-                if hasattr(u, attrname):  # the current object has the attr
-                    v = getattr(u, attrname)
-                    # it is iterable
-                    if not isinstance(v, str) and hasattr(v, "__iter__"):
-                        for z in v:
-                            # add each child into the processing queue
-                            if isinstance(v, dict):
-                                next = KeyValuePair(z, v[z])
-                            else:
-                                next = z
-                            # but only if its where condition is satisfied
-                            if where != None:
-                                cobjs = dict(objs)
-                                cobjs.update({"self": next})
-                                if not where(cobjs):
-                                    continue
-                            # if this is the last attribute yield the obj
-                            if i + 1 == len(attrs):
-                                yield next
-                            else:
-                                add(queue, u, next, i)  # otherwise add to the queue
-                    else:  # it is not iterable
-                        if where != None:
-                            cobjs = dict(objs)
-                            cobjs.update({"self": v})
-                            if not where(cobjs):
-                                continue
-                        # if this is the last attribute yield the obj
-                        if i + 1 == len(attrs):
-                            yield v
-                        else:
-                            add(queue, u, v, i)  # otherwise add to the queue
-
-        return list(select(objs, attrs))
+    def iterate(objs):
+        return query(objs, lazy=True)
 
     object.__setattr__(query, "__objquery__", True)
+    object.__setattr__(iterate, "__objquery__", True)
+    object.__setattr__(query, "iterate", iterate)
     return query
 
 
-def quantifiedValue(mode, name, s, satisfies):
+def quantifiedValue(mode, name, s, satisfies, keys=None, probes=None):
     """
     Processes the quantified expressions (some x in <> satisfie...) returns
-    the where function.
+    the where function. With keys (a semi-join, see optimizer.semi_joins) the
+    elements of s are indexed on the keys and only the ones whose keys equal
+    the probes are tested.
     """
 
+    ## the elements are pulled from the path or flwr expression one at a time
+    ## so the evaluation stops at the first one deciding the result
+    elements = getattr(s, "iterate", lambda objs: iter(s(objs)))
+
+    if keys:
+        if mode != "some":
+            raise Exception("only some can be evaluated as a semi-join")
+        token = object()
+
+        def where(objs):
+            key = lambda x: tuple(k(Scope(objs, {name: x})) for k in keys)
+            matches = index(objs, token, lambda: elements(objs), key)
+            if matches.empty():
+                return False  # without evaluating the probes
+            for x in matches.probe(tuple(p(objs) for p in probes)):
+                if satisfies(Scope(objs, {name: x})):
+                    return True
+            return False
+
+        return where
+
     def where(objs):
-        nobjs = s(objs)  # runs the first part of the query (eg. the <path> expression)
-        if not nobjs:
-            return False  # if returns and empty set then return false
         if mode == "every":
-            r = True
-            for x in nobjs:
-                cobjs = dict(objs)  # we have to copy the objects to not squash
-                # the upper namespace
-                cobjs.update({name: x})
-                if not satisfies(cobjs):
-                    r = False
-            return r
+            empty = True  # every is false for an empty set
+            for x in elements(objs):
+                empty = False
+                # bind x in its own scope to not squash the upper namespace
+                if not satisfies(Scope(objs, {name: x})):
+                    return False
+            return not empty
         elif mode == "some":
-            for x in nobjs:
-                cobjs = dict(objs)
-                cobjs.update({name: x})
-                if satisfies(cobjs):
+            for x in elements(objs):
+                if satisfies(Scope(objs, {name: x})):
                     return True
             return False
         raise Exception("mode '%s' is not 'every' or 'some'" % mode)
@@ -482,6 +889,41 @@ def quantifiedValue(mode, name, s, satisfies):
     return where
 
 
+def indexedQuery(query):
+    """
+    Runs query with a fresh dictionary for the indexes of its semi-joins layered
+    over the namespace, so each index is built at most once per execution.
+    """
+
+    def indexed(objs):
+        return query(Scope(objs, {_indexes: dict()}))
+
+    if hasattr(query, "iterate"):
+
+        def iterate(objs):
+            return query.iterate(Scope(objs, {_indexes: dict()}))
+
+        object.__setattr__(iterate, "__objquery__", True)
+        object.__setattr__(indexed, "iterate", iterate)
+    object.__setattr__(indexed, "__objquery__", True)
+    return indexed
+
+
+def flattened(tup):
+    """
+    The values of the nested tuples tup, depth first (a flattened return).
+    """
+    if not isinstance(tup, tuple):
+        yield tup
+    else:
+        for i in tup:
+            if isinstance(i, tuple):
+                for j in flattened(i):
+                    yield j
+            else:
+                yield i
+
+
 def flwrSequence(
     return_expr,
     for_expr=None,
@@ -490,86 +932,178 @@ def flwrSequence(
     order_expr=None,
     flatten=False,
     collecting=False,
+    join_expr=None,
+    filter_expr=None,
+    limit_expr=None,
 ):
     """
-    Returns the function to caculate the results of a flwr expression
+    Returns the function to caculate the results of a flwr expression, its
+    iterate attribute yields the results as they are computed (unless they have
+    to be ordered first)
+
+    join_expr is a list of (name, keys, probes) planned by the optimizer. The
+    for variable name only takes the values whose keys (evaluated with just the
+    variable bound) equal the probes (evaluated with the earlier for variables
+    bound), they are found with a HashJoin instead of the cartesian product.
+    filter_expr is a list of (name, where) of the conditions which only depend
+    on the for variables up to name, they are checked as soon as name is bound
+    so the bindings failing them are not extended with the later variables.
+    limit_expr is (limit, offset), only the results from offset to offset +
+    limit (or all of them when limit is None) are returned. Without an order by
+    the bindings stop being computed once the limit is reached.
     """
     # print order_expr
     if flatten:
         assert len(return_expr) == 1 and not isinstance(return_expr[0], tuple)
         assert not collecting
+
     # if collecting:
     # target = return_expr['as']
     # reduce_function = return_expr['with']
     # return_expr = return_expr['value']
-    def sequence(objs):
-        def _flatten_func(tup):
-            if not isinstance(tup, tuple):
-                yield tup
-            else:
-                for i in tup:
-                    if isinstance(i, tuple):
-                        for j in _flatten_func(i):
-                            yield j
-                    else:
-                        yield i
-
-        def _build_yield(cobjs):
-            def _build_return(obj):
-                if len(obj) == 1 and not isinstance(obj[0], tuple):
-                    return obj[0](cobjs)
-                elif isinstance(obj[0], tuple):  # it has named return values
-                    return dict((name, f(cobjs)) for name, f in obj)
-                else:  # multiple positional return values
-                    return tuple(f(cobjs) for f in obj)
-
-            if not collecting:
-                return _build_return(return_expr)
-            collectors = list()
-            for collector in return_expr:
-                collectors.append(
-                    {
-                        "value": _build_return(collector["value"]),
-                        "as": collector["as"](cobjs),
-                        "with": collector["with"](cobjs),
-                    }
-                )
-            return collectors
-
-        def inner(objs):
-            ## take the cartesian product of the for expression
-            ## note you cannot do this:
-            ##   for x in <path>, y in <x>
-            ##   :sadface: some day I will fix this.
-            ##   however I will only do that when I implement and optimizer
-            ##   for PyQuery otherwise it just isn't worth it.
-            if for_expr is not None:
-                obs = [[(seqs[0], obj) for obj in seqs[1](objs)] for seqs in for_expr]
+    def _build_yield(cobjs):
+        def _build_return(obj):
+            if len(obj) == 1 and not isinstance(obj[0], tuple):
+                return obj[0](cobjs)
+            elif isinstance(obj[0], tuple):  # it has named return values
+                return dict((name, f(cobjs)) for name, f in obj)
+            else:  # multiple positional return values
+                return tuple(f(cobjs) for f in obj)
+
+        if not collecting:
+            return _build_return(return_expr)
+        collectors = list()
+        for collector in return_expr:
+            collectors.append(
+                {
+                    "value": _build_return(collector["value"]),
+                    "as": collector["as"](cobjs),
+                    "with": collector["with"](cobjs),
+                }
+            )
+        return collectors
+
+    joins = dict((name, (keys, probes)) for name, keys, probes in join_expr or ())
+    filters = dict()
+    for name, where in filter_expr or ():
+        filters.setdefault(name, []).append(where)
+
+    def nested(objs, lazy=False, batched=False):
+        ## yields the same bindings as the product below in the same order
+        ## less the ones excluded by the joins and filters. when lazy the
+        ## first sequence is only iterated as the bindings are consumed. when
+        ## batched the sequences are registered with the Prefetch running
+        seqs = list()
+        for name, seq in for_expr:
+            if lazy and not seqs and hasattr(seq, "iterate"):
+                seqs.append((name, seq.iterate(objs), None, filters.get(name, ())))
+                continue
+            if name not in joins:
+                values = list(seq(objs))
+                if batched:
+                    batch.group(values)
+                seqs.append((name, values, None, filters.get(name, ())))
+                continue
+            keys, probes = joins[name]
+
+            def key(item, name=name, keys=keys):
+                cobjs = Scope(objs, {name: item})
+                return tuple(k(cobjs) for k in keys)
+
+            values = seq(objs)
+            if batched:
+                batch.group(values)
+            join = HashJoin(values, key)
+            seqs.append((name, join, probes, filters.get(name, ())))
+        cobjs = Scope(objs)
+
+        def bind(i, items):
+            if i == len(seqs):
+                yield items
+                return
+            name, seq, probes, wheres = seqs[i]
+            if probes is not None:
+                seq = seq.probe(tuple(p(cobjs) for p in probes))
+            for item in seq:
+                cobjs[name] = item
+                if wheres and not all(where(cobjs) for where in wheres):
+                    continue
+                for r in bind(i + 1, items + ((name, item),)):
+                    yield r
+
+        return bind(0, ())
+
+    ## the variables of a binding
+    names = [name for name, _ in for_expr or ()] + [name for name, _ in let_expr or ()]
+
+    def passing(objs, bindings):
+        ## the frames of the bindings passing the where clause
+        for items in bindings:
+            cobjs = Scope(objs)
+            if for_expr is not None:  ## we can only execute this if we
+                ## actually have a for_expr though.
+                for name, item in items:
+                    cobjs[name] = item
+            if let_expr:
+                for name, let in let_expr:
+                    cobjs[name] = let(cobjs)  # calculate the let expr
+            if where_expr and not where_expr(cobjs):
+                continue  # skip if the where fails
+            yield cobjs
+
+    def inner(objs, lazy=False):
+        ## take the cartesian product of the for expression
+        ## note you cannot do this:
+        ##   for x in <path>, y in <x>
+        ##   :sadface: some day I will fix this.
+        ##   however I will only do that when I implement and optimizer
+        ##   for PyQuery otherwise it just isn't worth it.
+        ## the calls of batch methods are batched over the values of the for
+        ## clauses, then over the bindings passing the where clause, unless
+        ## the results are read one at a time or up to a limit
+        batched = not lazy and (order_expr or not limit_expr) and batch.prefetching()
+        if for_expr is not None and (join_expr or filter_expr or lazy):
+            bindings = nested(objs, lazy, batched)
+        elif for_expr is not None:
+            seqs = [(name, seq(objs)) for name, seq in for_expr]
+            if batched:
+                for _, values in seqs:
+                    batch.group(values)
+            bindings = product(
+                *[[(name, obj) for obj in values] for name, values in seqs]
+            )
+        else:
+            ## The goal is to get the for loop to run once. this syntax does
+            ## it. We may not have a for_expr but we want everything else
+            ## to execute normally.
+            bindings = product([None])
+        frames = passing(objs, bindings)
+        if batched:
+            frames = list(frames)
+            batch.groups([tuple(cobjs[name] for name in names) for cobjs in frames])
+        for cobjs in frames:
+            if not flatten:
+                yield _build_yield(cobjs)  # single unamed return
             else:
-                ## The goal is to get the for loop to run once. this syntax does
-                ## it. We may not have a for_expr but we want everything else
-                ## to execute normally.
-                obs = [[None]]
-            for items in product(*obs):
-                cobjs = dict(objs)
-                if for_expr is not None:  ## we can only execute this if we
-                    ## actually have a for_expr though.
-                    for name, item in items:
-                        cobjs.update({name: item})
-                if let_expr:
-                    for name, let in let_expr:
-                        cobjs.update({name: let(cobjs)})  # calculate the let expr
-                if where_expr and not where_expr(cobjs):
-                    continue  # skip if the where fails
-                if not flatten:
-                    yield _build_yield(cobjs)  # single unamed return
-                else:
-                    for i in _flatten_func(return_expr[0](cobjs)):
-                        yield i
-
+                for i in flattened(return_expr[0](cobjs)):
+                    yield i
+
+    def limit(results):
+        if not limit_expr:
+            return results
+        count, offset = limit_expr
+        return islice(results, offset, None if count is None else offset + count)
+
+    ## the order by clause is checked once, the error is raised by the calls
+    ## with results
+    order_error = keyfunc = reverse = None
+    if order_expr and not collecting:
+        order_error, keyfunc, reverse = order_key(return_expr, order_expr)
+
+    def sequence(objs, lazy=False):
         if collecting:
             rets = tuple(dict() for _ in range(len(return_expr)))
-            for collectors in inner(objs):
+            for collectors in limit(inner(objs)):
                 for i, collector in enumerate(collectors):
                     _as = collector["as"]
                     _rf = collector["with"]
@@ -578,33 +1112,26 @@ def flwrSequence(
             if len(rets) == 1:
                 return rets[0]
             return rets
+        elif not order_expr:
+            r = limit(inner(objs, lazy))
+            return r if lazy else tuple(r)
         else:
-            r = list(inner(objs))
-            if not r:
-                return tuple(r)
-            elif order_expr:
-                attr, direction = order_expr
-                if isinstance(attr, str):
-                    if not isinstance(return_expr[0], tuple):
-                        raise SyntaxError(
-                            "Using a name in the order by clause when not using named return values."
-                        )
-                else:
-                    if isinstance(return_expr[0], tuple):
-                        raise SyntaxError(
-                            "Using a number in the order by clause when not using positional return values."
-                        )
-                if len(return_expr) == 1 and not isinstance(return_expr[0], tuple):
-                    keyfunc = lambda x: x
-                else:
-                    keyfunc = lambda x: x[attr]
-                if direction == "ASCD":
-                    r = sorted(r, key=keyfunc)
-                else:
-                    r = sorted(r, key=keyfunc, reverse=True)
-            return tuple(r)
+            r = inner(objs)
+            first = next(r, _missing)
+            if first is _missing:
+                return tuple()
+            r = chain((first,), r)
+            if order_error:
+                raise SyntaxError(order_error)
+            count, offset = limit_expr or (None, 0)
+            return tuple(ordered(r, keyfunc, reverse, count, offset))
+
+    def iterate(objs):
+        return iter(sequence(objs, lazy=True))
 
     object.__setattr__(sequence, "__objquery__", True)
+    object.__setattr__(iterate, "__objquery__", True)
+    object.__setattr__(sequence, "iterate", iterate)
     return sequence
 
 
@@ -616,9 +1143,7 @@ def functionDefinition(params, query):
                     "Got wrong number of params expected %d got %d"
                     % (len(params), len(args))
                 )
-            namespace = dict(objs)
-            namespace.update(list(zip(params, args)))
-            return query(namespace)
+            return query(Scope(objs, dict(zip(params, args))))
 
         return function
 
@@ -0,0 +1,278 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: views.py
+Purpose: Query results kept up to date as the collections they read change.
+"""
+from builtins import object
+
+from bisect import bisect_left, insort
+
+import pyflwor.indexes as indexes
+import pyflwor.nodes as nodes
+import pyflwor.optimizer as optimizer
+import pyflwor.symbols as symbols
+from pyflwor.pyflwor import parse
+
+
+def _occurrences(tree, name):
+    return sum(
+        1
+        for node in nodes.walk(tree)
+        if (isinstance(node, nodes.Path) and node.steps[0][0] == name)
+        or (isinstance(node, nodes.AttributeValue) and node.name == name)
+    )
+
+
+def _linear(tree, name):
+    """
+    Whether the results of tree are the concatenation of its results with the
+    collection name bound to each of its items alone, in order: name is only
+    read once, as the first step of the path expression or of the path of the
+    first for clause of a flwr expression without an order by or limit clause.
+    The results of a later for clause are ordered by the clauses before it
+    first, they are not concatenated by item of name.
+    """
+    if isinstance(tree, nodes.Indexed):
+        tree = tree.query
+    if _occurrences(tree, name) != 1:
+        return False
+    if isinstance(tree, nodes.Path):
+        return tree.steps[0][0] == name
+    if not isinstance(tree, nodes.FLWR) or tree.order_expr or tree.limit_expr:
+        return False
+    if not tree.for_expr:
+        return False
+    seq = tree.for_expr[0][1]
+    return isinstance(seq, nodes.Path) and seq.steps[0][0] == name
+
+
+class _Linear(indexes.Stamped):
+    """
+    The results of a query linear in the collection name (see _linear): the
+    results with name bound to each item alone are kept by stamp, so a change
+    to the collection only evaluates the query for the items it touches.
+    """
+
+    def __init__(self, query, namespace, name, source, build):
+        self.query = query
+        self.namespace = namespace
+        self.name = name
+        self.build = build
+        indexes.Stamped.__init__(self, source)
+
+    def reset(self):
+        self.result = None
+        self._results = dict()  # stamp -> results of the item, when it has any
+        self._order = list()  # the stamps of _results, sorted
+        indexes.Stamped.reset(self)
+
+    def _evaluate(self, item):
+        return self.query(symbols.Scope(self.namespace, {self.name: [item]}))
+
+    def _added(self, stamp, item):
+        results = tuple(self._evaluate(item))
+        if results:
+            self._results[stamp] = results
+            insort(self._order, stamp)
+            self.result = None
+
+    def _removed(self, stamp, item):
+        if self._results.pop(stamp, None) is not None:
+            del self._order[bisect_left(self._order, stamp)]
+            self.result = None
+
+    def value(self):
+        if self.result is None:
+            results = self._results
+            self.result = self.build(
+                result for stamp in self._order for result in results[stamp]
+            )
+        return self.result
+
+
+class _Collected(_Linear):
+    """
+    The results of a collecting flwr expression linear in the collection name.
+    The values of each group (an as value of a collector) are kept by stamp
+    and folded with the with functions again when the group loses a value, or
+    gains one before the last it folded. Otherwise the new value is folded
+    into the group.
+    """
+
+    def __init__(self, query, namespace, name, source, collectors):
+        self.collectors = collectors
+        _Linear.__init__(self, query, namespace, name, source, None)
+
+    def reset(self):
+        ## for each collector, the values by stamp ({stamp: [(with, value)]}),
+        ## the folded value and the last stamp folded of each as value
+        self._groups = [dict() for _ in range(self.collectors)]
+        self._folded = [dict() for _ in range(self.collectors)]
+        self._last = [dict() for _ in range(self.collectors)]
+        self._stale = set()  # (collector, as) to fold again
+        _Linear.reset(self)
+
+    def _added(self, stamp, item):
+        self._results[stamp] = bindings = tuple(self._evaluate(item))
+        for binding in bindings:
+            for i, (key, rf, value) in enumerate(binding):
+                self._groups[i].setdefault(key, dict()).setdefault(stamp, []).append(
+                    (rf, value)
+                )
+                if (i, key) in self._stale:
+                    continue
+                last = self._last[i].get(key, symbols._missing)
+                if last is symbols._missing or stamp >= last:
+                    self._folded[i][key] = rf(self._folded[i].get(key, None), value)
+                    self._last[i][key] = stamp
+                else:
+                    self._stale.add((i, key))
+        self.result = None
+
+    def _removed(self, stamp, item):
+        for binding in self._results.pop(stamp):
+            for i, (key, rf, value) in enumerate(binding):
+                group = self._groups[i].get(key, {})
+                group.pop(stamp, None)
+                if not group:
+                    self._groups[i].pop(key, None)
+                self._stale.add((i, key))
+        self.result = None
+
+    def value(self):
+        if self.result is None:
+            for i, key in self._stale:
+                group = self._groups[i].get(key)
+                if not group:
+                    self._folded[i].pop(key, None)
+                    self._last[i].pop(key, None)
+                    continue
+                folded = None
+                for stamp in sorted(group):
+                    for rf, value in group[stamp]:
+                        folded = rf(folded, value)
+                self._folded[i][key] = folded
+                self._last[i][key] = stamp
+            self._stale.clear()
+            rets = tuple(dict(folded) for folded in self._folded)
+            self.result = rets[0] if len(rets) == 1 else rets
+        return self.result
+
+
+class Watch(object):
+    """
+    The result of a query kept up to date as the observable collections (see
+    indexes.py) of its namespace change, see watch.
+    """
+
+    def __init__(self, query, namespace, optimize=True):
+        tree = parse(query)
+        if optimize:
+            tree = optimizer.optimize(tree)
+        self.namespace = namespace
+        self._query = tree.lower(symbols)
+        self._result = symbols._missing
+        self._stale = False
+        self._view = None
+        self._sources = list()
+        for name in sorted(tree.names()):
+            source = namespace[name] if name in namespace else None
+            if isinstance(source, indexes.IndexedCollection):
+                source = source.items
+            if not isinstance(source, indexes.Observable):
+                continue
+            ## the results of a view are in the order the items were added,
+            ## not in the order a set iterates them in
+            if (
+                self._view is None
+                and not isinstance(source, indexes.ObservableSet)
+                and _linear(tree, name)
+            ):
+                collecting = isinstance(tree, nodes.FLWR) and tree.collecting
+                if collecting:
+                    self._view = _Collected(
+                        nodes.collectors(tree).lower(symbols),
+                        namespace,
+                        name,
+                        source,
+                        len(tree.return_expr),
+                    )
+                else:
+                    build = list if isinstance(tree, nodes.Path) else tuple
+                    self._view = _Linear(self._query, namespace, name, source, build)
+                continue
+            source.attach(self)
+            self._sources.append(source)
+
+    @property
+    def result(self):
+        """
+        The result of the query, as execute would return it.
+        """
+        if self._stale:
+            self._stale = False
+            self._result = symbols._missing
+            if self._view is not None:
+                self._view.reset()
+        if self._view is not None:
+            return self._view.value()
+        if self._result is symbols._missing:
+            self._result = self._query(self.namespace)
+        return self._result
+
+    def refresh(self):
+        """
+        Evaluates the query again on the next read of result, for changes the
+        collections did not report.
+        """
+        self._stale = True
+
+    def close(self):
+        """
+        Stops following the changes of the collections.
+        """
+        for source in self._sources:
+            source.detach(self)
+        if self._view is not None:
+            self._view.items.detach(self._view)
+
+    ## any change to a collection the results are not maintained for
+
+    def inserted(self, where, item):
+        self._stale = True
+
+    def removed(self, where, item):
+        self._stale = True
+
+    def replaced(self, where, old, new):
+        self._stale = True
+
+    def updated(self, item):
+        self._stale = True
+
+    def reset(self):
+        self._stale = True
+
+
+def watch(query, namespace, optimize=True):
+    """
+    Evaluates the query once and keeps its result (the result attribute of the
+    returned Watch) up to date as the observable collections of the namespace
+    (ObservableList, ObservableSet, ObservableDict or an IndexedCollection
+    over one) report their changes.
+
+    When the query reads one of them once, as the first step of a path
+    expression or of the path of the first for clause of a flwr expression
+    (without order by or limit), the results are kept for each of its items
+    (unless it is a set) and a change only evaluates the query for the items
+    it touches. The groups of a
+    collect expression are folded again only when they lose a value. Any
+    other change evaluates the query again, on the next read of the result.
+    Changes to anything else are not seen, call refresh().
+    """
+    return Watch(query, namespace, optimize=optimize)
@@ -0,0 +1,239 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_aio.py
+Purpose: Tests for the evaluation of queries with asyncio.
+"""
+import asyncio
+import itertools
+import unittest
+from unittest import mock
+
+import pyflwor
+from pyflwor import aio
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def add(prev, value):
+    return (prev or 0) + value
+
+
+class Order(object):
+    """
+    An order whose items and total are read asynchronously, the number of
+    reads in flight is counted.
+    """
+
+    running = 0
+    most = 0
+
+    def __init__(self, q, items=()):
+        self.q = q
+        self._items = list(items)
+
+    @classmethod
+    async def wait(cls):
+        cls.running += 1
+        cls.most = max(cls.most, cls.running)
+        await asyncio.sleep(0.001)
+        cls.running -= 1
+
+    async def total(self):
+        await self.wait()
+        return self.q * 10
+
+    async def items(self):
+        for item in self._items:
+            await self.wait()
+            yield item
+
+    @property
+    def lines(self):
+        return self.items()
+
+
+class TestAio(unittest.TestCase):
+    def setUp(self):
+        Order.most = 0
+        self.orders = [Order(q, range(q % 3)) for q in range(10)]
+
+        async def orders():
+            await Order.wait()
+            return self.orders
+
+        async def price(q):
+            await Order.wait()
+            return q + 0.5
+
+        self.namespace = {
+            "orders": orders,
+            "o": self.orders,
+            "price": price,
+            "add": add,
+            "l": [1, 2, 3, 4],
+            "d": {"a": 1, "b": 2},
+        }
+
+    def test_equivalent(self):
+        ## without awaitables the results are the ones of execute
+        namespace = {
+            "l": [3, 1, 2, 3],
+            "m": [1, 2],
+            "d": {"a": 1, "b": 2},
+            "add": add,
+            "f": lambda x: (x, (x, 1)),
+        }
+        for query in (
+            "l[self > 1]",
+            "d[self.value > 1]/key",
+            "for x in <l>, y in <m> where x == y return x, y",
+            "for x in <l> let y = x * 2 where y > 2 return 'x': x, 'y': y",
+            "for x in <l> order by 'x' desc limit 2 return 'x': x",
+            "for x in <l> limit 2 offset 1 return x",
+            "for x in <l> limit 0 return x",
+            "for x in <l> return flatten f(x)",
+            "for x in <l> collect x as x with add",
+            "for x in <l> where some y in <m> satisfies (y == x) return x",
+            "for x in <l> where every y in <m> satisfies (y <= x) return x",
+            "for x in <l> return if (x > 2) then x else 0",
+            "for x in <l> let f = function(a) { for b in <m> return a + b } return f(x)",
+            "for x in <l> where x in <m> return [x, {'k': x}]",
+        ):
+            self.assertEqual(
+                run(pyflwor.aexecute(query, namespace)),
+                pyflwor.execute(query, namespace),
+                query,
+            )
+
+    def test_await(self):
+        query = "for o in orders() where o.total() > 50 return o.q, price(o.total())"
+        self.assertEqual(
+            run(pyflwor.aexecute(query, self.namespace)),
+            ((6, 60.5), (7, 70.5), (8, 80.5), (9, 90.5)),
+        )
+        ## the bindings are evaluated concurrently
+        self.assertGreater(Order.most, 5)
+        self.assertEqual(
+            run(pyflwor.aexecute("o[self.total() >= 80]/q", self.namespace)), [8, 9]
+        )
+        self.assertEqual(
+            run(
+                pyflwor.aexecute(
+                    "for o in <o> collect o.total() as o.q // 5 with add",
+                    self.namespace,
+                )
+            ),
+            {0: 100, 1: 350},
+        )
+
+    def test_async_iterables(self):
+        self.assertEqual(
+            run(pyflwor.aexecute("o/lines", self.namespace)),
+            [0, 0, 1, 0, 0, 1, 0, 0, 1],
+        )
+        self.assertEqual(
+            run(pyflwor.aexecute("for i in o[5].items() return i", self.namespace)),
+            (0, 1),
+        )
+
+        class Naturals(object):
+            async def __aiter__(self):
+                for n in itertools.count():
+                    yield n
+
+        ## the quantified expressions stop at the first element deciding them
+        namespace = {"n": Naturals(), "l": [1, 2]}
+        self.assertEqual(
+            run(pyflwor.aexecute("l[some x in <n> satisfies (x > self)]", namespace)),
+            [1, 2],
+        )
+
+    def test_aiter(self):
+        calls = list()
+
+        async def f(x):
+            calls.append(x)
+            return x
+
+        async def collect(query, namespace):
+            return [r async for r in pyflwor.aiter(query, namespace)]
+
+        namespace = {"l": list(range(200)), "f": f}
+        self.assertEqual(
+            run(collect("for x in <l> limit 3 offset 2 return f(x)", namespace)),
+            [2, 3, 4],
+        )
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(
+            run(collect("for x in <l> order by 0 desc limit 2 return f(x)", namespace)),
+            [199, 198],
+        )
+        self.assertEqual(run(collect("l[self < 2]", namespace)), [0, 1])
+        q = pyflwor.compile("for x in <l> where x < 3 return f(x)")
+        self.assertEqual(run(collect_compiled(q, namespace)), [0, 1, 2])
+
+    def test_bounded(self):
+        ## GATHER values at most are awaited concurrently
+        orders = [Order(q) for q in range(100)]
+        with mock.patch.object(aio, "GATHER", 8):
+            self.assertEqual(
+                run(
+                    pyflwor.aexecute(
+                        "for x in <o>, y in <l> where x.total() > 900 return y",
+                        {"o": orders, "l": [1, 2]},
+                    )
+                ),
+                (1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 2, 1, 2),
+            )
+            self.assertEqual(Order.most, 8)
+            Order.most = 0
+            self.assertEqual(
+                run(pyflwor.aexecute("o[self.total() > 950]/q", {"o": orders})),
+                [96, 97, 98, 99],
+            )
+            self.assertEqual(Order.most, 8)
+
+    def test_join(self):
+        ## the keys of the joined sequence are computed once per execution
+        calls = list()
+
+        async def key(x):
+            calls.append(x)
+            return x
+
+        async def collect(query, namespace):
+            return [r async for r in pyflwor.aiter(query, namespace)]
+
+        query = "for x in <l>, y in <m> where x == key(y) return y"
+        namespace = {"l": list(range(200)), "m": [3, 150, 3], "key": key}
+        self.assertEqual(run(collect(query, namespace)), [3, 3, 150])
+        self.assertEqual(sorted(calls), [3, 3, 150])
+        self.assertEqual(run(pyflwor.aexecute(query, namespace)), (3, 3, 150))
+        self.assertEqual(len(calls), 6)
+
+    def test_errors(self):
+        self.assertRaises(
+            SyntaxError,
+            run,
+            pyflwor.aexecute("for x in <l> order by 'a' ascd return x", {"l": [1]}),
+        )
+        self.assertRaises(
+            Exception,
+            run,
+            pyflwor.aexecute("for o in <o> return o.missing", self.namespace),
+        )
+
+
+async def collect_compiled(q, namespace):
+    return [r async for r in q.aiter(namespace)]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_batch.py
+Purpose: Tests for the batch methods.
+"""
+import asyncio
+import unittest
+
+import pyflwor
+from pyflwor import batched
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class Customer(object):
+    calls = list()
+
+    def __init__(self, id):
+        self.id = id
+
+    @batched
+    def score(customers, scale=1):
+        Customer.calls.append(sorted(c.id for c in customers))
+        return [c.id * 10 * scale for c in customers]
+
+
+class Order(object):
+    calls = list()
+
+    def __init__(self, q, customer):
+        self.q = q
+        self.c = customer
+
+    @batched
+    async def customer(orders):
+        Order.calls.append([o.q for o in orders])
+        await asyncio.sleep(0)
+        return [o.c for o in orders]
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        Customer.calls[:] = []
+        Order.calls[:] = []
+        self.customers = [Customer(i) for i in range(3)]
+        self.orders = [Order(q, self.customers[q % 3]) for q in range(9)]
+        self.namespace = {"o": self.orders, "c": self.customers}
+
+    def test_flwr(self):
+        query = "for x in <o> where x.customer().score() > 0 return x.q"
+        self.assertEqual(
+            run(pyflwor.aexecute(query, self.namespace)), (1, 2, 4, 5, 7, 8)
+        )
+        ## one call per method, each customer scored once
+        self.assertEqual(Order.calls, [list(range(9))])
+        self.assertEqual(Customer.calls, [[0, 1, 2]])
+        self.assertEqual(
+            run(
+                pyflwor.aexecute(
+                    "for x in <c> return x.score(2), x.score()", self.namespace
+                )
+            ),
+            ((0, 0), (20, 10), (40, 20)),
+        )
+        self.assertEqual(Customer.calls[1:], [[0, 1, 2], [0, 1, 2]])
+
+    def test_path(self):
+        self.assertEqual(
+            run(pyflwor.aexecute("c[self.score() >= 10]/id", self.namespace)), [1, 2]
+        )
+        self.assertEqual(Customer.calls, [[0, 1, 2]])
+
+    def test_aiter(self):
+        async def collect(query):
+            return [r async for r in pyflwor.aiter(query, self.namespace)]
+
+        self.assertEqual(
+            run(collect("for x in <o> limit 4 return x.customer().id")), [0, 1, 2, 0]
+        )
+        self.assertEqual(Order.calls, [[0, 1, 2, 3]])
+
+    def test_execute(self):
+        ## the values of a for clause (and of a path step) are loaded together
+        query = "for x in <c> where x.score() > 0 return x.score(3)"
+        for backend in pyflwor.pyflwor.backends:
+            Customer.calls[:] = []
+            self.assertEqual(
+                pyflwor.execute(query, self.namespace, backend=backend), (30, 60)
+            )
+            self.assertEqual(Customer.calls, [[0, 1, 2], [1, 2]], backend)
+            Customer.calls[:] = []
+            self.assertEqual(
+                pyflwor.execute(
+                    "for x in <o>, y in <c> where x.q == y.id return y.score()",
+                    self.namespace,
+                    backend=backend,
+                ),
+                (0, 10, 20),
+            )
+            self.assertEqual(Customer.calls, [[0, 1, 2]], backend)
+            Customer.calls[:] = []
+            self.assertEqual(
+                pyflwor.execute(
+                    "c[self.score() > 0]/id", self.namespace, backend=backend
+                ),
+                [1, 2],
+            )
+            self.assertEqual(Customer.calls, [[0, 1, 2]], backend)
+        ## the methods called outside of a query are called one at a time
+        self.assertEqual(self.customers[2].score(), 20)
+        self.assertEqual(Customer.score(self.customers[:2]), [0, 10])
+        self.assertIs(run(self.orders[4].customer()), self.customers[1])
+
+    def test_filtered(self):
+        ## the values the where rejects and the values past the limit are
+        ## not loaded
+        queries = [
+            ("for x in <c> where x.id > 0 return x.score()", (10, 20), [[1, 2]]),
+            ("for x in <c[self.id > 1]> return x.score()", (20,), [[2]]),
+            (
+                "for x in <c> let s = x.id where s != 1 return x.score()",
+                (0, 20),
+                [[0, 2]],
+            ),
+            ("for x in <c> limit 1 return x.score()", (0,), [[0]]),
+            ("for x in <c> limit 2 return x.score()", (0, 10), [[0], [1]]),
+        ]
+        for backend in pyflwor.pyflwor.backends:
+            for query, result, calls in queries:
+                Customer.calls[:] = []
+                self.assertEqual(
+                    pyflwor.execute(query, self.namespace, backend=backend), result
+                )
+                self.assertEqual(Customer.calls, calls, (backend, query))
+
+    def test_unhashable(self):
+        class A(object):
+            calls = list()
+
+            @batched
+            def f(objs, xs):
+                A.calls.append(len(objs))
+                return [len(xs)] * len(objs)
+
+        namespace = {"a": [A(), A()], "l": [1, 2, 3]}
+        query = "for x in <a> return x.f(l)"
+        self.assertEqual(pyflwor.execute(query, namespace), (3, 3))
+        self.assertEqual(run(pyflwor.aexecute(query, namespace)), (3, 3))
+        self.assertEqual(A.calls, [1, 1, 1, 1])
+
+    def test_errors(self):
+        class A(object):
+            @batched
+            def f(objs):
+                return []
+
+            @batched
+            def g(objs):
+                raise KeyError("g")
+
+        self.assertRaises(
+            Exception, run, pyflwor.aexecute("for x in <a> return x.f()", {"a": [A()]})
+        )
+        self.assertRaises(
+            KeyError,
+            run,
+            pyflwor.aexecute("for x in <a> return x.g()", {"a": [A(), A()]}),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
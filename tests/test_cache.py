@@ -0,0 +1,98 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_cache.py
+Purpose: Tests for the compiled query cache.
+"""
+import threading
+import unittest
+
+import pyflwor
+from pyflwor.cache import QueryCache
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_hit_miss(self):
+        cache = QueryCache(maxsize=2)
+        calls = list()
+
+        def compiler():
+            calls.append(1)
+            return object()
+
+        key = QueryCache.key("a")
+        first = cache.get(key, compiler)
+        self.assertIs(cache.get(key, compiler), first)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.info(), (1, 1, 2, 1))
+
+    def test_lru_eviction(self):
+        cache = QueryCache(maxsize=2)
+        a = cache.get("a", object)
+        cache.get("b", object)
+        cache.get("a", object)  # a is now the most recently used
+        cache.get("c", object)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertIs(cache.get("a", object), a)
+
+    def test_resize_and_clear(self):
+        cache = QueryCache(maxsize=4)
+        for key in "abcd":
+            cache.get(key, object)
+        cache.maxsize = 1
+        self.assertEqual(len(cache), 1)
+        self.assertIn("d", cache)
+        cache.clear()
+        self.assertEqual(cache.info(), (0, 0, 1, 0))
+        self.assertRaises(ValueError, QueryCache, -1)
+
+    def test_zero_size_disables(self):
+        cache = QueryCache(maxsize=0)
+        self.assertIsNot(cache.get("a", object), cache.get("a", object))
+        self.assertEqual(len(cache), 0)
+
+    def test_options_in_key(self):
+        self.assertNotEqual(QueryCache.key("a", x=1), QueryCache.key("a", x=2))
+        self.assertEqual(QueryCache.key("a", x=1, y=2), QueryCache.key("a", y=2, x=1))
+
+    def test_compile_uses_cache(self):
+        pyflwor.query_cache.clear()
+        q = pyflwor.compile("a/b")
+        self.assertIs(pyflwor.compile("a/b"), q)
+        self.assertIsNot(pyflwor.compile("a/b", cache=False), q)
+        a = "hello"
+        self.assertEqual(pyflwor.execute("a", locals()), [a])
+        self.assertEqual(pyflwor.execute("a", locals()), [a])
+        self.assertEqual(pyflwor.query_cache.info().hits, 2)
+
+    def test_syntax_errors_not_cached(self):
+        pyflwor.query_cache.clear()
+        self.assertRaises(SyntaxError, pyflwor.compile, "hello hello")
+        self.assertEqual(len(pyflwor.query_cache), 0)
+
+    def test_threads(self):
+        cache = QueryCache(maxsize=8)
+        results = list()
+
+        def worker():
+            for i in range(200):
+                results.append(cache.get(i % 16, object))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        info = cache.info()
+        self.assertEqual(info.hits + info.misses, 800)
+        self.assertLessEqual(info.currsize, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
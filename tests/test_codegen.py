@@ -0,0 +1,98 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_codegen.py
+Purpose: Tests for the code generating backend. The system tests are re-run
+    with every query compiled by the code generator.
+"""
+import math
+import unittest
+from unittest import mock
+
+import pyflwor
+import test_pyflwor
+
+
+def exe(query, namespace):
+    return pyflwor.execute(query, namespace, backend="codegen")
+
+
+class TestCodegenSystem(test_pyflwor.TestPyQuery):
+    def setUp(self):
+        patcher = mock.patch.object(test_pyflwor, "exe", exe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestCodegen(unittest.TestCase):
+    def test_source(self):
+        q = pyflwor.compile(
+            "for x in <l[self > 1]> where x < 4 return x", backend="codegen"
+        )
+        self.assertIn("def query(objs):", q.__source__)
+        self.assertEqual(q({"l": [1, 2, 3, 4]}), (2, 3))
+
+    def test_fallback(self):
+        q = pyflwor.compile(
+            "for x in l let f = function(y) { y * 2 } return f(x)", backend="codegen"
+        )
+        self.assertFalse(hasattr(q, "__source__"))
+        self.assertEqual(q({"l": [1, 2]}), (2, 4))
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, pyflwor.compile, "a", backend="nope")
+
+    def test_path_order(self):
+        class A(object):
+            def __init__(self, name, kids=()):
+                self.name = name
+                self.kids = list(kids)
+
+        root = [
+            A("a", [A("a1", [A("a11"), A("a12")]), A("a2", [A("a21")])]),
+            A("b", [A("b1", [A("b11")])]),
+        ]
+        d = {"root": root}
+        query = "root/kids/kids[self.name != 'a12']/name"
+        self.assertEqual(exe(query, d), pyflwor.execute(query, d))
+        self.assertEqual(exe(query, d), ["a11", "a21", "b11"])
+
+    def test_keyword_attribute(self):
+        class A(object):
+            pass
+
+        a = A()
+        setattr(a, "lambda", 5)
+        self.assertEqual(exe("a[self.lambda == 5]", {"a": a}), [a])
+
+    def test_non_finite(self):
+        l = {"l": [1]}
+        self.assertEqual(exe("for x in <l> return 1e400", l), (float("inf"),))
+        self.assertEqual(exe("for x in <l> return 1e308 * 10", l), (float("inf"),))
+        self.assertEqual(exe("l[self < 1e400]", l), [1])
+        self.assertTrue(math.isnan(exe("for x in <l> return 1e400 - 1e400", l)[0]))
+
+    def test_quantified(self):
+        d = {
+            "a": "hello",
+            "l1": [0, 2, 4],
+            "l2": [1, 2],
+            "e": [],
+            "mod2": lambda x: x % 2,
+        }
+        for query in (
+            "a[every x in <l1> satisfies (mod2(x) == 0)]",
+            "a[every x in <l2> satisfies (x // 2 == 0)]",
+            "a[some x in <l2> satisfies (x == 2)]",
+            "a[some x in <e> satisfies (x == 2)]",
+            "a[every x in <e> satisfies (x == 2)]",
+        ):
+            self.assertEqual(exe(query, d), pyflwor.execute(query, d), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
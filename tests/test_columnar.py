@@ -0,0 +1,183 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_columnar.py
+Purpose: Tests for the columnar backend.
+"""
+import unittest
+from unittest import mock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import pyflwor
+from pyflwor import columnar
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.table = {
+            "q": numpy.arange(10) % 4,
+            "p": numpy.linspace(0, 1, 10),
+            "s": numpy.array(list("abcdeabcde")),
+        }
+        self.namespace = {"t": self.table, "k": 2}
+
+    def run_query(self, query, namespace=None, vectorised=True):
+        """
+        Runs query with the columnar backend, checks the result is the one of
+        the closures over the rows of the tables and whether it was vectorised.
+        """
+        namespace = namespace or self.namespace
+        rows = dict(namespace)
+        for name, value in namespace.items():
+            if isinstance(columnar.table(value), dict):
+                rows[name] = columnar.rows(columnar.table(value))
+        expected = pyflwor.execute(query, rows)
+        with mock.patch.object(columnar, "_rows", wraps=columnar._rows) as fallback:
+            result = pyflwor.execute(query, namespace, backend="columnar")
+        self.assertEqual(result, expected, query)
+        self.assertEqual(not fallback.called, vectorised, query)
+        return result
+
+    def test_flwr(self):
+        self.assertEqual(
+            self.run_query("for x in <t> where x.q < k and x.s != 'a' return x.q, x.s"),
+            ((1, "b"), (0, "e"), (0, "d"), (1, "e")),
+        )
+        self.run_query("for x in <t[self.q == 3]> return 'q': x.q, 'p': x.p * 2")
+        self.run_query("for x in <t> let y = x.q + 1 where y > 3 return y, x")
+        self.run_query("for x in <t> where not (x.q == 1 or x.p > 0.5) return x.p")
+        self.run_query("for x in <t> where x.q return x.q // 2, x.q / 2, 1")
+        self.run_query("for x in <t> where x.q > 1 limit 2 offset 1 return x.s")
+
+    def test_path(self):
+        self.assertEqual(
+            self.run_query("t[self.q == 3 and self.s == 'd']"),
+            [columnar.Row({"q": 3, "p": self.table["p"][3], "s": "d"})],
+        )
+        array = numpy.arange(5)
+        self.assertEqual(self.run_query("a[self > 2]", {"a": array}), [3, 4])
+        structured = numpy.array([(1, 2.0), (2, 3.0)], dtype=[("q", int), ("p", float)])
+        self.run_query("for x in <a> where x.q > 1 return x.p", {"a": structured})
+
+    def test_fallback(self):
+        for query in (
+            "for x in <t> where x.q // 0 > 1 return x.q",  # raises
+            "for x in <t> where x.s return x.q",
+            "for x in <t> where x.s < 1 return x.q",  # raises
+            "for x in <t> return x.q.real",
+            "for x in <t>, y in <t> where x.q == y.q return x.s",
+            "for x in <t> order by 0 ascd return x.q",
+            "for x in <t> where x.q in {1, 2} return x.q",
+            "for x in <t> where f(x.q) return x.q",
+        ):
+            namespace = dict(self.namespace, f=bool)
+            try:
+                self.run_query(query, namespace, vectorised=False)
+            except Exception as e:
+                rows = dict(namespace, t=columnar.rows(self.table))
+                self.assertRaises(type(e), pyflwor.execute, query, rows)
+        ## not a table
+        self.run_query("for x in <t> return x", {"t": [1, 2]}, vectorised=False)
+        self.run_query(
+            "for x in <t> return x.key",
+            {"t": {"a": numpy.arange(2), "b": numpy.arange(3)}},
+            vectorised=False,
+        )
+
+    def test_constants(self):
+        ## a list is one value compared with each row, not a column
+        namespace = dict(self.namespace, l=list(range(10)), u=(1, 2))
+        self.assertEqual(
+            self.run_query("for x in <t> where x.q == l return x.q", namespace), ()
+        )
+        self.assertEqual(len(self.run_query("t[self.q != u]", namespace)), 10)
+        self.assertRaises(
+            TypeError,
+            pyflwor.execute,
+            "for x in <t> where x.q < l return x.q",
+            namespace,
+            backend="columnar",
+        )
+        self.assertEqual(
+            columnar.Columns(values=numpy.arange(3)).select(numpy.bool_(False)).rows(),
+            [],
+        )
+
+    def test_overflow(self):
+        ## the integers of the rows are python ints, the columns are not
+        namespace = {
+            "t": {
+                "a": numpy.array([2**62, 3]),
+                "u": numpy.array([1, 2], dtype=numpy.uint8),
+            }
+        }
+        self.assertEqual(
+            self.run_query("for r in <t> return r.a * 4", namespace, vectorised=False),
+            (2**64, 12),
+        )
+        self.assertEqual(
+            self.run_query(
+                "for r in <t> where r.a * 4 > 100 return r.a",
+                namespace,
+                vectorised=False,
+            ),
+            (2**62,),
+        )
+        self.assertEqual(
+            self.run_query("for r in <t> return r.u - 2", namespace, vectorised=False),
+            (-1, 0),
+        )
+        self.assertEqual(
+            self.run_query(
+                "for r in <t> return r.a + 100000000000000000000000",
+                namespace,
+                vectorised=False,
+            ),
+            (2**62 + 10**23, 3 + 10**23),
+        )
+        self.run_query("for r in <t> return r.a // 2 - 1, r.u * 100", namespace)
+
+    def test_masks(self):
+        ## the values of and, or are their operands, only their truth values are vectorised
+        q = columnar.attributeValue([columnar.Attribute("x", [])])
+        both = columnar.booleanexprValue(q, columnar.booleanOperator("and"), q)
+        self.assertRaises(
+            columnar.Unsupported,
+            columnar.arithValue,
+            both,
+            columnar.arith_operator("+"),
+            q,
+        )
+        self.assertRaises(
+            columnar.Unsupported,
+            columnar.comparisonValue,
+            both,
+            columnar.operator("=="),
+            q,
+        )
+        path = columnar.queryValue([("t", None)])
+        self.assertRaises(
+            columnar.Unsupported, columnar.flwrSequence, [both], [("x", path)]
+        )
+        self.assertRaises(
+            columnar.Unsupported,
+            columnar.flwrSequence,
+            [q],
+            [("x", path)],
+            [("y", both)],
+        )
+        f = columnar.flwrSequence([q], [("x", path)], where_expr=both)
+        self.assertEqual(f({"t": numpy.arange(3)}), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
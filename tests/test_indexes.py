@@ -0,0 +1,246 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_indexes.py
+Purpose: Tests for the collections with secondary indexes.
+"""
+import operator
+import unittest
+
+import pyflwor
+from pyflwor import (
+    IndexedCollection,
+    ObservableDict,
+    ObservableList,
+    ObservableSet,
+    nodes,
+    optimizer,
+)
+
+
+class A(object):
+    def __init__(self, q, name=None):
+        self.q = q
+        self.c = {"name": name}
+
+    def __repr__(self):
+        return "A(%r, %r)" % (self.q, self.c["name"])
+
+
+class TestIndexedCollection(unittest.TestCase):
+    def setUp(self):
+        self.items = [A(i % 5, "ab"[i % 2]) for i in range(12)]
+        self.a = IndexedCollection(self.items, "q", "c.name")
+
+    def both(self, query, namespace):
+        """
+        Runs query with and without the optimizer on both backends and checks
+        they agree.
+        """
+        expected = pyflwor.execute(query, namespace, optimize=False)
+        for backend in pyflwor.pyflwor.backends:
+            self.assertEqual(
+                pyflwor.execute(query, namespace, backend=backend), expected
+            )
+        return expected
+
+    def test_lookup(self):
+        a = self.a
+        self.assertEqual(a.lookup("q", "==", 2), [self.items[2], self.items[7]])
+        self.assertEqual(a.lookup("q", "==", 9), [])
+        self.assertEqual(
+            a.lookup("q", "<", 1), [self.items[0], self.items[5], self.items[10]]
+        )
+        self.assertEqual(len(a.lookup("q", ">=", 3)), 4)
+        self.assertEqual(len(a.lookup("c.name", "==", "a")), 6)
+        self.assertIsNone(a.lookup("r", "==", 1))  # not indexed
+        self.assertIsNone(a.lookup("q", "<", "x"))  # not comparable
+        self.assertIsNone(a.lookup("q", "==", []))  # not hashable
+        self.assertEqual(list(a), self.items)
+        self.assertEqual(len(a), 12)
+
+    def test_unusable_keys(self):
+        a = IndexedCollection([A([1]), A(2)], "q", "r")
+        self.assertIsNone(a.lookup("q", "==", 2))
+        self.assertIsNone(a.lookup("r", "==", 2))
+        a = IndexedCollection([A(1), A("x")], "q")
+        self.assertIsNone(a.lookup("q", "<", 2))
+        self.assertEqual(a.lookup("q", "==", "x"), [a[1]])
+
+    def test_unordered_values(self):
+        ## NaN (and the values of types which are not ordered) are found by
+        ## every range lookup, the where clause tests them
+        nan = float("nan")
+        items = [A(q) for q in (3.0, nan, 1.0, 2.0, nan, 5.0, 0.5, 4.0)]
+        a = IndexedCollection(items, "q")
+        self.assertEqual(
+            [x for x in a.lookup("q", "<", 3) if x.q < 3],
+            [items[2], items[3], items[6]],
+        )
+        self.assertEqual([x.q for x in a.lookup("q", ">=", 4) if x.q >= 4], [5.0, 4.0])
+        self.assertIsNone(a.lookup("q", "<", nan))
+        namespace = {"a": a}
+        self.assertEqual(
+            self.both("a[self.q > 1.5]/q", namespace), [3.0, 2.0, 5.0, 4.0]
+        )
+        self.assertEqual(self.both("a[self.q < 2]/q", namespace), [1.0, 0.5])
+        ## kept up to date
+        items = ObservableList(items)
+        a = IndexedCollection(items, "q")
+        self.assertEqual(len(a.lookup("q", ">", 2)), 5)
+        items.insert(1, A(nan))
+        items.append(A(6.0))
+        del items[2]
+        self.assertEqual(
+            [x.q for x in a.lookup("q", ">", 2) if x.q > 2], [3.0, 5.0, 4.0, 6.0]
+        )
+
+    def test_planned(self):
+        tree = optimizer.optimize(
+            pyflwor.parse("a[self.q > 1 and f(self) and self.c.name == x]")
+        )
+        self.assertIsInstance(tree, nodes.Path)
+        self.assertEqual(
+            [(i, key, op) for i, key, op, _ in tree.probes],
+            [(0, "c.name", "=="), (0, "q", ">")],
+        )
+        for query in ("a[self.q == self.r]", "a[self.f() == 1]", "a[self.q != 1]"):
+            self.assertIsNone(optimizer.optimize(pyflwor.parse(query)).probes, query)
+        tree = optimizer.optimize(pyflwor.parse("a[1 <= self]"))
+        self.assertEqual([(key, op) for _, key, op, _ in tree.probes], [("", ">=")])
+
+    def test_query(self):
+        calls = list()
+
+        def f(a):
+            calls.append(a)
+            return True
+
+        namespace = {"a": self.a, "f": f, "x": "a"}
+        for query in (
+            "a[self.q == 2 and f(self)]",
+            "a[self.q > 2 and self.c.name == x and f(self)]",
+            "a[3 > self.q and f(self)]",
+            "for y in <a[self.q <= 1]> return y.q",
+            "a[self.q == 'x']",
+        ):
+            self.both(query, namespace)
+        for backend in pyflwor.pyflwor.backends:
+            del calls[:]
+            result = pyflwor.execute(
+                "a[self.q == 2 and f(self)]", namespace, backend=backend
+            )
+            self.assertEqual(result, [self.items[2], self.items[7]])
+            self.assertEqual(calls, result)
+
+    def test_nested(self):
+        namespace = {"b": {"a": self.a}, "B": [A(1), A(3)]}
+        self.both("b/a[self.q == 4]", namespace)
+        self.assertEqual(
+            len(self.both("for y in <B> return <b/a[self.q == y.q]>", namespace)), 2
+        )
+        ## the scalar items are indexed by the "" key
+        namespace = {"s": IndexedCollection([3, 1, 2, 1], "")}
+        self.assertEqual(self.both("s[self == 1]", namespace), [1, 1])
+        self.assertEqual(self.both("s[self >= 2]", namespace), [3, 2])
+
+
+ops = {"==": operator.eq, "<": operator.lt, ">=": operator.ge}
+
+
+class TestObservable(unittest.TestCase):
+    def check(self, c, items):
+        """
+        Checks the lookups in c agree with a scan of items.
+        """
+        for op, value in (("==", 1), ("==", 3), ("<", 2), (">=", 3)):
+            expected = [item for item in items if ops[op](item.q, value)]
+            self.assertEqual(c.lookup("q", op, value), expected, (op, value))
+
+    def test_list(self):
+        items = ObservableList(A(q) for q in (3, 1, 4, 1, 5))
+        c = IndexedCollection(items, "q")
+        self.check(c, items)
+        items.append(A(3))
+        items.insert(0, A(1))
+        items.insert(2, items[-1])  # twice in the list
+        del items[1]
+        items[3] = A(2)
+        items.remove(items[-2])
+        self.check(c, items)
+        items[0].q = 4
+        items.changed(items[0])
+        items[1].q = 0  # the item is in the list twice
+        items.changed(items[1])
+        self.check(c, items)
+        items.sort(key=lambda a: -a.q)
+        items.pop()
+        self.check(c, items)
+        for i in range(100):  # out of stamps between the first two items
+            items.insert(1, A(i % 5))
+        self.check(c, items)
+        self.assertEqual(list(c), items)
+        ## extended by itself
+        n = len(items)
+        items.extend(items)
+        items += items[:2]
+        self.assertEqual(len(items), 2 * n + 2)
+        self.check(c, items)
+
+    def test_set_dict(self):
+        first = A(1)
+        items = ObservableSet([first, A(2), A(3)])
+        c = IndexedCollection(items, "q")
+        items.add(A(1))
+        items.discard(first)
+        self.assertEqual(len(c.lookup("q", "==", 1)), 1)
+        self.assertEqual(list(c), [item for item in c])
+        items = ObservableDict(a=A(1), b=A(2))
+        c = IndexedCollection(items, "value.q")
+        self.assertEqual(c.lookup("value.q", "==", 4), [])
+        items |= {"d": A(4)}
+        self.assertEqual([p.key for p in c.lookup("value.q", "==", 4)], ["d"])
+        del items["d"]
+        items["a"] = A(3)
+        items["c"] = A(3)
+        items["b"].q = 3
+        items.changed(items["b"])
+        self.assertEqual([p.key for p in c.lookup("value.q", "==", 3)], ["a", "b", "c"])
+        del items["b"]
+        self.assertEqual([p.key for p in c], ["a", "c"])
+        self.assertEqual(
+            [p.key for p in pyflwor.execute("c[self.value.q > 2]", {"c": c})],
+            ["a", "c"],
+        )
+
+    def test_unusable_values(self):
+        items = ObservableList([A(1), A(2)])
+        c = IndexedCollection(items, "q")
+        self.assertEqual(len(c.lookup("q", "<", 2)), 1)
+        items.append(A("x"))
+        self.assertIsNone(c.lookup("q", "<", 2))
+        items.pop()
+        self.assertEqual(len(c.lookup("q", "<", 2)), 1)
+        items.append(object())  # without q
+        self.assertIsNone(c.lookup("q", "==", 1))
+        items.pop()
+        self.assertEqual(len(c.lookup("q", "==", 1)), 1)
+
+    def test_query(self):
+        items = ObservableList(A(q) for q in range(5))
+        namespace = {"a": IndexedCollection(items, "q")}
+        self.assertEqual(pyflwor.execute("a[self.q == 4]", namespace), [items[4]])
+        items.append(A(4))
+        for backend in pyflwor.pyflwor.backends:
+            self.assertEqual(
+                pyflwor.execute("a[self.q == 4]", namespace, backend=backend),
+                items[4:],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_lazy.py
+Purpose: Tests for the lazy (streaming) query results.
+"""
+import itertools
+import unittest
+
+import pyflwor
+
+
+class A(object):
+    def __init__(self, q):
+        self.q = q
+
+
+class TestLazy(unittest.TestCase):
+    def lazy(self, query, namespace, **options):
+        """
+        Runs query lazily with both backends, checks they agree with the list
+        of results of the eager query and returns it.
+        """
+        expected = pyflwor.execute(query, namespace, **options)
+        for backend in pyflwor.pyflwor.backends:
+            results = pyflwor.execute(
+                query, namespace, backend=backend, lazy=True, **options
+            )
+            self.assertIs(iter(results), results)
+            self.assertEqual(list(results), list(expected))
+        return expected
+
+    def test_path(self):
+        namespace = {"a": [A(A(1)), A([A(2), A(3)]), A(A(4))]}
+        self.assertEqual(len(self.lazy("a/q[self.q > 1]", namespace)), 3)
+        self.assertEqual(self.lazy("b/q", namespace), [])
+
+    def test_flwr(self):
+        namespace = {
+            "a": [A(q) for q in range(5)],
+            "b": [1, 2],
+            "f": lambda x: (x.q, (x.q, x.q)),
+        }
+        self.lazy("for x in <a>, y in <b> where x.q > y return x.q, y", namespace)
+        self.lazy("for x in <a> return flatten f(x)", namespace)
+        self.lazy("for x in <a>, y in <b> return x.q", namespace, optimize=False)
+
+    def test_not_streamed(self):
+        namespace = {"a": [A(q) for q in range(5)]}
+        self.assertEqual(
+            self.lazy("for x in <a> order by 0 desc return x.q", namespace),
+            (4, 3, 2, 1, 0),
+        )
+        self.assertRaises(
+            ValueError,
+            pyflwor.compile,
+            "for x in <a> collect x.q as x.q with f",
+            lazy=True,
+        )
+
+    def test_streams(self):
+        namespace = {"a": A(itertools.count()), "b": [1, 2]}
+        queries = (
+            "a/q[self > 2]",
+            "for x in <a/q> where x > 2 return x",
+            "for x in <a/q>, y in <b> return x, y",
+        )
+        for query in queries:
+            for backend in pyflwor.pyflwor.backends:
+                results = pyflwor.execute(query, namespace, backend=backend, lazy=True)
+                self.assertEqual(len(list(itertools.islice(results, 4))), 4)
+
+    def test_function_fallback(self):
+        query = "for x in <a> let f = function(y) { y * 2 } return f(x.q)"
+        namespace = {"a": [A(q) for q in range(3)]}
+        self.assertEqual(self.lazy(query, namespace), (0, 2, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
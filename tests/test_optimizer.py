@@ -0,0 +1,328 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_optimizer.py
+Purpose: Tests for the abstract syntax tree and the optimizer passes. The
+    system tests are re-run with the optimizer disabled.
+"""
+import asyncio
+import unittest
+from unittest import mock
+
+import pyflwor
+from pyflwor import nodes, optimizer
+import test_pyflwor
+
+
+def exe(query, namespace):
+    return pyflwor.execute(query, namespace, optimize=False)
+
+
+class TestUnoptimizedSystem(test_pyflwor.TestPyQuery):
+    def setUp(self):
+        patcher = mock.patch.object(test_pyflwor, "exe", exe)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class A(object):
+    def __init__(self, q):
+        self.q = q
+
+
+class TestOptimizer(unittest.TestCase):
+    def both(self, query, namespace):
+        """
+        Runs query with and without the optimizer on both backends and checks
+        they agree.
+        """
+        expected = pyflwor.execute(query, namespace, optimize=False)
+        for backend in pyflwor.pyflwor.backends:
+            self.assertEqual(
+                pyflwor.execute(query, namespace, backend=backend), expected
+            )
+        return expected
+
+    def test_parse(self):
+        tree = pyflwor.parse("for x in <a/b[self.q > 1]> return x.q")
+        self.assertIsInstance(tree, nodes.FLWR)
+        self.assertEqual(tree.names(), set(["a"]))
+        path = tree.for_expr[0][1]
+        self.assertEqual([name for name, _ in path.steps], ["a", "b"])
+        self.assertEqual(path.steps[1][1].names(), set(["self"]))
+
+    def test_fold_constants(self):
+        tree = optimizer.fold_constants(pyflwor.parse("a[2 * 3 > 5 and self.x]"))
+        self.assertEqual(tree.steps[0][1].value.names(), set(["self"]))
+        tree = optimizer.fold_constants(pyflwor.parse("a[1 / 0 == 1]"))
+        self.assertIsInstance(tree.steps[0][1], nodes.Comparison)
+        self.assertEqual(self.both("a[not (1 > 2)]", {"a": 1}), [1])
+        self.assertEqual(self.both("a[if (1 < 2) then 0 else 1]", {"a": 1}), [])
+
+    def test_push_predicates(self):
+        tree = optimizer.optimize(
+            pyflwor.parse(
+                "for x in <a>, y in <b> where x.q > 1 and x.q < y.q and y.q != 3 "
+                "return x.q, y.q"
+            )
+        )
+        self.assertEqual([name for name, _ in tree.filter_expr], ["y"])
+        self.assertEqual(tree.for_expr[0][1].steps[0][1].names(), set(["self"]))
+        self.assertEqual(tree.for_expr[1][1].steps[0][1].names(), set(["self"]))
+        namespace = {
+            "a": [A(q) for q in range(5)],
+            "b": [A(q) for q in range(5)],
+        }
+        self.assertEqual(
+            self.both(
+                "for x in <a>, y in <b> where x.q > 1 and x.q < y.q and y.q != 3 "
+                "return x.q, y.q",
+                namespace,
+            ),
+            ((2, 4), (3, 4)),
+        )
+
+    def test_push_merges_where(self):
+        tree = optimizer.optimize(
+            pyflwor.parse("for x in <a[self.q > 0]> where x.q < 3 return x")
+        )
+        self.assertIsNone(tree.where_expr)
+        self.assertEqual(len(optimizer.split_and(tree.for_expr[0][1].steps[0][1])), 2)
+        namespace = {"a": [A(q) for q in range(5)]}
+        self.assertEqual(
+            len(
+                self.both("for x in <a[self.q > 0]> where x.q < 3 return x", namespace)
+            ),
+            2,
+        )
+
+    def test_push_keeps_capturing(self):
+        ## self inside the path would refer to the object of the inner path
+        query = (
+            "for x in <a>, y in <b> "
+            "where some z in <b[self.q == x.q]> satisfies (z.q > 0) return x.q"
+        )
+        tree = optimizer.push_predicates(pyflwor.parse(query))
+        self.assertIsNotNone(tree.where_expr)
+        namespace = {"a": [A(q) for q in range(3)], "b": [A(1)]}
+        self.assertEqual(self.both(query, namespace), (1,))
+
+    def test_push_skips_lets(self):
+        query = "for x in <a> let y = x.q where y > 1 return y"
+        tree = optimizer.optimize(pyflwor.parse(query))
+        self.assertIsNotNone(tree.where_expr)
+        namespace = {"a": [A(q) for q in range(3)]}
+        self.assertEqual(self.both(query, namespace), (2,))
+
+    def test_dead_lets(self):
+        query = "for x in <a> let y = x.q, z = x.q * 2, w = f(x) return z"
+        tree = optimizer.optimize(pyflwor.parse(query))
+        self.assertEqual([name for name, _ in tree.let_expr], ["z", "w"])
+        calls = list()
+        namespace = {"a": [A(q) for q in range(3)], "f": calls.append}
+        self.assertEqual(self.both(query, namespace), (0, 2, 4))
+        self.assertEqual(len(calls), 3 * (1 + len(pyflwor.pyflwor.backends)))
+
+    def test_plan_joins(self):
+        query = (
+            "for a in <A>, b in <B>, c in <C> "
+            "where b.q == a.q and c.q == a.q + b.q and a.q != c.q return a.q, c.q"
+        )
+        tree = optimizer.optimize(pyflwor.parse(query))
+        self.assertEqual([name for name, _, _ in tree.join_expr], ["b", "c"])
+        self.assertEqual([name for name, _ in tree.filter_expr], ["c"])
+        namespace = {
+            "A": [A(q) for q in (2, 1, 0, 1)],
+            "B": [A(q) for q in (1, 2, 1, 3)],
+            "C": [A(q) for q in range(5)],
+        }
+        self.assertEqual(
+            self.both(query, namespace), ((2, 4), (1, 2), (1, 2), (1, 2), (1, 2))
+        )
+
+    def test_join_not_planned(self):
+        for where in (
+            "a.q == a.q",  # one variable, pushed down instead
+            "a.q == b.q + c.q",  # c is bound after a
+            "a.q < b.q",
+            "a.q == b.q or a.q == 1",
+            "b.q == l",  # l is a let
+        ):
+            query = (
+                "for a in <A>, b in <B>, c in <C> let l = 1 where %s return a" % where
+            )
+            tree = optimizer.plan_joins(pyflwor.parse(query))
+            self.assertIsNone(tree.join_expr, where)
+
+    def test_join_let_shadows(self):
+        ## the let a hides the for variable a from the where clause
+        query = "for a in <A>, b in <B> let a = 5 where a == b.q return b.q"
+        tree = optimizer.plan_joins(pyflwor.parse(query))
+        self.assertIsNone(tree.join_expr)
+        namespace = {"A": [A(q) for q in range(3)], "B": [A(5), A(1)]}
+        self.assertEqual(self.both(query, namespace), (5, 5, 5))
+
+    def test_join_nan(self):
+        ## a NaN is not equal to itself, with or without the join
+        nan = float("nan")
+        query = "for a in <A>, b in <B> where a.q == b.q return b.q"
+        namespace = {"A": [A(nan), A(1.0)], "B": [A(nan), A(1.0), A(1)]}
+        self.assertEqual(self.both(query, namespace), (1.0, 1))
+        query = "a[some b in <B> satisfies (b.q == self)]"
+        self.assertEqual(self.both(query, {"a": [nan, 1], "B": namespace["B"]}), [1])
+
+    def test_join_unhashable(self):
+        query = "for a in <A>, b in <B> where a.q == b.q return a.q"
+        namespace = {
+            "A": [A([1]), A(2), A([3])],
+            "B": [A(2), A([1]), A([1])],
+        }
+        self.assertEqual(self.both(query, namespace), ([1], [1], 2))
+        namespace["B"] = [A(2), A(1)]
+        self.assertEqual(self.both(query, namespace), (2,))
+
+    def test_filter_early(self):
+        query = (
+            "for a in <A>, b in <B>, c in <C> let l = c.q "
+            "where c.q > 1 and a.q < b.q and l != 3 and f(a) and 1 == g() "
+            "return a.q, b.q, c.q"
+        )
+        tree = optimizer.filter_early(pyflwor.parse(query))
+        self.assertEqual([name for name, _ in tree.filter_expr], ["a", "a", "b", "c"])
+        self.assertEqual(tree.where_expr.names(), set(["l"]))
+        calls = list()
+
+        def f(a):
+            calls.append(a)
+            return True
+
+        namespace = {
+            "A": [A(q) for q in range(3)],
+            "B": [A(q) for q in range(3)],
+            "C": [A(q) for q in range(4)],
+            "f": f,
+            "g": lambda: 1,
+        }
+        self.assertEqual(
+            self.both(query, namespace),
+            ((0, 1, 2), (0, 2, 2), (1, 2, 2)),
+        )
+        del calls[:]
+        pyflwor.execute(query, namespace)
+        self.assertEqual(len(calls), 3)
+
+    def test_semi_joins(self):
+        query = (
+            "a[some x in <B> satisfies (some y in <B[self != x]> satisfies "
+            "(self == x.q and k(y) == x.q + 1 and y.q > 0))]"
+        )
+        tree = optimizer.optimize(pyflwor.parse(query))
+        self.assertIsInstance(tree, nodes.Indexed)
+        x = tree.query.steps[0][1]
+        self.assertEqual([key.names() for key in x.keys], [set(["x"])])
+        self.assertEqual([probe.names() for probe in x.probes], [set(["self"])])
+        y = x.satisfies
+        self.assertEqual(y.s.names(), set(["B"]))
+        self.assertEqual([probe.names() for probe in y.probes], [set(["x"])])
+        calls = list()
+
+        def k(y):
+            calls.append(y)
+            return y.q
+
+        namespace = {"a": [0, 1, 2, 3], "B": [A(q) for q in (3, 1, 2, 1, 0)], "k": k}
+        self.assertEqual(self.both(query, namespace), [0, 1, 2])
+        del calls[:]
+        pyflwor.execute(query, namespace)
+        self.assertEqual(len(calls), 5)  # the index is built once
+
+    def test_semi_join_not_planned(self):
+        for satisfies in (
+            "x.q < self",
+            "x.q == x.r",
+            "x.q + y.q == 1",  # y is bound around the quantifier
+            "x.q == y.q + x.r",
+        ):
+            query = (
+                "for y in <B> where some x in <B> satisfies (%s) return y" % satisfies
+            )
+            tree = optimizer.semi_joins(pyflwor.parse(query))
+            self.assertIsInstance(tree, nodes.FLWR, satisfies)
+        for query in (
+            "a[some x in <self/b> satisfies (x.q == 1)]",
+            "a[every x in <B> satisfies (x.q == self)]",
+        ):
+            self.assertNotIsInstance(
+                optimizer.semi_joins(pyflwor.parse(query)), nodes.Indexed
+            )
+
+    def test_semi_join_empty(self):
+        ## the probes are not evaluated when there is nothing to probe
+        query = "a[some x in <B> satisfies (x.q == self.q)]"
+        self.assertEqual(self.both(query, {"a": [1], "B": []}), [])
+        namespace = {"a": [A([1]), A(2)], "B": [A(2)]}
+        self.assertEqual(self.both(query, namespace), [namespace["a"][1]])
+        namespace["B"] = [A(2), A([1])]  # unhashable keys
+        self.assertEqual(self.both(query, namespace), namespace["a"])
+
+    def test_share_subexpressions(self):
+        query = (
+            "for a in <A>, b in <B> where a.r.r.q * 2 > b.q and a.r.r.q * 2 < b.q + 3 "
+            "return a.r.r.q * 2 + b.q, a.r.r.q * 2"
+        )
+        tree = optimizer.optimize(pyflwor.parse(query))
+        shared = [n for n in nodes.walk(tree) if isinstance(n, nodes.Shared)]
+        self.assertEqual(len(shared), 4)
+        self.assertEqual(len(set(n.key for n in shared)), 1)
+        reads = list()
+
+        class R(object):
+            def __init__(self, q):
+                self._q = q
+                self.r = self
+
+            @property
+            def q(self):
+                reads.append(self)
+                return self._q
+
+        namespace = {"A": [R(q) for q in range(4)], "B": [A(q) for q in range(4)]}
+        self.assertEqual(
+            self.both(query, namespace),
+            ((2, 2), (3, 2), (6, 4), (7, 4)),
+        )
+        del reads[:]
+        pyflwor.execute(query, namespace)
+        ## a.r.r.q * 2 is computed once by the filters of b for each a (the
+        ## frame they are evaluated in is kept while b changes) and once for
+        ## each binding
+        self.assertEqual(len(reads), 4 + 4)
+        del reads[:]
+        asyncio.run(pyflwor.aexecute(query, namespace))
+        self.assertEqual(len(reads), 16 + 4)
+        for query in (
+            "a[self.r.q > 1 or self.r.q < 0]",  # a short chain
+            "a[self.f().q > 1 or self.f().q < 0]",  # a call
+            "a[x.r.r.q > 1]",
+        ):
+            tree = optimizer.optimize(pyflwor.parse(query))
+            self.assertFalse(
+                any(isinstance(n, nodes.Shared) for n in nodes.walk(tree)), query
+            )
+
+    def test_rename(self):
+        tree = pyflwor.parse("a[x.q > y.q]").steps[0][1]
+        self.assertEqual(optimizer.rename(tree, "x", "z").names(), set(["y", "z"]))
+        tree = pyflwor.parse("a[some z in <x> satisfies (z == x)]").steps[0][1]
+        self.assertRaises(optimizer.Capture, optimizer.rename, tree, "x", "z")
+
+    def test_cache_key(self):
+        self.assertIsNot(pyflwor.compile("a/b", optimize=False), pyflwor.compile("a/b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_parallel.py
+Purpose: Tests for the parallel evaluation of flwr expressions.
+"""
+import gc
+import pickle
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pyflwor
+from pyflwor import parallel
+
+
+def add(prev, value):
+    return (prev or 0) + value
+
+
+def pair(x):
+    return (x, (x, 1))
+
+
+class Node(object):
+    def __init__(self, q, c=()):
+        self.q = q
+        self.c = list(c)
+
+
+class Counting(ThreadPoolExecutor):
+    def __init__(self, n):
+        ThreadPoolExecutor.__init__(self, n)
+        self.tasks = 0
+
+    def submit(self, *args, **kwargs):
+        self.tasks += 1
+        return ThreadPoolExecutor.submit(self, *args, **kwargs)
+
+
+class TestParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.threads = ThreadPoolExecutor(3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.threads.shutdown()
+
+    def setUp(self):
+        self.namespace = {"l": list(range(50)), "m": [1, 2, 3], "add": add}
+
+    def check(self, query, namespace=None):
+        namespace = namespace or self.namespace
+        expected = pyflwor.execute(query, namespace)
+        for backend in pyflwor.pyflwor.backends:
+            for options in ({"executor": self.threads}, {"workers": 2}):
+                q = pyflwor.compile(query, backend=backend, **options)
+                self.assertIsInstance(q, (parallel.FLWR, parallel.Path))
+                self.assertEqual(q(namespace), expected, (query, backend, options))
+        return expected
+
+    def test_flwr(self):
+        self.assertEqual(
+            self.check("for x in <l> where x > 45 return x, x * 2"),
+            ((46, 92), (47, 94), (48, 96), (49, 98)),
+        )
+        self.check("for x in <l>, y in <m> where x == y * 3 return 'x': x, 'y': y")
+        self.check("for x in <l[self < 10]> let y = x * x return y")
+        self.check("for x in <l> return flatten f(x)", dict(self.namespace, f=pair))
+        self.check("for x in <l> where x > 100 return x")
+
+    def test_order_limit(self):
+        self.assertEqual(
+            self.check("for x in <l> order by 0 desc limit 3 offset 2 return x, 1"),
+            ((47, 1), (46, 1), (45, 1)),
+        )
+        self.check("for x in <l> order by 'y' ascd return 'x': x, 'y': x // 7")
+        self.check("for x in <l> order by 0 ascd offset 45 return x // 3")
+        self.check("for x in <l> limit 7 offset 3 return x")
+        self.check("for x in <l> offset 48 return x")
+        q = pyflwor.compile("for x in <l> order by 'a' ascd return x", workers=2)
+        self.assertRaises(SyntaxError, q, self.namespace)
+        self.assertEqual(q({"l": []}), ())
+
+    def test_collect(self):
+        self.assertEqual(
+            self.check("for x in <l> collect x as x // 10 with add"),
+            {0: 45, 1: 145, 2: 245, 3: 345, 4: 445},
+        )
+        self.check(
+            "for x in <l> let y = x // 7 collect x as y with add "
+            "collect 1 as x // 20 with function(prev, next) { next }",
+        )
+        self.check("for x in <l> where x < 0 collect x as x with add")
+
+    def test_sequential(self):
+        ## the expressions evaluated without the workers
+        for query in (
+            "l[self > 1] | m",
+            "for x in f() return x",
+            "for x in <l> collect x as x with f(x)",
+        ):
+            q = pyflwor.compile(query, workers=2)
+            self.assertNotIsInstance(q, (parallel.FLWR, parallel.Path))
+        self.assertRaises(
+            ValueError, pyflwor.compile, "for x in <l> return x", lazy=True, workers=2
+        )
+
+    def test_path(self):
+        namespace = {
+            "a": [
+                Node(i, [Node(j, [Node(k) for k in range(4)]) for j in range(6)])
+                for i in range(5)
+            ],
+            "k": 2,
+        }
+        self.assertEqual(
+            self.check("a[self.q > 1]/c/q", namespace), [0, 1, 2, 3, 4, 5] * 3
+        )
+        self.check("a/c[self.q >= k]/c[self.q != k]/q", namespace)
+        self.check("a/c[self.q > 10]", namespace)
+        self.check("a/c/c/q", namespace)
+        self.check("b[self.value > 1]/key", {"b": {"x": 1, "y": 2}})
+        for batch_size in (1, 5, 1000):
+            q = pyflwor.compile(
+                "a/c[self.q >= k]/c[self.q != k]/q",
+                executor=self.threads,
+                batch_size=batch_size,
+            )
+            self.assertEqual(
+                q(namespace),
+                pyflwor.execute("a/c[self.q >= k]/c[self.q != k]/q", namespace),
+            )
+
+    def test_indexed(self):
+        ## the queries with semi-joins are rooted at a nodes.Indexed
+        namespace = {
+            "a": [Node(i, [Node(j) for j in range(4)]) for i in range(20)],
+            "b": [Node(q) for q in (1, 3, 5, 3)],
+        }
+        for query in (
+            "a[some y in <b> satisfies (y.q == self.q)]/c/q",
+            "a/c[some y in <b> satisfies (y.q == self.q)]/q",
+            "for x in <a> where some y in <b> satisfies (y.q == x.q) return x.q",
+        ):
+            self.assertIsInstance(
+                pyflwor.pyflwor.optimizer.optimize(pyflwor.parse(query)),
+                pyflwor.nodes.Indexed,
+            )
+            expected = self.check(query, namespace)
+            self.assertTrue(expected, query)
+            with Counting(2) as executor:
+                q = pyflwor.compile(query, executor=executor, batch_size=5)
+                self.assertEqual(q(namespace), expected)
+                self.assertGreater(executor.tasks, 1, query)
+
+    def test_pool(self):
+        ## parallel queries are not cached, the pool goes with the query
+        with Counting(2) as executor:
+            q = pyflwor.compile("for x in <l> return x", executor=executor)
+            self.assertIsNot(
+                pyflwor.compile("for x in <l> return x", executor=executor), q
+            )
+        q = pyflwor.compile("for x in <l> return x", workers=2)
+        self.assertEqual(q(self.namespace), tuple(range(50)))
+        pool = q.pool.executor
+        del q
+        gc.collect()
+        self.assertRaises(RuntimeError, pool.submit, int)
+
+    def test_unpicklable(self):
+        namespace = {"l": [1, 2], "f": lambda x: x}
+        query = "for x in <l> return f(x)"
+        self.assertRaises(ValueError, pyflwor.execute, query, namespace, workers=2)
+        self.assertEqual(
+            pyflwor.execute(query, namespace, executor=self.threads), (1, 2)
+        )
+        ## the errors of the workers are not taken for pickling errors
+        namespace = {"l": [1, 2], "s": "s"}
+        self.assertRaises(
+            TypeError,
+            pyflwor.execute,
+            "for x in <l> return x + s",
+            namespace,
+            workers=2,
+        )
+
+    def test_queries(self):
+        ## the chunk queries compiled by a worker are bounded
+        maxsize = parallel._queries.maxsize
+        parallel._queries.maxsize = 1
+        try:
+            for query in ("for x in <l> return x", "for x in <l> return x * 2"):
+                chunk = pyflwor.compile(query, workers=2).chunk
+                data = pickle.dumps({}), pickle.dumps([1, 2])
+                expected = pyflwor.execute(query, {"l": [1, 2]})
+                self.assertEqual(
+                    tuple(parallel._run(chunk.key, chunk.tree, *data)), expected
+                )
+                self.assertIn(chunk.key, parallel._queries)
+                self.assertEqual(len(parallel._queries), 1)
+        finally:
+            parallel._queries.maxsize = maxsize
+
+    def test_chunks(self):
+        self.assertEqual(
+            list(parallel.chunks(list(range(7)), 3)), [[0, 1, 2], [3, 4], [5, 6]]
+        )
+        self.assertEqual(list(parallel.chunks([1, 2], 4)), [[1], [2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,8 +10,10 @@ Purpose: Tests for the Parser
 NB: Should test most of the language, as in make sure examples compile. Tests
     for correctness will be quite difficult given the nature of this compiler.
 """
-import unittest, os, sys, base64, itertools, random, time
+import unittest, os, sys, base64, itertools, random, time, threading
 import pyflwor
+from ply import yacc
+from pyflwor import parser, lexer, parsetab
 
 
 class TestParser(unittest.TestCase):
@@ -304,5 +306,43 @@ class TestParser2(unittest.TestCase):
         self.assertFalse(bool(result))
 
 
+class TestTables(unittest.TestCase):
+    def test_parsetab_current(self):
+        ## if this fails the grammar changed, run pyflwor.parser.write_tables()
+        module = object.__new__(parser.Parser)
+        info = yacc.ParserReflect(dict((k, getattr(module, k)) for k in dir(module)))
+        info.get_all()
+        self.assertEqual(info.signature(), parsetab._lr_signature)
+
+    def test_lextab_current(self):
+        ## if this fails the token rules changed, run pyflwor.parser.write_tables()
+        shipped = lexer.Lexer()
+        built = lexer.Lexer(tables=False)
+        self.assertEqual(
+            [r.pattern for r, _ in shipped.lexstatere["INITIAL"]],
+            [r.pattern for r, _ in built.lexstatere["INITIAL"]],
+        )
+
+    def test_built_parser(self):
+        q = parser.Parser(tables=False).parse("a[self == 1]", lexer=lexer.Lexer())
+        self.assertEqual(q({"a": [1, 2]}), [1])
+
+    def test_shared_per_thread(self):
+        self.assertIs(parser.get_parser(), parser.get_parser())
+        self.assertIs(lexer.get_lexer(), lexer.get_lexer())
+        others = list()
+        t = threading.Thread(
+            target=lambda: others.append((parser.get_parser(), lexer.get_lexer()))
+        )
+        t.start()
+        t.join()
+        self.assertIsNot(others[0][0], parser.get_parser())
+        self.assertIsNot(others[0][1], lexer.get_lexer())
+
+    def test_lexer_reset(self):
+        self.assertRaises(SyntaxError, pyflwor.compile, "a\n\nb", cache=False)
+        self.assertEqual(lexer.get_lexer().lineno, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -11,6 +11,7 @@ NB: More tests need to be written, this is just the start.
 """
 from builtins import object
 
+import itertools
 import unittest
 
 
@@ -229,6 +230,138 @@ class TestPyQuery(unittest.TestCase):
             ((1, (1, 2, 3)), (2, (1, 2, 3)), (3, (1, 2, 3))),
         )
 
+    def test_attribute_lookups(self):
+        class A(object):
+            def __init__(self, n):
+                self.n = n
+                self.a = self
+
+            def f(self, x, y):
+                return [x, y]
+
+            @property
+            def broken(self):
+                raise AttributeError("broken")
+
+        d = {"l": [A(1), A(2)], "k": 10}
+        self.assertEqual(exe("for x in <l> return x.a.a.n", d), (1, 2))
+        self.assertEqual(
+            exe("for x in <l> return x.a.f(k, x.n)[1], x.f('s', 2)", d),
+            ((1, ["s", 2]), (2, ["s", 2])),
+        )
+        self.assertRaises(Exception, exe, "for x in <l> return x.a.b", d)
+        self.assertRaises(Exception, exe, "for x in <l> return x.broken", d)
+        self.assertRaises(Exception, exe, "for x in <l> return x.f(1, 2).n", d)
+
+    def test_path_kinds(self):
+        def make(iterable):
+            class A(object):
+                def __init__(self, v):
+                    self.v = v
+
+                if iterable:
+
+                    def __iter__(self):
+                        return iter(self.v)
+
+            return A
+
+        d = {"a": make(False)([1, 2])}
+        self.assertEqual(exe("a/v", d), [1, 2])
+        self.assertEqual(exe("a", d), [d["a"]])
+        ## a class redefined with another kind gets an entry of its own
+        d["a"] = make(True)([1, 2])
+        self.assertEqual(exe("a", d), [1, 2])
+        d["a"] = {"k": "str"}
+        self.assertEqual(exe("a/value", d), ["str"])
+
+    def test_json(self):
+        doc = {
+            "version": 2,
+            "users": [
+                {"name": "a", "age": 30, "tags": ["x", "y"], "items": 1},
+                {"name": "b", "age": 20, "tags": [], "address": {"city": "c"}},
+            ],
+        }
+        d = {"doc": doc, "users": doc["users"]}
+        self.assertEqual(exe("doc/users/name", d), ["a", "b"])
+        self.assertEqual(exe("doc/users[self.age > 25]/tags", d), ["x", "y"])
+        self.assertEqual(exe("users/address/city", d), ["c"])
+        self.assertEqual(exe("doc[self.version == 2]/version", d), [2])
+        self.assertEqual(
+            exe("for u in <doc/users> where u.age < 25 return u.address.city", d),
+            ("c",),
+        )
+        ## the keys of a dict come before its methods, as in the path steps
+        self.assertEqual(
+            exe("for u in <users> return u['name'], u.get('items')", d),
+            (("a", 1), ("b", None)),
+        )
+        orders = {"orders": [{"items": [1, 2], "values": 3, "get": {"keys": 4}}]}
+        d = {"data": orders}
+        self.assertEqual(exe("data/orders/items", d), [1, 2])
+        self.assertEqual(exe("for o in <data/orders> return o.items", d), ([1, 2],))
+        self.assertEqual(exe("data/orders[self.values == 3]/values", d), [3])
+        self.assertEqual(exe("for o in <data/orders> return o.get.keys", d), (4,))
+        self.assertEqual(
+            exe("for o in <data/orders> return o.get['keys'], o.copy()['values']", d),
+            ((4, 3),),
+        )
+        d = {"users": doc["users"]}
+        ## a dict without the key of the next step is iterated as before
+        self.assertEqual(exe("users/address/key", d), ["city"])
+        self.assertRaises(Exception, exe, "for u in <users> return u.nope", d)
+
+    def test_path_slots(self):
+        class A(object):
+            __slots__ = ("q",)
+
+            def __init__(self, q):
+                self.q = q
+
+        d = {"l": [A(1), A([2, 3]), A(4)], "m": [A(A(5))], "t": (1, 2, 3)}
+        self.assertEqual(exe("l/q[self > 1]", d), [2, 3, 4])
+        self.assertEqual(exe("m/q/q", d), [5])
+        self.assertEqual(exe("t[self > 1]", d), [2, 3])
+
+    def test_path_does_not_modify(self):
+        class A(object):
+            def __init__(self, q):
+                self.q = q
+
+        o = A([A(1), A(2)])
+        o.q.append(o)  # reachable at two depths
+        d = {"o": o}
+        self.assertEqual(len(exe("o/q/q", d)), 5)
+        for obj in [o] + o.q:
+            self.assertEqual(sorted(vars(obj)), ["q"])
+
+    def test_quantified_short_circuit(self):
+        class Naturals(object):
+            def __iter__(self):
+                return itertools.count()
+
+        calls = list()
+
+        def f(x):
+            calls.append(x)
+            return x < 3
+
+        d = {"f": f, "l": [1, 2, 3, 4, 5], "e": [], "n": Naturals(), "z": 0}
+        self.assertEqual(exe("z[every x in <l> satisfies (f(x))]", d), [])
+        self.assertEqual(len(calls), 3)
+        del calls[:]
+        self.assertEqual(exe("l[some x in <l> satisfies (not f(x))]", d), d["l"])
+        self.assertEqual(len(calls), 15)
+        self.assertEqual(exe("l[some x in <n> satisfies (x == self)]", d), d["l"])
+        self.assertEqual(exe("l[every x in <n> satisfies (x < self)]", d), [])
+        self.assertEqual(
+            exe("l[some x in {for y in <n> return y * 2} satisfies (x > self)]", d),
+            d["l"],
+        )
+        self.assertEqual(exe("l[every x in <e> satisfies (True)]", d), [])
+        self.assertEqual(exe("l[some x in <e> satisfies (True)]", d), [])
+
     def test_flwr_orderby(self):
         def f():
             return [1, 3, 2]
@@ -247,6 +380,71 @@ class TestPyQuery(unittest.TestCase):
         self.assertEqual(exe("for x in f() order by 0 ascd return x", d), (1, 2, 3))
         self.assertEqual(exe("for x in f() order by 0 desc return x", d), (3, 2, 1))
 
+    def test_flwr_limit(self):
+        def f():
+            return [(1, "a"), (3, "b"), (2, "c"), (3, "d"), (0, "e")]
+
+        calls = list()
+
+        def g(x):
+            calls.append(x)
+            return x[1]
+
+        d = locals()
+        self.assertEqual(
+            exe("for x in f() order by 0 desc limit 3 return x[0], x[1]", d),
+            ((3, "b"), (3, "d"), (2, "c")),
+        )
+        self.assertEqual(
+            exe("for x in f() order by 0 ascd limit 2 offset 1 return x[0], g(x)", d),
+            ((1, "a"), (2, "c")),
+        )
+        self.assertEqual(
+            exe('for x in f() order by "n" ascd offset 3 return "n":x[0]', d),
+            ({"n": 3}, {"n": 3}),
+        )
+        self.assertEqual(
+            exe('for x in f() order by "n" ascd limit 9 return "n":x[0]', d),
+            ({"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}, {"n": 3}),
+        )
+        del calls[:]
+        self.assertEqual(exe("for x in f() limit 2 return g(x)", d), ("a", "b"))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(
+            exe("for x in f() where x[0] > 0 limit 2 offset 1 return g(x)", d),
+            ("b", "c"),
+        )
+        self.assertEqual(exe("for x in f() limit 0 return g(x)", d), ())
+        self.assertEqual(
+            exe("for x in f() limit 3 offset 4 return flatten x", d), (2, "c", 3)
+        )
+        self.assertEqual(
+            exe("for x in f() where x[0] > 5 order by 0 ascd limit 2 return x", d), ()
+        )
+        self.assertRaises(Exception, exe, "for x in f() limit 1.5 return x", d)
+        self.assertRaises(
+            SyntaxError, exe, "for x in f() order by 0 ascd limit 1 return x[0]:x", d
+        )
+
+    def test_limit_offset_names(self):
+        ## limit and offset are still names outside of the flwr clauses
+        class A(object):
+            def __init__(self, limit, offset):
+                self.limit = limit
+                self.offset = offset
+
+        d = {"xs": [A(1, 2), A(3, 4)], "limit": {"offset": [5]}}
+        self.assertEqual(
+            exe("for x in <xs> return x.limit, x.offset", d), ((1, 2), (3, 4))
+        )
+        self.assertEqual(exe("xs[self.offset > 2]/limit", d), [3])
+        self.assertEqual(exe("limit/offset", d), [5])
+        self.assertEqual(
+            exe("for x in <xs> order by 0 desc limit 1 offset 1 return x.offset", d),
+            (2,),
+        )
+        self.assertEqual(exe("for x in <xs> limit 1 return x.limit", d), (1,))
+
     def test_function_def(self):
         a = "hello"
         l = [1, 2, 3, 4, 5, 6, 7, [1, 2, 3, 4, 5, 6, 7, [1, 2, 3, 4, 5, 6, 7, 8]]]
@@ -600,5 +798,67 @@ class TestPyQuery(unittest.TestCase):
         )
 
 
+class TestScope(unittest.TestCase):
+    def test_lookup(self):
+        objs = {"a": 1, "b": 2}
+        scope = symbols.Scope(symbols.Scope(objs, {"b": 3}), {"c": 4})
+        self.assertEqual((scope["a"], scope["b"], scope["c"]), (1, 3, 4))
+        self.assertIn("a", scope)
+        self.assertNotIn("d", scope)
+        self.assertRaises(KeyError, lambda: scope["d"])
+        self.assertEqual(scope.get("d", 5), 5)
+        self.assertEqual(dict(scope), {"a": 1, "b": 3, "c": 4})
+        scope["a"] = 0
+        self.assertEqual(scope["a"], 0)
+        self.assertEqual(objs, {"a": 1, "b": 2})
+
+    def test_namespace_untouched(self):
+        d = {"l": [1, 2, 3], "x": "x"}
+        self.assertEqual(
+            exe(
+                "for x in <l> let y = x where some z in <l> satisfies (z > y) return x",
+                d,
+            ),
+            (1, 2),
+        )
+        self.assertEqual(exe("l[self > 1]", d), [2, 3])
+        self.assertEqual(d, {"l": [1, 2, 3], "x": "x"})
+
+
+class TestMany(unittest.TestCase):
+    def setUp(self):
+        self.namespaces = [{"l": list(range(n)), "k": n // 2} for n in range(8)]
+
+    def test_map(self):
+        for query in (
+            "l[self > k]",
+            "for x in <l> where x >= k order by 0 desc return x, k",
+            "for x in <l> collect x as x // 3 with function(prev, next) { next }",
+        ):
+            for backend in pyflwor.pyflwor.backends:
+                expected = [exe(query, objs) for objs in self.namespaces]
+                q = pyflwor.compile(query, backend=backend)
+                self.assertEqual(q.map(self.namespaces), expected)
+                self.assertEqual(q.map(iter(self.namespaces), workers=3), expected)
+                self.assertEqual(
+                    pyflwor.execute_many(query, self.namespaces, backend=backend),
+                    expected,
+                )
+
+    def test_lazy(self):
+        q = pyflwor.compile("for x in <l> return x", lazy=True)
+        self.assertEqual(
+            [list(r) for r in q.map(self.namespaces[:3])], [[], [0], [0, 1]]
+        )
+
+    def test_errors(self):
+        query = "for x in <l> order by 'a' ascd return x"
+        self.assertEqual(exe(query, {"l": []}), ())
+        self.assertRaises(
+            SyntaxError, pyflwor.execute_many, query, [{"l": []}, {"l": [1]}]
+        )
+        self.assertEqual(pyflwor.execute_many(query, []), [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,161 @@
+"""
+PyQuery - The Python Object Query System
+Author: Tim Henderson
+Contact: tim.tadh@hackthology.com
+Copyright (c) 2010 All Rights Reserved.
+Licensed under a BSD style license see the LICENSE file.
+
+File: test_views.py
+Purpose: Tests for the query results kept up to date by watch.
+"""
+import unittest
+
+import pyflwor
+from pyflwor import IndexedCollection, ObservableDict, ObservableList, ObservableSet
+
+
+class A(object):
+    def __init__(self, q, g=0):
+        self.q = q
+        self.g = g
+
+    def __repr__(self):
+        return "A(%r, %r)" % (self.q, self.g)
+
+
+def add(prev, value):
+    return (prev or 0) + value
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.calls = list()
+
+        def f(a):
+            self.calls.append(a)
+            return True
+
+        self.items = ObservableList(A(q, q % 2) for q in range(6))
+        self.namespace = {"a": self.items, "b": [A(1), A(4)], "f": f, "add": add}
+
+    def check(self, watch, query):
+        self.assertEqual(
+            watch.result, pyflwor.execute(query, self.namespace, optimize=False)
+        )
+
+    def mutate(self, watch, query):
+        """
+        Changes the items in every way and checks the result of watch after
+        each change.
+        """
+        items = self.items
+        for change in (
+            lambda: items.append(A(7, 1)),
+            lambda: items.insert(0, A(3, 1)),
+            lambda: items.insert(3, items[-1]),
+            lambda: items.pop(1),
+            lambda: items.__setitem__(2, A(9)),
+            lambda: items.remove(items[0]),
+            lambda: items.sort(key=lambda a: a.q),
+            lambda: items.extend([A(4), A(5, 1)]),
+        ):
+            change()
+            self.check(watch, query)
+        items[1].q = 1
+        items.changed(items[1])
+        self.check(watch, query)
+
+    def test_path(self):
+        query = "a[self.q > 2 and f(self)]"
+        watch = pyflwor.watch(query, self.namespace)
+        self.check(watch, query)
+        del self.calls[:]
+        self.items.append(A(5))
+        self.assertEqual(len(watch.result), 4)
+        self.assertEqual(len(self.calls), 1)  # only the new item is tested
+        self.assertIs(watch.result, watch.result)
+        self.mutate(watch, query)
+
+    def test_flwr(self):
+        for query in (
+            "for x in <a> where x.q < 5 return x.q, x.g",
+            "for x in <a> where f(x) return x.q",
+            "for x in <a>, y in <b> where x.q > y.q return x.q",
+            "for x in <a[self.g == 1]> return 'q': x.q",
+        ):
+            watch = pyflwor.watch(query, self.namespace)
+            self.check(watch, query)
+            self.mutate(watch, query)
+
+    def test_collect(self):
+        for query in (
+            "for x in <a> collect x.q as x.g with add",
+            "for x in <a> where x.q > 1 collect x.q as x.g with add "
+            "collect x as x.q with function(prev, next) { if (prev) then prev else next }",
+        ):
+            watch = pyflwor.watch(query, self.namespace)
+            self.check(watch, query)
+            self.mutate(watch, query)
+
+    def test_reevaluated(self):
+        for query in (
+            "for x in <a> order by 0 ascd return x.q",
+            "for x in <a>, y in <a> where x.q == y.q return x.q",
+            "for x in <a> limit 2 return x.q",
+        ):
+            watch = pyflwor.watch(query, self.namespace)
+            self.check(watch, query)
+            self.mutate(watch, query)
+        ## a changing in the second for clause, the results are in the order of b
+        for query in (
+            "for y in <b>, x in <a> where x.q >= y.q return y.q, x.q",
+            "for y in <b>, x in <a> collect x.q as 0 with function(p, n) { [p, n] }",
+        ):
+            watch = pyflwor.watch(query, self.namespace)
+            self.assertIsNone(watch._view)
+            self.check(watch, query)
+            self.mutate(watch, query)
+
+    def test_sources(self):
+        items = ObservableList([A(1), A(2)])
+        b = ObservableSet([1, 2])
+        namespace = {"a": IndexedCollection(items, "q"), "b": b}
+        query = "for x in <a[self.q == 2]>, y in <b> where x.q == y return x.q"
+        watch = pyflwor.watch(query, namespace)
+        self.assertEqual(watch.result, (2,))
+        items.append(A(2))
+        self.assertEqual(watch.result, (2, 2))
+        b.discard(2)
+        self.assertEqual(watch.result, ())
+        b.add(2)
+        self.assertEqual(watch.result, (2, 2))
+        items[0].q = 2
+        self.assertEqual(watch.result, (2, 2))
+        watch.refresh()  # the change was not reported
+        self.assertEqual(watch.result, (2, 2, 2))
+        watch.close()
+        items.append(A(2))
+        self.assertEqual(watch.result, (2, 2, 2))
+        ## a set is evaluated again, its order is not the one of its insertions
+        s = ObservableSet()
+        for query in (
+            "s[self > 0]",
+            "for x in <s> collect x as 0 with function(p, n) { [p, n] }",
+        ):
+            watch = pyflwor.watch(query, {"s": s})
+            self.assertIsNone(watch._view)
+            for x in (10, 30, 1, 2, 50, 7):
+                s.add(x)
+                self.assertEqual(watch.result, pyflwor.execute(query, {"s": s}))
+            s.clear()
+        d = ObservableDict(x=A(1), y=A(2))
+        watch = pyflwor.watch("d[self.value.q > 1]", {"d": d})
+        d["z"] = A(3)
+        del d["y"]
+        self.assertEqual([pair.key for pair in watch.result], ["z"])
+        d |= {"w": A(4)}
+        self.assertEqual([pair.key for pair in watch.result], ["z", "w"])
+
+
+if __name__ == "__main__":
+    unittest.main()